@@ -0,0 +1,273 @@
+import argparse
+import asyncio
+import multiprocessing
+import time
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from multiprocessing.queues import Queue
+from multiprocessing.sharedctypes import Synchronized
+from multiprocessing.synchronize import Semaphore
+from typing import cast
+
+from aio_pika import IncomingMessage
+from aio_pika.abc import AbstractConnection, AbstractExchange
+
+from src.bot.handlers import notification as notification_handlers
+from src.bot.rate_limiter import telegram_limiter
+from src.broker.consumer import NotificationConsumer
+from src.schemas.notification import NotificationMethod, NotificationWithUrl
+
+ROUTING_KEY = "bench_notifications"
+
+
+class FakeBot:
+    def __init__(self, latency: float) -> None:
+        """
+        Answer every send_message after latency seconds, like Telegram API does
+        """
+        self.latency = latency
+
+    async def send_message(self, **kwargs: object) -> None:
+        await asyncio.sleep(self.latency)
+
+
+class StandInMessage:
+    def __init__(self, body: bytes, on_ack: Callable[[], None]) -> None:
+        """
+        Delivered message of the stand-in broker
+        """
+        self.body = body
+        self.headers: dict = {}
+        self._on_ack = on_ack
+
+    async def ack(self) -> None:
+        self._on_ack()
+
+
+class StandInQueue:
+    """
+    Work queue shared by worker processes through a multiprocessing queue
+
+    Like basic.qos, at most prefetch messages are delivered and not yet acked.
+    """
+
+    def __init__(self, source: Queue, acked: Synchronized, prefetch: int) -> None:
+        """
+        Deliver bodies from source, counting acks in acked
+        """
+        self.source = source
+        self.acked = acked
+        self.prefetch = prefetch
+        self.drained = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    async def consume(self, callback: Callable[[IncomingMessage], Awaitable[None]]) -> str:
+        self._task = asyncio.create_task(self._deliver(callback))
+        return "bench"
+
+    async def cancel(self, consumer_tag: str) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _deliver(self, callback: Callable[[IncomingMessage], Awaitable[None]]) -> None:
+        loop = asyncio.get_running_loop()
+        unacked = asyncio.Semaphore(self.prefetch)
+        handlers: set[asyncio.Future] = set()
+
+        def on_ack() -> None:
+            unacked.release()
+            with self.acked.get_lock():
+                self.acked.value += 1
+
+        while True:
+            await unacked.acquire()
+            body = await loop.run_in_executor(None, self.source.get)
+            if body is None:
+                break
+            message = cast("IncomingMessage", StandInMessage(body, on_ack))
+            handler = asyncio.ensure_future(callback(message))
+            handlers.add(handler)
+            handler.add_done_callback(handlers.discard)
+
+        await asyncio.gather(*handlers)
+        self.drained.set()
+
+
+class StandInChannel:
+    def __init__(self, queue: StandInQueue) -> None:
+        """
+        Channel with the only queue of the stand-in broker
+        """
+        self.queue = queue
+        self.default_exchange = None
+
+    async def set_qos(self, prefetch_count: int) -> None:
+        self.queue.prefetch = prefetch_count
+
+    async def declare_queue(
+            self,
+            name: str,
+            durable: bool,
+            arguments: dict | None = None,
+    ) -> StandInQueue:
+        return self.queue
+
+
+class StandInConnection:
+    def __init__(self, queue: StandInQueue) -> None:
+        """
+        Connect one worker process to the stand-in broker
+        """
+        self.queue = queue
+
+    async def channel(self) -> StandInChannel:
+        return StandInChannel(self.queue)
+
+    async def close(self) -> None:
+        pass
+
+
+async def send_notification_to_users(telegram_ids: list[int], message: str, url: str) -> None:
+    """
+    Send the notification to all users concurrently
+    """
+    async with asyncio.TaskGroup() as tg:
+        for telegram_id in telegram_ids:
+            tg.create_task(
+                notification_handlers.send_notification_to_user(telegram_id, message, url),
+            )
+
+
+async def handle(exchange: AbstractExchange, message: IncomingMessage) -> None:
+    """
+    Process a chunk the way the consumer does, without the delivery ledger
+    """
+    notification = NotificationWithUrl.model_validate_json(message.body)
+    await send_notification_to_users(
+        notification.recipient_ids,
+        notification.message,
+        notification.url,
+    )
+    await message.ack()
+
+
+async def run_worker(
+        source: Queue,
+        acked: Synchronized,
+        ready: Semaphore,
+        concurrency: int,
+        prefetch: int,
+        latency: float,
+        rate: float,
+) -> None:
+    notification_handlers.bot = FakeBot(latency)  # type: ignore[assignment]
+    notification_handlers.set_max_concurrent_sends(concurrency)
+    telegram_limiter.set_global_rate(rate)
+
+    queue = StandInQueue(source, acked, prefetch)
+
+    async def connect() -> AbstractConnection:
+        return cast("AbstractConnection", StandInConnection(queue))
+
+    consumer = NotificationConsumer(
+        connect=connect,
+        routing_key=ROUTING_KEY,
+        prefetch=prefetch,
+        handler=handle,
+    )
+    run = asyncio.create_task(consumer.run())
+    ready.release()
+    await queue.drained.wait()
+    consumer.stop()
+    await run
+
+
+def worker_main(*args: object) -> None:
+    asyncio.run(run_worker(*args))  # type: ignore[arg-type]
+
+
+def encode_chunks(messages: int, recipients: int) -> list[bytes]:
+    now = datetime.now(UTC)
+    return [
+        NotificationWithUrl(
+            id=i,
+            method=NotificationMethod.TELEGRAM_CHAT,
+            message="Пропала собака! Коричневая, отзывается на Бобик",
+            created_at=now,
+            updated_at=now,
+            recipient_ids=list(range(i * recipients, (i + 1) * recipients)),
+            sender_id=1,
+            report_id=i,
+            url=f"https://dogalert.ru/reports/{i}",
+        ).model_dump_json().encode("utf-8")
+        for i in range(messages)
+    ]
+
+
+def run(
+        bodies: list[bytes],
+        workers: int,
+        concurrency: int,
+        prefetch: int,
+        latency: float,
+        rate: float,
+) -> None:
+    context = multiprocessing.get_context("spawn")
+    source = context.Queue()
+    acked = context.Value("i", 0)
+    ready = context.Semaphore(0)
+
+    processes = [
+        context.Process(
+            target=worker_main,
+            args=(source, acked, ready, concurrency, prefetch, latency, rate / workers),
+        )
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    # Don't count process startup and imports
+    for _ in processes:
+        ready.acquire()
+
+    start = time.perf_counter()
+    for body in bodies:
+        source.put(body)
+    for _ in processes:
+        source.put(None)
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - start
+    recipients = len(NotificationWithUrl.model_validate_json(bodies[0]).recipient_ids)
+
+    print(
+        f"workers={workers} concurrency={concurrency} prefetch={prefetch}: "
+        f"acked={acked.value} messages_per_sec={acked.value / elapsed:,.1f} "
+        f"sends_per_sec={acked.value * recipients / elapsed:,.0f}",
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test notification consumer configurations")
+    parser.add_argument(
+        "-configs",
+        nargs="+",
+        default=["1:5:10", "1:30:10", "2:30:10", "4:30:20"],
+        help="workers:concurrency:prefetch",
+    )
+    parser.add_argument("-messages", type=int, default=200, help="Number of chunk messages")
+    parser.add_argument("-recipients", type=int, default=20, help="Recipients per chunk")
+    parser.add_argument("-latency", type=float, default=50, help="Fake Telegram API latency, ms")
+    parser.add_argument(
+        "-rate",
+        type=float,
+        default=1_000_000,
+        help="Global Telegram rate split between workers, e.g. 30",
+    )
+    args = parser.parse_args()
+
+    bodies = encode_chunks(args.messages, args.recipients)
+    print(f"messages={args.messages} recipients={args.recipients} latency_ms={args.latency}")
+    for config in args.configs:
+        workers, concurrency, prefetch = (int(value) for value in config.split(":"))
+        run(bodies, workers, concurrency, prefetch, args.latency / 1000, args.rate)
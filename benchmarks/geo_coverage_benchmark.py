@@ -0,0 +1,135 @@
+import argparse
+import asyncio
+import random
+import time
+
+from geoalchemy2 import WKTElement, functions
+from sqlalchemy import select
+
+from src.database.models import GeoLocation as GeoLocation_db
+from src.database.models import User as User_db
+from src.database.models.base_model import async_session_maker
+from src.schemas.geo import GeoPoint
+from src.services.geo_index import GeoGridIndex, spheroid_distance
+from src.services.geo_service import GeoServices
+
+MOSCOW = (37.6176, 55.7558)
+RADII = [500, 1000, 3000, 5000, 10000, 30000]
+
+
+def bench_in_memory(count: int, queries: int) -> None:
+    rnd = random.Random(42)
+    subscribers = [
+        (
+            user_id,
+            1_000_000 + user_id,
+            MOSCOW[0] + rnd.uniform(-0.5, 0.5),
+            MOSCOW[1] + rnd.uniform(-0.3, 0.3),
+            rnd.choice(RADII),
+        )
+        for user_id in range(count)
+    ]
+
+    index = GeoGridIndex()
+    start = time.perf_counter()
+    for subscriber in subscribers:
+        index.upsert(*subscriber)
+    build_time = time.perf_counter() - start
+
+    points = [
+        (MOSCOW[0] + rnd.uniform(-0.4, 0.4), MOSCOW[1] + rnd.uniform(-0.2, 0.2))
+        for _ in range(queries)
+    ]
+
+    found = 0
+    start = time.perf_counter()
+    for lon, lat in points:
+        found += len(index.covering(lon, lat))
+    index_time = time.perf_counter() - start
+
+    scan_queries = max(1, queries // 10)
+    start = time.perf_counter()
+    for lon, lat in points[:scan_queries]:
+        [
+            telegram_id
+            for _, telegram_id, p_lon, p_lat, radius in subscribers
+            if spheroid_distance(lon, lat, p_lon, p_lat) <= radius
+        ]
+    scan_time = time.perf_counter() - start
+
+    print(
+        f"subscribers={count} build={build_time:.2f}s queries={queries} "
+        f"index_avg={index_time / queries * 1000:.3f}ms "
+        f"per_row_scan_avg={scan_time / scan_queries * 1000:.2f}ms "
+        f"avg_recipients={found // queries}",
+    )
+
+
+async def bench_against_sql(queries: int) -> None:
+    """
+    Compare bbox-indexed query with per-row ST_DWithin(home_location, point, radius) scan
+    """
+    points = [
+        GeoPoint(
+            lon=MOSCOW[0] + random.uniform(-0.4, 0.4),
+            lat=MOSCOW[1] + random.uniform(-0.2, 0.2),
+        )
+        for _ in range(queries)
+    ]
+
+    async with async_session_maker() as session:
+        bbox_time = scan_time = 0.0
+        mismatches = 0
+        for coords in points:
+            start = time.perf_counter()
+            bbox_ids = await GeoServices.find_all_telegram_uids_covering_point(coords, session)
+            bbox_time += time.perf_counter() - start
+
+            point = WKTElement(f"POINT({coords.lon} {coords.lat})", srid=4326)
+            scan_query = (
+                select(User_db.telegram_id)
+                .join(GeoLocation_db, User_db.geolocation)
+                .where(
+                    functions.ST_DWithin(
+                        GeoLocation_db.home_location,
+                        point,
+                        GeoLocation_db.radius,
+                        use_spheroid=True,
+                    ),
+                )
+            )
+            start = time.perf_counter()
+            scan_ids = (await session.execute(scan_query)).scalars().all()
+            scan_time += time.perf_counter() - start
+
+            mismatches += len(set(bbox_ids) ^ set(scan_ids))
+
+    print(
+        f"queries={queries} bbox_index_avg={bbox_time / queries * 1000:.2f}ms "
+        f"per_row_scan_avg={scan_time / queries * 1000:.2f}ms "
+        f"mismatched_recipients={mismatches}",
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark reverse radius matching")
+    parser.add_argument(
+        "-count",
+        type=int,
+        nargs="+",
+        default=[100_000, 1_000_000],
+        help="Number of subscribers with random radii",
+    )
+    parser.add_argument("-queries", type=int, default=200, help="Number of report points")
+    parser.add_argument(
+        "-sql",
+        action="store_true",
+        help="Compare coverage bbox query with per-row scan on subscribers stored in db",
+    )
+    args = parser.parse_args()
+
+    if args.sql:
+        asyncio.run(bench_against_sql(args.queries))
+    else:
+        for count in args.count:
+            bench_in_memory(count, args.queries)
@@ -0,0 +1,107 @@
+import argparse
+import asyncio
+import random
+import time
+
+from src.database.models.base_model import async_session_maker
+from src.schemas.geo import GeoPoint
+from src.services.geo_index import GeoGridIndex, geo_index
+from src.services.geo_service import GeoServices
+
+MOSCOW = (37.6176, 55.7558)
+
+
+def bench_in_memory(count: int, queries: int, radius: int) -> None:
+    rnd = random.Random(42)
+    index = GeoGridIndex()
+
+    start = time.perf_counter()
+    for user_id in range(count):
+        index.upsert(
+            user_id,
+            1_000_000 + user_id,
+            MOSCOW[0] + rnd.uniform(-0.5, 0.5),
+            MOSCOW[1] + rnd.uniform(-0.3, 0.3),
+        )
+    build_time = time.perf_counter() - start
+
+    points = [
+        (MOSCOW[0] + rnd.uniform(-0.4, 0.4), MOSCOW[1] + rnd.uniform(-0.2, 0.2))
+        for _ in range(queries)
+    ]
+    found = 0
+    start = time.perf_counter()
+    for lon, lat in points:
+        found += len(index.within_radius(lon, lat, radius))
+    query_time = time.perf_counter() - start
+
+    print(
+        f"subscribers={count} build={build_time:.2f}s "
+        f"radius={radius}m queries={queries} "
+        f"avg={query_time / queries * 1000:.2f}ms avg_recipients={found // queries}",
+    )
+
+
+async def bench_against_sql(queries: int, radius: int) -> None:
+    """
+    Compare the index with the PostGIS query on the subscribers stored in db
+    """
+    async with async_session_maker() as session:
+        await geo_index.load(session)
+        points = [
+            (MOSCOW[0] + random.uniform(-0.4, 0.4), MOSCOW[1] + random.uniform(-0.2, 0.2))
+            for _ in range(queries)
+        ]
+
+        sql_time = index_time = 0.0
+        mismatches = 0
+        for lon, lat in points:
+            point = GeoPoint(lon, lat)
+
+            geo_index.ready = False
+            start = time.perf_counter()
+            sql_ids = await GeoServices.find_all_telegram_uids_within_radius(
+                point, radius, session,
+            )
+            sql_time += time.perf_counter() - start
+
+            geo_index.ready = True
+            start = time.perf_counter()
+            index_ids = await GeoServices.find_all_telegram_uids_within_radius(
+                point, radius, session,
+            )
+            index_time += time.perf_counter() - start
+
+            mismatches += len(set(sql_ids) ^ set(index_ids))
+
+    print(
+        f"subscribers={len(geo_index)} queries={queries} radius={radius}m "
+        f"sql_avg={sql_time / queries * 1000:.2f}ms "
+        f"index_avg={index_time / queries * 1000:.2f}ms "
+        f"mismatched_recipients={mismatches}",
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark in-memory geo index")
+    parser.add_argument(
+        "-count",
+        type=int,
+        nargs="+",
+        default=[100_000, 1_000_000],
+        help="Number of subscribers in the synthetic index",
+    )
+    parser.add_argument("-queries", type=int, default=200, help="Number of radius lookups")
+    parser.add_argument("-radius", type=int, default=5000, help="Lookup radius in metres")
+    parser.add_argument(
+        "-sql",
+        action="store_true",
+        help="Compare with PostGIS on subscribers already stored in db",
+    )
+    args = parser.parse_args()
+
+    if args.sql:
+        asyncio.run(bench_against_sql(args.queries, args.radius))
+    else:
+        for count in args.count:
+            bench_in_memory(count, args.queries, args.radius)
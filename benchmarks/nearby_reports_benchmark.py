@@ -0,0 +1,213 @@
+import argparse
+import asyncio
+import random
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import UTC, datetime
+from typing import Any
+
+from geoalchemy2 import WKTElement, functions
+from sqlalchemy import func, select
+from sqlalchemy.orm import selectinload
+
+from src.database.models import Report as Report_db
+from src.database.models import ReportPhoto as ReportPhoto_db
+from src.database.models import ReportStatus
+from src.database.models.base_model import async_session_maker
+from src.schemas.geo import GeoPoint
+from src.schemas.report import ReportBasePhoto, ReportNearest
+from src.services.report_service import ReportServices
+from src.web.dependencies.extract_nearest_report_data import extract_data
+
+MOSCOW = (37.6176, 55.7558)
+
+
+def entity_pipeline(rows: list[dict[str, Any]]) -> list[dict]:
+    """
+    Build the feed the old way: ORM entities with eager-loaded photos and nested schemas
+    """
+    feed = []
+    for row in rows:
+        report = Report_db(
+            id=row["id"],
+            title=row["title"],
+            content=row["content"],
+            status=row["status"],
+            region=row["region"],
+            created_at=row["created_at"],
+            updated_at=row["created_at"],
+            user_id=row["user_id"],
+            pet_id=row["pet_id"],
+            photos=[
+                ReportPhoto_db(id=row["id"] * 10 + i, url=url, report_id=row["id"])
+                for i, url in enumerate(row["photos"])
+            ],
+        )
+        schema = ReportBasePhoto.model_validate(report)
+        feed.append({
+            "report_id": schema.id,
+            "report_title": schema.title,
+            "report_content": schema.content,
+            "report_status": schema.status,
+            "report_first_photo_url": schema.photos[0].url if schema.photos else None,
+            "report_region": report.region,
+            "geo": row["location"],
+            "geo_distance": round(row["distance"] / 1000),
+        })
+    return feed
+
+
+def projection_pipeline(rows: list[dict[str, Any]]) -> list[dict]:
+    """
+    Build the feed from column-only rows constructed into flat schema without validation
+    """
+    return [extract_data(ReportNearest.model_construct(**row)) for row in rows]
+
+
+def measure(
+        name: str,
+        pipeline: Callable[[list[dict[str, Any]]], list[dict]],
+        rows: list[dict[str, Any]],
+) -> None:
+    start = time.perf_counter()
+    pipeline(rows)
+    elapsed = time.perf_counter() - start
+
+    # Input rows already exist, so everything traced here is allocated by the pipeline
+    tracemalloc.start()
+    feed = pipeline(rows)
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    live_blocks = sum(stat.count for stat in snapshot.statistics("filename"))
+
+    print(
+        f"{name}: rows={len(feed)} rows_per_sec={len(feed) / elapsed:,.0f} "
+        f"live_blocks_per_row={live_blocks / max(len(feed), 1):.1f} "
+        f"peak_bytes_per_row={peak / max(len(feed), 1):,.0f}",
+    )
+
+
+def bench_in_memory(count: int) -> None:
+    rnd = random.Random(42)
+    now = datetime.now(UTC)
+
+    entity_rows: list[dict[str, Any]] = []
+    for report_id in range(count):
+        lon = MOSCOW[0] + rnd.uniform(-0.3, 0.3)
+        lat = MOSCOW[1] + rnd.uniform(-0.2, 0.2)
+        entity_rows.append({
+            "id": report_id,
+            "title": f"Lost dog {report_id}",
+            "content": "Small brown dog, answers to Bobik, lost near the park",
+            "status": ReportStatus.ACTIVE,
+            "region": "Москва",
+            "created_at": now,
+            "user_id": report_id,
+            "pet_id": report_id,
+            "photos": [f"/static/uploads/{report_id}_{i}.jpg" for i in range(rnd.randint(0, 5))],
+            "location": f"POINT({lon} {lat})",
+            "distance": rnd.uniform(0, 30000),
+        })
+
+    projection_rows = [
+        {
+            "id": row["id"],
+            "title": row["title"],
+            "content": row["content"],
+            "status": row["status"],
+            "region": row["region"],
+            "location": row["location"],
+            "distance": row["distance"],
+            "first_photo_url": row["photos"][0] if row["photos"] else None,
+        }
+        for row in entity_rows
+    ]
+
+    measure("entities", entity_pipeline, entity_rows)
+    measure("projection", projection_pipeline, projection_rows)
+
+
+async def bench_against_sql(radius: int, repeat: int) -> None:
+    """
+    Compare entity + selectinload query with the feed projection on reports stored in db
+    """
+    user_point = WKTElement(f"POINT({MOSCOW[0]} {MOSCOW[1]})", srid=4326)
+    entity_query = (
+        select(
+            Report_db,
+            func.ST_AsText(Report_db.location).label("location"),
+            functions.ST_Distance(Report_db.location, user_point).label("distance"),
+        )
+        .where(
+            functions.ST_DWithin(Report_db.location, user_point, radius),
+            Report_db.status == ReportStatus.ACTIVE,
+        )
+        .options(selectinload(Report_db.photos))
+        .order_by("distance", Report_db.id)
+    )
+
+    async def entities() -> list[dict]:
+        async with async_session_maker() as session:
+            rows = (await session.execute(entity_query)).all()
+        return [
+            {
+                **ReportBasePhoto.model_validate(report).model_dump(),
+                "location": location,
+                "distance": distance,
+            }
+            for report, location, distance in rows
+        ]
+
+    async def projection() -> list[ReportNearest]:
+        async with async_session_maker() as session:
+            return await ReportServices.find_active_reports_within_radius(
+                point=GeoPoint(*MOSCOW),
+                radius=radius,
+                user_id=0,
+                session=session,
+                limit=sys.maxsize,
+            )
+
+    for name, fetch in (("entities", entities), ("projection", projection)):
+        await fetch()  # warm up connection pool
+        total_rows = 0
+        tracemalloc.start()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            total_rows += len(await fetch())
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"{name}: rows={total_rows // repeat} rows_per_sec={total_rows / elapsed:,.0f} "
+            f"peak_kib={peak / 1024:,.0f}",
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark nearby reports feed materialization")
+    parser.add_argument(
+        "-count",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000, 100_000],
+        help="Number of feed rows",
+    )
+    parser.add_argument(
+        "-sql",
+        action="store_true",
+        help="Run both queries against reports stored in db",
+    )
+    parser.add_argument("-radius", type=int, default=30000, help="Search radius for -sql")
+    parser.add_argument("-repeat", type=int, default=20, help="Query repeats for -sql")
+    args = parser.parse_args()
+
+    if args.sql:
+        asyncio.run(bench_against_sql(args.radius, args.repeat))
+    else:
+        for count in args.count:
+            print(f"count={count}")
+            bench_in_memory(count)
@@ -0,0 +1,79 @@
+import argparse
+import json
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+
+from src.broker.wire import decode_compact, encode_compact
+from src.schemas.notification import NotificationMethod, NotificationWithUrl
+
+MESSAGE = (
+    "❗❗❗ ОБЪЯВЛЕНИЕ О ПРОПАЖЕ ❗❗❗\n\n"
+    "📢 Пропала собака в Сокольниках\n\n"
+    "Убежала вечером у входа в парк, была в красном ошейнике, боится громких звуков\n\n"
+    "━━━━━━━━━━━━━━━━━━━━\n"
+    "🐶 Информация о питомце:\n"
+    "• Кличка: Бобик\n• Порода: Дворняга\n• Возраст: 3\n• Цвет: Рыжий\n"
+    "• Особенности: Белое пятно на груди\n"
+    "━━━━━━━━━━━━━━━━━━━━\n\n"
+    "🙏 Если вы что-то знаете, пожалуйста, свяжитесь с владельцем!"
+)
+
+
+def json_body(recipient_ids: list[int]) -> bytes:
+    now = datetime.now(UTC)
+    return NotificationWithUrl(
+        id=123456,
+        method=NotificationMethod.TELEGRAM_CHAT,
+        message=MESSAGE,
+        created_at=now,
+        updated_at=now,
+        recipient_ids=recipient_ids,
+        sender_id=42,
+        report_id=654321,
+        url="https://dogalert.ru/reports/654321",
+    ).model_dump_json().encode("utf-8")
+
+
+def decode_json(body: bytes) -> list[int]:
+    """
+    Decode the way the consumer does: json.loads followed by schema validation
+    """
+    return NotificationWithUrl(**json.loads(body.decode("utf-8"))).recipient_ids
+
+
+def decode_binary(body: bytes) -> list[int]:
+    return decode_compact(body).recipient_ids
+
+
+def measure(name: str, body: bytes, decode: Callable[[bytes], list[int]], repeat: int) -> None:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        decode(body)
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{name}: bytes={len(body):,} decodes_per_sec={repeat / elapsed:,.0f} "
+        f"us_per_decode={elapsed / repeat * 1e6:.1f}",
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark notification wire formats")
+    parser.add_argument(
+        "-recipients",
+        type=int,
+        nargs="+",
+        default=[100, 1000, 10000],
+        help="Recipients per message",
+    )
+    parser.add_argument("-repeat", type=int, default=2000, help="Decodes per measurement")
+    args = parser.parse_args()
+
+    for count in args.recipients:
+        # Telegram user ids are 10 digit numbers nowadays
+        recipient_ids = list(range(7_000_000_000, 7_000_000_000 + count))
+        print(f"recipients={count}")
+        compact_body = encode_compact(123456, 654321, recipient_ids)
+        measure("json", json_body(recipient_ids), decode_json, args.repeat)
+        measure("compact", compact_body, decode_binary, args.repeat)
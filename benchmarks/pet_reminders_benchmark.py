@@ -0,0 +1,117 @@
+import argparse
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import date
+
+from sqlalchemy import Date, cast, select, text
+from sqlalchemy.orm import Session, selectinload
+
+from src.celery_app.sync_database import celery_sync_session_maker
+from src.database.models import Pet as Pet_db
+from src.services.pet_service import PetServices
+
+SEED = """
+INSERT INTO pets (name, created_at, updated_at,
+                  next_vaccination, next_parasite_treatment, next_fleas_ticks_treatment)
+SELECT 'bench_' || i, now(), now(),
+       CASE WHEN random() < 0.7 THEN now() + (random() * 730 - 365) * interval '1 day' END,
+       CASE WHEN random() < 0.7 THEN now() + (random() * 730 - 365) * interval '1 day' END,
+       CASE WHEN random() < 0.7 THEN now() + (random() * 730 - 365) * interval '1 day' END
+FROM generate_series(1, :count) AS i
+"""
+
+
+def three_casts(today: date, session: Session) -> int:
+    """
+    Find due pets the old way: a query per treatment comparing cast(column, Date)
+    """
+    found = 0
+    for column in (
+        Pet_db.next_vaccination,
+        Pet_db.next_parasite_treatment,
+        Pet_db.next_fleas_ticks_treatment,
+    ):
+        query = (
+            select(Pet_db)
+            .where(cast(column, Date) == today)
+            .options(selectinload(Pet_db.owners))
+        )
+        found += len(session.execute(query).scalars().all())
+        session.expunge_all()
+    return found
+
+
+def single_range(today: date, session: Session) -> int:
+    rows = PetServices.get_pets_due_for_reminders(today, session)
+    found = sum(sum(flags) for _, *flags in rows)
+    session.expunge_all()
+    return found
+
+
+def single_range_stream(today: date, session: Session) -> int:
+    found = 0
+    for rows in PetServices.stream_pets_due_for_reminders(today, session, batch_size=500):
+        found += sum(sum(flags) for _, *flags in rows)
+    session.expunge_all()
+    return found
+
+
+def plan(session: Session, statement: str, today: date) -> str:
+    rows = session.execute(text(f"EXPLAIN {statement}"), {"today": today}).scalars().all()
+    nodes = [row.strip().lstrip("-> ").split("  ")[0] for row in rows if "Scan" in row]
+    return ", ".join(nodes)
+
+
+def measure(
+        name: str,
+        scan: Callable[[date, Session], int],
+        today: date,
+        session: Session,
+        repeat: int,
+) -> None:
+    scan(today, session)  # warm up cache
+    start = time.perf_counter()
+    for _ in range(repeat):
+        reminders = scan(today, session)
+    elapsed = (time.perf_counter() - start) / repeat
+
+    tracemalloc.start()
+    scan(today, session)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name}: reminders={reminders} avg={elapsed * 1000:.1f}ms peak_kib={peak / 1024:,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark daily pet reminders scan")
+    parser.add_argument("-count", type=int, default=1_000_000, help="Number of seeded pets")
+    parser.add_argument("-repeat", type=int, default=5, help="Scans per query")
+    args = parser.parse_args()
+
+    today = date.today()
+    with celery_sync_session_maker() as session:
+        # Everything is seeded inside the transaction and rolled back at the end
+        start = time.perf_counter()
+        session.execute(text(SEED), {"count": args.count})
+        session.execute(text("ANALYZE pets"))
+        print(f"pets={args.count} seeded in {time.perf_counter() - start:.1f}s")
+
+        print("casts plan:", plan(
+            session,
+            "SELECT id FROM pets WHERE CAST(next_vaccination AS DATE) = :today",
+            today,
+        ))
+        print("ranges plan:", plan(
+            session,
+            "SELECT id FROM pets WHERE next_vaccination >= :today "
+            "AND next_vaccination < :today + 1 "
+            "OR next_parasite_treatment >= :today AND next_parasite_treatment < :today + 1 "
+            "OR next_fleas_ticks_treatment >= :today AND next_fleas_ticks_treatment < :today + 1",
+            today,
+        ))
+
+        measure("three_casts", three_casts, today, session, args.repeat)
+        measure("single_range", single_range, today, session, args.repeat)
+        measure("single_range_stream", single_range_stream, today, session, args.repeat)
+        session.rollback()
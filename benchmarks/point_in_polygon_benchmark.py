@@ -0,0 +1,82 @@
+import argparse
+import math
+import random
+import time
+
+from src.services.geo_index import GeoGridIndex, PreparedPolygon
+
+MOSCOW = (37.6176, 55.7558)
+
+
+def random_ring(rnd: random.Random, vertices: int) -> list[tuple[float, float]]:
+    center_lon = MOSCOW[0] + rnd.uniform(-0.5, 0.5)
+    center_lat = MOSCOW[1] + rnd.uniform(-0.3, 0.3)
+    ring = []
+    for i in range(vertices):
+        angle = 2 * math.pi * i / vertices
+        size = rnd.uniform(0.01, 0.05)
+        ring.append((center_lon + size * math.cos(angle), center_lat + size * math.sin(angle)))
+    ring.append(ring[0])
+    return ring
+
+
+def naive_contains(ring: list[tuple[float, float]], lon: float, lat: float) -> bool:
+    inside = False
+    for (lon1, lat1), (lon2, lat2) in zip(ring, ring[1:]):
+        if (lat1 > lat) != (lat2 > lat):
+            if lon < lon1 + (lat - lat1) * (lon2 - lon1) / (lat2 - lat1):
+                inside = not inside
+    return inside
+
+
+def bench(polygons: int, points: int, vertices: int) -> None:
+    rnd = random.Random(42)
+    rings = [random_ring(rnd, vertices) for _ in range(polygons)]
+    report_points = [
+        (MOSCOW[0] + rnd.uniform(-0.5, 0.5), MOSCOW[1] + rnd.uniform(-0.3, 0.3))
+        for _ in range(points)
+    ]
+
+    naive_points = max(1, points // 20)
+    start = time.perf_counter()
+    naive_matches = 0
+    for lon, lat in report_points[:naive_points]:
+        naive_matches += sum(naive_contains(ring, lon, lat) for ring in rings)
+    naive_time = time.perf_counter() - start
+
+    index = GeoGridIndex()
+    start = time.perf_counter()
+    for user_id, ring in enumerate(rings):
+        index.upsert_polygon(user_id, user_id, PreparedPolygon([ring]))
+    prepare_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index_matches = 0
+    for lon, lat in report_points:
+        index_matches += len(index.in_polygons(lon, lat))
+    index_time = time.perf_counter() - start
+
+    print(
+        f"polygons={polygons} vertices={vertices} points={points} "
+        f"naive_avg={naive_time / naive_points * 1000:.3f}ms "
+        f"prepare={prepare_time:.2f}s "
+        f"prepared_avg={index_time / points * 1000:.3f}ms "
+        f"avg_matches={index_matches / points:.1f}",
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark bulk point-in-polygon matching")
+    parser.add_argument(
+        "-count",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000, 100_000],
+        help="Number of subscribers' polygons",
+    )
+    parser.add_argument("-points", type=int, default=2000, help="Number of report points")
+    parser.add_argument("-vertices", type=int, default=64, help="Vertices per polygon")
+    args = parser.parse_args()
+
+    for count in args.count:
+        bench(count, args.points, args.vertices)
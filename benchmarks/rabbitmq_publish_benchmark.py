@@ -0,0 +1,188 @@
+import argparse
+import asyncio
+import time
+from typing import cast
+
+from aio_pika import Message
+from aio_pika.abc import AbstractConnection
+
+from src.broker.producer import RabbitPublisher
+
+ROUTING_KEY = "bench_notifications"
+BODY = b'{"id": 1, "message": "Lost dog", "recipient_ids": [1, 2, 3], "url": "https://x/1"}'
+
+
+class InMemoryExchange:
+    def __init__(self, broker: "InMemoryBroker", confirms: bool) -> None:
+        """
+        Route published bodies straight into the broker queues
+        """
+        self.broker = broker
+        self.confirms = confirms
+
+    async def publish(self, message: Message, routing_key: str) -> None:
+        # basic.publish is asynchronous in AMQP, only the confirm costs a round trip
+        await asyncio.sleep(0)
+        self.broker.queues.setdefault(routing_key, []).append(message.body)
+        if self.confirms:
+            await self.broker.round_trip()
+
+
+class InMemoryChannel:
+    def __init__(self, broker: "InMemoryBroker", confirms: bool) -> None:
+        """
+        Open channel of the stand-in broker
+        """
+        self.broker = broker
+        self.default_exchange = InMemoryExchange(broker, confirms)
+        self.is_closed = False
+
+    async def declare_queue(
+            self,
+            name: str,
+            durable: bool,
+            arguments: dict | None = None,
+    ) -> None:
+        await self.broker.round_trip()
+        self.broker.queues.setdefault(name, [])
+
+    async def close(self) -> None:
+        self.is_closed = True
+
+
+class InMemoryConnection:
+    def __init__(self, broker: "InMemoryBroker") -> None:
+        """
+        Open connection of the stand-in broker
+        """
+        self.broker = broker
+
+    async def channel(self, publisher_confirms: bool = True) -> InMemoryChannel:
+        await self.broker.round_trip()
+        return InMemoryChannel(self.broker, publisher_confirms)
+
+    async def close(self) -> None:
+        await self.broker.round_trip()
+
+    async def __aenter__(self) -> "InMemoryConnection":
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        await self.close()
+
+
+class InMemoryBroker:
+    """
+    Stand-in broker keeping published bodies in lists
+
+    Connection handshake, channel.open, queue.declare, connection.close and publisher
+    confirms each cost one round trip of rtt seconds, as they do over the network.
+    """
+
+    def __init__(self, rtt: float) -> None:
+        """
+        Simulate rtt seconds of network latency per synchronous method
+        """
+        self.rtt = rtt
+        self.connections = 0
+        self.queues: dict[str, list[bytes]] = {}
+
+    async def round_trip(self) -> None:
+        await asyncio.sleep(self.rtt)
+
+    async def connect(self) -> AbstractConnection:
+        self.connections += 1
+        await self.round_trip()
+        return cast("AbstractConnection", InMemoryConnection(self))
+
+    def published(self) -> int:
+        return sum(len(bodies) for bodies in self.queues.values())
+
+
+async def connection_per_message(broker: InMemoryBroker) -> None:
+    """
+    Publish the way the producer used to: connect, open channel, declare queue, publish
+    """
+    connection = await broker.connect()
+    async with connection:
+        channel = await connection.channel()
+        await channel.declare_queue(name=ROUTING_KEY, durable=True)
+        await channel.default_exchange.publish(
+            message=Message(body=BODY, delivery_mode=2),
+            routing_key=ROUTING_KEY,
+        )
+
+
+async def run(
+        name: str,
+        count: int,
+        concurrency: int,
+        rtt: float,
+        mode: str,
+        confirms: bool = False,
+        max_in_flight: int = 256,
+) -> None:
+    broker = InMemoryBroker(rtt)
+    publisher = RabbitPublisher(
+        connect=broker.connect,
+        routing_key=ROUTING_KEY,
+        pool_size=concurrency,
+        confirms=confirms,
+        max_in_flight=max_in_flight,
+    )
+    await publisher.start()
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def publish_one() -> None:
+        async with semaphore:
+            if mode == "pooled":
+                await publisher.publish(BODY)
+            else:
+                await connection_per_message(broker)
+
+    start = time.perf_counter()
+    if mode == "many":
+        await publisher.publish_many(BODY for _ in range(count))
+    else:
+        await asyncio.gather(*(publish_one() for _ in range(count)))
+    elapsed = time.perf_counter() - start
+    await publisher.close()
+
+    print(
+        f"{name}: published={broker.published()} connections={broker.connections} "
+        f"publishes_per_sec={count / elapsed:,.0f}",
+    )
+
+
+async def main(count: int, concurrency: int, rtt_ms: float, max_in_flight: int) -> None:
+    rtt = rtt_ms / 1000
+    print(f"count={count} concurrency={concurrency} rtt_ms={rtt_ms}")
+    await run("connection_per_message", count, concurrency, rtt, "connect")
+    await run("pooled_publisher", count, concurrency, rtt, "pooled")
+    await run("pooled_publisher_confirms", count, concurrency, rtt, "pooled", confirms=True)
+    await run(
+        f"publish_many_confirms_in_flight_{max_in_flight}",
+        count,
+        concurrency,
+        rtt,
+        "many",
+        confirms=True,
+        max_in_flight=max_in_flight,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark notification publishing throughput")
+    parser.add_argument("-count", type=int, default=5000, help="Number of published messages")
+    parser.add_argument("-concurrency", type=int, default=4, help="Concurrent publishers")
+    parser.add_argument("-rtt", type=float, default=1.0, help="Stand-in broker round trip, ms")
+    parser.add_argument(
+        "-in_flight",
+        type=int,
+        default=256,
+        help="Unconfirmed messages allowed by publish_many",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(main(args.count, args.concurrency, args.rtt, args.in_flight))
@@ -0,0 +1,166 @@
+import argparse
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiohttp import web
+
+from src.bot.rate_limiter import TelegramRateLimiter
+from src.celery_app.separate_tg_bot import ReminderSender, send_reminder_async
+
+TOKEN = "123456:bench"
+MESSAGE = "⚠️Напоминание: пора делать вакцинацию питомцу Бобик!"
+
+
+class FakeTelegramAPI:
+    """
+    Local HTTP server answering sendMessage like Telegram Bot API does
+    """
+
+    def __init__(self, latency: float) -> None:
+        """
+        Answer every request after latency seconds
+        """
+        self.latency = latency
+        self.requests = 0
+        self.connections = 0
+        self.port = 0
+        self._ready = threading.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self) -> None:
+        threading.Thread(target=asyncio.run, args=(self._serve(),), daemon=True).start()
+        self._ready.wait()
+
+    async def _serve(self) -> None:
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self._handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+        self._ready.set()
+        await asyncio.Event().wait()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if request.transport is not None and not hasattr(request.transport, "_bench_seen"):
+            request.transport._bench_seen = True  # type: ignore[attr-defined]
+            self.connections += 1
+        data = await request.post()
+        await asyncio.sleep(self.latency)
+        return web.json_response({
+            "ok": True,
+            "result": {
+                "message_id": self.requests,
+                "date": int(time.time()),
+                "chat": {"id": int(str(data["chat_id"])), "type": "private"},
+                "text": data["text"],
+            },
+        })
+
+
+def make_bot(api: FakeTelegramAPI) -> Callable[[], Bot]:
+    def factory() -> Bot:
+        return Bot(
+            token=TOKEN,
+            session=AiohttpSession(api=TelegramAPIServer.from_base(api.base_url)),
+        )
+    return factory
+
+
+def send_per_reminder_loop(bot_factory: Callable[[], Bot], rate: float, telegram_id: int) -> bool:
+    """
+    Send the way reminders used to: new event loop, Bot and HTTP session per message
+    """
+    async def send() -> bool:
+        bot = bot_factory()
+        limiter = TelegramRateLimiter(global_rate=rate, chat_rate=rate)
+        try:
+            return await send_reminder_async(bot, limiter, telegram_id, MESSAGE)
+        finally:
+            await bot.session.close()
+
+    return asyncio.run(send())
+
+
+def run(
+        name: str,
+        api: FakeTelegramAPI,
+        count: int,
+        send: Callable[[list[int]], list[bool]],
+        batch: int,
+) -> None:
+    requests_before = api.requests
+    connections_before = api.connections
+
+    start = time.perf_counter()
+    sent = 0
+    for i in range(0, count, batch):
+        sent += sum(send(list(range(i, min(i + batch, count)))))
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{name}: sent={sent} connections={api.connections - connections_before} "
+        f"requests={api.requests - requests_before} reminders_per_sec={count / elapsed:,.0f}",
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Celery reminder sending")
+    parser.add_argument("-count", type=int, default=500, help="Number of reminders")
+    parser.add_argument("-latency", type=float, default=0, help="Fake Telegram API latency, ms")
+    parser.add_argument("-batch", type=int, default=500, help="Reminders per batch task")
+    parser.add_argument("-concurrency", type=int, default=30, help="Concurrent sends in batch")
+    parser.add_argument("-rate", type=float, default=1_000_000, help="Global Telegram rate")
+    args = parser.parse_args()
+
+    api = FakeTelegramAPI(args.latency / 1000)
+    api.start()
+    bot_factory = make_bot(api)
+    print(f"count={args.count} latency_ms={args.latency} rate={args.rate}")
+
+    run(
+        "loop_and_bot_per_reminder",
+        api,
+        args.count,
+        lambda telegram_ids: [
+            send_per_reminder_loop(bot_factory, args.rate, telegram_id)
+            for telegram_id in telegram_ids
+        ],
+        batch=1,
+    )
+
+    sender = ReminderSender(
+        make_bot=bot_factory,
+        global_rate=args.rate,
+        chat_rate=args.rate,
+        max_concurrent=args.concurrency,
+    )
+    sender.start()
+    run(
+        "persistent_sender",
+        api,
+        args.count,
+        lambda telegram_ids: [sender.send(telegram_id, MESSAGE) for telegram_id in telegram_ids],
+        batch=1,
+    )
+    run(
+        "persistent_sender_batches",
+        api,
+        args.count,
+        lambda telegram_ids: sender.send_many(
+            [(telegram_id, MESSAGE) for telegram_id in telegram_ids],
+        ),
+        batch=args.batch,
+    )
+    sender.close()
@@ -2,49 +2,163 @@ import asyncio
 import logging
 import traceback
 
-from aiogram.exceptions import TelegramAPIError, TelegramRetryAfter
+from aiogram.exceptions import (
+    TelegramAPIError,
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramNotFound,
+    TelegramRetryAfter,
+)
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, WebAppInfo
 
 from src.bot.create_bot import bot
+from src.bot.rate_limiter import telegram_limiter
+from src.config.config import settings
+from src.database.models import DeliveryStatus
 
 log = logging.getLogger(__name__)
 
-semaphore = asyncio.Semaphore(5)
+semaphore = asyncio.Semaphore(settings.TELEGRAM_MAX_CONCURRENT_SENDS)
 
-async def send_notification_to_user(
+# The user blocked the bot, the chat is gone or the request itself is invalid:
+# sending it again gets the same answer
+PERMANENT_ERRORS = (TelegramForbiddenError, TelegramBadRequest, TelegramNotFound)
+
+
+def set_max_concurrent_sends(limit: int) -> None:
+    global semaphore
+    semaphore = asyncio.Semaphore(limit)
+
+
+# Telegram limits: 4096 UTF-16 code units of text, keep the keyboard short enough to read
+MESSAGE_MAX_LENGTH = 4096
+DIGEST_MAX_ALERTS = 10
+DIGEST_HEADER = "❗❗❗ НЕСКОЛЬКО ОБЪЯВЛЕНИЙ О ПРОПАЖЕ РЯДОМ ❗❗❗"
+DIGEST_SEPARATOR = "\n\n━━━━━━━━━━━━━━━━━━━━\n\n"
+
+
+def telegram_length(text: str) -> int:
+    """
+    Length as Telegram counts it: emoji outside the BMP take two UTF-16 code units
+    """
+    return len(text.encode("utf-16-le")) // 2
+
+
+def truncate(text: str, length: int) -> str:
+    """
+    Cut text to at most length UTF-16 code units, never splitting a surrogate pair
+    """
+    return text.encode("utf-16-le")[:length * 2].decode("utf-16-le", errors="ignore")
+
+
+def digest_content(messages: list[str]) -> str:
+    """
+    Merge alert texts into one message, shortening each to fit Telegram text limit
+    """
+    numbered = [f"{i}. " for i in range(1, len(messages) + 1)]
+    overhead = (
+        telegram_length(DIGEST_HEADER)
+        + telegram_length(DIGEST_SEPARATOR) * len(messages)
+        + sum(telegram_length(number) for number in numbered)
+    )
+    budget = (MESSAGE_MAX_LENGTH - overhead) // max(len(messages), 1)
+
+    parts = [DIGEST_HEADER]
+    for number, message in zip(numbered, messages, strict=True):
+        if telegram_length(message) > budget:
+            message = truncate(message, budget - 1).rstrip() + "…"
+        parts.append(number + message)
+    return DIGEST_SEPARATOR.join(parts)
+
+
+async def send_message_to_user(
         telegram_id: int,
-        message: str,
-        url: str,
-) -> None:
+        text: str,
+        markup: InlineKeyboardMarkup | None,
+) -> DeliveryStatus:
+    """
+    Send the message, FAILED when Telegram rejects it for good, RETRYING on other errors
+    """
     async with semaphore:
         while True:
+            await telegram_limiter.acquire(telegram_id)
             try:
-                markup = None
-                if url:
-                    markup = InlineKeyboardMarkup(inline_keyboard=[
-                        [InlineKeyboardButton(
-                            text="🔎 Посмотреть объявление",
-                            web_app=WebAppInfo(url=url),
-                        )],
-                    ])
-
                 await bot.send_message(
                     chat_id=telegram_id,
-                    text=message,
+                    text=text,
                     reply_markup=markup,
                 )
-                await asyncio.sleep(0.3)
-                break
+                return DeliveryStatus.DELIVERED
             except TelegramRetryAfter as e:
                 log.warning(f"Flood limit exceeded, sleeping for {e.retry_after} seconds")
-                await asyncio.sleep(e.retry_after)
+                telegram_limiter.flood_wait(e.retry_after)
+            except PERMANENT_ERRORS as e:
+                log.warning(f"Telegram rejected message for user ({telegram_id}): {e}")
+                return DeliveryStatus.FAILED
             except TelegramAPIError as e:
                 log.error(f"Telegram API error for user ({telegram_id}): {e}")
-                break
+                return DeliveryStatus.RETRYING
             except Exception as e:
                 log.error(
                     f"Unexpected error for user ({telegram_id}): "
                     f"{e}\n{traceback.format_exc()}",
                 )
-                break
+                return DeliveryStatus.RETRYING
+
+
+async def send_notification_to_user(
+        telegram_id: int,
+        message: str,
+        url: str,
+) -> DeliveryStatus:
+    markup = None
+    if url:
+        markup = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(
+                text="🔎 Посмотреть объявление",
+                web_app=WebAppInfo(url=url),
+            )],
+        ])
+
+    return await send_message_to_user(telegram_id, message, markup)
 
+
+async def send_digest_to_user(
+        telegram_id: int,
+        alerts: list[tuple[str, str]],
+) -> DeliveryStatus:
+    """
+    Send (message, url) alerts as digests of up to DIGEST_MAX_ALERTS with a button each
+
+    Returns the worst outcome: RETRYING if any digest may still go through, else FAILED.
+    """
+    outcomes = set()
+    for start in range(0, len(alerts), DIGEST_MAX_ALERTS):
+        digest = alerts[start:start + DIGEST_MAX_ALERTS]
+        markup = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(
+                text=f"🔎 Объявление {i}",
+                web_app=WebAppInfo(url=url),
+            )]
+            for i, (_, url) in enumerate(digest, start=1)
+            if url
+        ])
+        text = digest_content([message for message, _ in digest])
+        outcomes.add(await send_message_to_user(telegram_id, text, markup))
+
+    for status in (DeliveryStatus.RETRYING, DeliveryStatus.FAILED):
+        if status in outcomes:
+            return status
+    return DeliveryStatus.DELIVERED
+
+
+async def send_alerts_to_user(
+        telegram_id: int,
+        alerts: list[tuple[str, str]],
+) -> DeliveryStatus:
+    """
+    Send the user one (message, url) alert as it is or several ones as a digest
+    """
+    if len(alerts) == 1:
+        return await send_notification_to_user(telegram_id, *alerts[0])
+    return await send_digest_to_user(telegram_id, alerts)
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import time
+
+from src.config.config import settings
+
+log = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Asyncio token bucket: rate tokens per second, bursts up to capacity
+
+    Waiters are served in arrival order, one at a time, under the bucket lock.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        """
+        Start with a full bucket
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hand out no tokens for the next seconds, e.g. after a flood limit error
+        """
+        now = time.monotonic()
+        self._paused_until = max(self._paused_until, now + seconds)
+        self._tokens = 0.0
+        self._updated = now
+
+    def idle(self) -> bool:
+        """
+        Check if the bucket is full again, so dropping it changes nothing
+        """
+        self._refill(time.monotonic())
+        return self._tokens >= self.capacity and not self._lock.locked()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def _refill(self, now: float) -> None:
+        if now > self._updated:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+
+class TelegramRateLimiter:
+    """
+    Process-wide limiter of bot sends: one global bucket plus a bucket per chat
+
+    Telegram allows about 30 messages per second overall and about one per second
+    into the same chat. Every send waits for its chat first, so a busy chat doesn't
+    hold global tokens others could use.
+    """
+
+    def __init__(
+            self,
+            global_rate: float,
+            chat_rate: float,
+            max_chats: int = 10_000,
+    ) -> None:
+        """
+        Allow global_rate sends per second in total and chat_rate into one chat
+        """
+        self.global_bucket = TokenBucket(global_rate, capacity=global_rate)
+        self.chat_rate = chat_rate
+        self.max_chats = max_chats
+        self._chats: dict[int, TokenBucket] = {}
+
+    def set_global_rate(self, rate: float) -> None:
+        self.global_bucket = TokenBucket(rate, capacity=rate)
+
+    async def acquire(self, chat_id: int) -> None:
+        chat_bucket = self._chats.get(chat_id)
+        if chat_bucket is None:
+            self._prune()
+            chat_bucket = TokenBucket(self.chat_rate, capacity=1)
+            self._chats[chat_id] = chat_bucket
+
+        await chat_bucket.acquire()
+        await self.global_bucket.acquire()
+
+    def flood_wait(self, seconds: float) -> None:
+        """
+        Stop all sends for the time Telegram asked in its RetryAfter error
+        """
+        log.warning(f"Pausing all bot sends for {seconds} seconds")
+        self.global_bucket.pause(seconds)
+
+    def _prune(self) -> None:
+        if len(self._chats) < self.max_chats:
+            return
+        for chat_id in [chat_id for chat_id, bucket in self._chats.items() if bucket.idle()]:
+            del self._chats[chat_id]
+
+
+telegram_limiter = TelegramRateLimiter(
+    global_rate=settings.TELEGRAM_GLOBAL_RATE,
+    chat_rate=settings.TELEGRAM_CHAT_RATE,
+)
@@ -0,0 +1,79 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+from src.schemas.notification import NotificationWithUrl
+
+log = logging.getLogger(__name__)
+
+# Delivers the batch, returns whether no recipient of each notification is left to retry
+BatchHandler = Callable[[list[NotificationWithUrl]], Awaitable[list[bool]]]
+
+
+class UndeliveredError(Exception):
+    """
+    Some recipients of the notification didn't get it, but a later attempt may succeed
+    """
+
+
+class Coalescer:
+    """
+    Collect notifications arriving within a window and deliver them as one batch
+
+    When nothing is being delivered, a notification is passed on right away, only
+    together with those submitted in the same event loop iteration. Notifications
+    arriving while a batch is on its way open a window: they are bursts worth merging.
+    Whoever submits waits for their batch, so the broker message stays unacked until
+    its recipients got the alert, alone or merged into a digest with the others.
+    Submitters of notifications some recipients didn't get fail with UndeliveredError.
+    """
+
+    def __init__(self, window: float, deliver: BatchHandler) -> None:
+        """
+        Hold notifications for up to window seconds before passing them to deliver
+        """
+        self.window = window
+        self.deliver = deliver
+        self._batch: list[tuple[NotificationWithUrl, asyncio.Future]] = []
+        self._flush_task: asyncio.Task | None = None
+        self._delivering = 0
+
+    async def submit(self, notification: NotificationWithUrl) -> None:
+        """
+        Wait until the batch holding the notification is delivered, raising its error
+
+        UndeliveredError is raised when some recipients didn't get the notification.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._batch.append((notification, future))
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+        await future
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.window if self._delivering else 0)
+        batch, self._batch = self._batch, []
+        self._flush_task = None
+
+        log.info(f"Delivering batch of {len(batch)} notifications")
+        self._delivering += 1
+        try:
+            delivered = await self.deliver([notification for notification, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._delivering -= 1
+
+        for (notification, future), success in zip(batch, delivered, strict=True):
+            if future.done():
+                continue
+            if success:
+                future.set_result(None)
+            else:
+                future.set_exception(UndeliveredError(
+                    f"Notification {notification.id} chunk {notification.chunk} "
+                    f"wasn't delivered to all recipients",
+                ))
@@ -1,75 +1,371 @@
+import argparse
 import asyncio
+import functools
 import json
 import logging
+import multiprocessing
+import os
+import signal
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from types import FrameType
 
-from aio_pika import IncomingMessage
+from aio_pika import IncomingMessage, Message
+from aio_pika.abc import AbstractConnection, AbstractExchange
 from pydantic import ValidationError
 
-from src.bot.handlers.notification import send_notification_to_user
+from src.bot.handlers.notification import send_alerts_to_user, set_max_concurrent_sends
+from src.bot.rate_limiter import telegram_limiter
+from src.broker.coalescer import Coalescer, UndeliveredError
+from src.broker.topology import (
+    RETRY_HEADER,
+    dead_queue_name,
+    declare_topology,
+    retry_delay,
+    retry_queue_name,
+)
+from src.broker.wire import decode_compact, is_compact
 from src.config.config import settings
+from src.database.models import DeliveryStatus
+from src.database.models.base_model import async_session_maker
 from src.schemas.notification import NotificationWithUrl
+from src.services.notification_service import NotificationServices
+from src.services.report_service import ReportServices
+from src.web.dependencies.notification_content_handles import notification_content
 
 log = logging.getLogger(__name__)
 
 
-async def process_new_message(message: IncomingMessage) -> None:
-    log.info(f"Received message: {message.body.decode('utf-8')}")
+async def forward(
+        exchange: AbstractExchange,
+        message: IncomingMessage,
+        routing_key: str,
+        attempt: int,
+) -> None:
+    """
+    Republish the message to another queue of the topology and ack the original
+    """
+    await exchange.publish(
+        message=Message(
+            body=message.body,
+            headers={RETRY_HEADER: attempt},
+            delivery_mode=2,
+        ),
+        routing_key=routing_key,
+    )
+    await message.ack()
 
-    try:
-        data = json.loads(message.body.decode("utf-8"))
-        notification = NotificationWithUrl(**data)
-        log.info(f"Parsed notification: {notification}")
 
-        for tg_id in notification.recipient_ids:
-            await send_notification_to_user(tg_id, notification.message, notification.url)
-            log.info(f"Sent notification to user {tg_id}")
+async def retry_later(exchange: AbstractExchange, message: IncomingMessage) -> None:
+    retries = message.headers.get(RETRY_HEADER)
+    attempt = (retries if isinstance(retries, int) else 0) + 1
+    delay = retry_delay(attempt)
 
-        # async with asyncio.TaskGroup() as tg:
-        #     [tg.create_task(
-        #         send_notification_to_user(tg_id, notification.message)
-        #     ) for tg_id in notification.recipient_ids]
+    if delay is None:
+        log.error(f"Message failed {attempt - 1} retries, moving it to the dead queue")
+        await forward(exchange, message, dead_queue_name(settings.RMQ_ROUTING_KEY), attempt)
+        return
 
+    log.warning(f"Retry {attempt} of message in {delay} seconds")
+    await forward(exchange, message, retry_queue_name(settings.RMQ_ROUTING_KEY, delay), attempt)
 
-        await message.ack()
 
-    except json.JSONDecodeError as e:
-        log.error(f"Failed to decode JSON: {e}")
-        await message.nack(requeue=False)  # remove from queue
+async def deliver_alerts(
+        telegram_id: int,
+        alerts: dict[int, tuple[str, str]],
+) -> DeliveryStatus:
+    """
+    Send the user their {notification id: (message, url)} alerts and record the outcome
+    """
+    status = await send_alerts_to_user(telegram_id, list(alerts.values()))
+    async with async_session_maker() as session:
+        await NotificationServices.record_deliveries(
+            outcomes={(notif_id, telegram_id): status for notif_id in alerts},
+            session=session,
+        )
+    return status
+
+
+async def deliver_notifications(notifications: list[NotificationWithUrl]) -> list[bool]:
+    """
+    Deliver a batch of notification chunks, one Telegram message per recipient
+
+    Recipients with several alerts in the batch get them merged into a digest. Every
+    outcome is written to the ledger as soon as its send completes, so a crash resends
+    only what wasn't sent yet. Returns whether each chunk is done with all its recipients:
+    recipients Telegram refused for good are recorded as FAILED and never retried.
+    """
+    # A requeued chunk may have been partly sent already
+    pending: dict[int, set[int]] = defaultdict(set)
+    async with async_session_maker() as session:
+        for notification in notifications:
+            finished = await NotificationServices.find_finished_telegram_ids(
+                notif_id=notification.id,
+                telegram_ids=notification.recipient_ids,
+                session=session,
+            )
+            pending[notification.id].update(
+                tg_id for tg_id in notification.recipient_ids if tg_id not in finished
+            )
+
+    alerts: dict[int, dict[int, tuple[str, str]]] = defaultdict(dict)
+    for notification in notifications:
+        for tg_id in pending[notification.id]:
+            alerts[tg_id][notification.id] = (notification.message, notification.url)
+
+    async with asyncio.TaskGroup() as tg:
+        tasks = {
+            tg_id: tg.create_task(deliver_alerts(tg_id, user_alerts))
+            for tg_id, user_alerts in alerts.items()
+        }
+    outcomes = {tg_id: task.result() for tg_id, task in tasks.items()}
+
+    log.info(
+        f"Delivered {len(notifications)} notification chunks with "
+        f"{sum(len(recipients) for recipients in pending.values())} alerts "
+        f"in {len(outcomes)} messages, "
+        f"{sum(status == DeliveryStatus.DELIVERED for status in outcomes.values())} sent",
+    )
+    return [
+        all(outcomes.get(tg_id) != DeliveryStatus.RETRYING for tg_id in notification.recipient_ids)
+        for notification in notifications
+    ]
+
+
+coalescer = Coalescer(window=settings.NOTIFICATION_COALESCE_WINDOW, deliver=deliver_notifications)
+
+
+# Chunks of one notification share the text, render it once per report. Chunks are
+# published together, so a short TTL is enough and report edits show up soon after
+RENDERED_CACHE_SIZE = 1024
+RENDERED_CACHE_TTL = 30
+rendered_messages: dict[int, tuple[float, str]] = {}
+
+
+async def render_message(report_id: int) -> str:
+    cached = rendered_messages.get(report_id)
+    if cached is not None:
+        expires_at, message = cached
+        if expires_at >= time.monotonic():
+            return message
+        del rendered_messages[report_id]
+
+    async with async_session_maker() as session:
+        report = await ReportServices.find_one_or_none_by_id(report_id, session)
+    if report is None or report.pet is None:
+        raise LookupError(f"Report {report_id} or its pet not found")
+
+    message = notification_content(report, report.pet)
+    if len(rendered_messages) >= RENDERED_CACHE_SIZE:
+        del rendered_messages[next(iter(rendered_messages))]
+    rendered_messages[report_id] = (time.monotonic() + RENDERED_CACHE_TTL, message)
+    return message
+
+
+async def parse_notification(body: bytes) -> NotificationWithUrl:
+    if not is_compact(body):
+        data = json.loads(body.decode("utf-8"))
+        return NotificationWithUrl(**data)
+
+    compact = decode_compact(body)
+    return NotificationWithUrl.model_construct(
+        id=compact.id,
+        report_id=compact.report_id,
+        recipient_ids=compact.recipient_ids,
+        message=await render_message(compact.report_id),
+        url=f"{settings.MAIN_DOMEN}/reports/{compact.report_id}",
+        chunk=compact.chunk,
+        chunks=compact.chunks,
+    )
+
+
+async def process_new_message(exchange: AbstractExchange, message: IncomingMessage) -> None:
+    log.info(f"Received message of {len(message.body)} bytes")
+    dead_queue = dead_queue_name(settings.RMQ_ROUTING_KEY)
+
+    try:
+        notification = await parse_notification(message.body)
+        log.info(f"Parsed notification: {notification}")
     except ValidationError as e:
         log.error(f"Pydantic validation failed: {e}")
-        await message.nack(requeue=False)  # remove from queue
+        await forward(exchange, message, dead_queue, 0)
+        return
+    except ValueError as e:
+        log.error(f"Failed to decode message: {e}")
+        await forward(exchange, message, dead_queue, 0)
+        return
+    except LookupError as e:
+        log.error(f"Failed to render notification: {e}")
+        await forward(exchange, message, dead_queue, 0)
+        return
+    except Exception as e:
+        log.error(f"Failed to parse notification: {e}")
+        await retry_later(exchange, message)
+        return
+
+    try:
+        await coalescer.submit(notification)
+        await message.ack()
+    except UndeliveredError as e:
+        # Delivered recipients are in the ledger, the retry resends to the failed ones
+        log.warning(f"{e}, retrying")
+        await retry_later(exchange, message)
     except Exception as e:
         log.error(f"Failed to process notification: {e}")
-        await message.nack(requeue=True)  # return to queue
+        await retry_later(exchange, message)  # only this chunk is retried
 
 
-async def handle_notification_from_rabbitmq() -> None:
-    settings.configure_logging()
-    log.info("Starting rabbitmq consumer...")
+MessageHandler = Callable[[AbstractExchange, IncomingMessage], Awaitable[None]]
 
-    try:
-        connection = await settings.get_rmq_connection()
-        async with connection:
-            log.info("Created connection: %s", connection)
 
+class NotificationConsumer:
+    """
+    One consumer process: a channel with prefetch and the handler tasks it runs
+
+    aio-pika runs the handler of every delivered message as a separate task, so up
+    to prefetch messages are processed concurrently. On stop the consumer cancels
+    its subscription, lets in-flight messages finish and only then closes the
+    connection; whatever doesn't finish within drain_timeout is redelivered.
+    """
+
+    def __init__(
+            self,
+            connect: Callable[[], Awaitable[AbstractConnection]],
+            routing_key: str,
+            prefetch: int,
+            handler: MessageHandler = process_new_message,
+            drain_timeout: float = 30,
+    ) -> None:
+        """
+        Consume routing_key queue with handler, keeping up to prefetch unacked messages
+        """
+        self.connect = connect
+        self.routing_key = routing_key
+        self.prefetch = prefetch
+        self.handler = handler
+        self.drain_timeout = drain_timeout
+        self._stop_event = asyncio.Event()
+        self._in_flight: set[asyncio.Task] = set()
+
+    def stop(self) -> None:
+        log.info("Stopping consumer, draining in-flight messages...")
+        self._stop_event.set()
+
+    async def run(self) -> None:
+        connection = await self.connect()
+        try:
             channel = await connection.channel()
-            await channel.set_qos(prefetch_count=10)
+            await channel.set_qos(prefetch_count=self.prefetch)
+            queue = await declare_topology(channel, self.routing_key)
 
-            queue = await channel.declare_queue(
-                name=settings.RMQ_ROUTING_KEY,
-                durable=True,
+            consumer_tag = await queue.consume(
+                functools.partial(self._handle, channel.default_exchange),
             )
+            log.info(
+                f"Waiting for messages in queue: {self.routing_key}, prefetch = {self.prefetch}",
+            )
+
+            await self._stop_event.wait()
+            await queue.cancel(consumer_tag)
+            await self._drain()
+        finally:
+            await connection.close()
+
+    async def _handle(self, exchange: AbstractExchange, message: IncomingMessage) -> None:
+        task = asyncio.current_task()
+        if task is not None:
+            self._in_flight.add(task)
+        try:
+            await self.handler(exchange, message)
+        finally:
+            if task is not None:
+                self._in_flight.discard(task)
 
-            log.info("Waiting for messages in queue: %r", settings.RMQ_ROUTING_KEY)
-            await queue.consume(process_new_message)  # type: ignore[arg-type]
+    async def _drain(self) -> None:
+        if not self._in_flight:
+            return
+        log.info(f"Waiting for {len(self._in_flight)} in-flight messages")
+        _, pending = await asyncio.wait(set(self._in_flight), timeout=self.drain_timeout)
+        if pending:
+            log.warning(f"{len(pending)} messages didn't finish in time, they'll be redelivered")
 
-            stop_event = asyncio.Event()
-            await stop_event.wait()
 
+async def run_worker(workers: int, concurrency: int, prefetch: int) -> None:
+    settings.configure_logging()
+    set_max_concurrent_sends(concurrency)
+    # Telegram limits the bot as a whole, so processes split the global rate
+    telegram_limiter.set_global_rate(settings.TELEGRAM_GLOBAL_RATE / workers)
+
+    consumer = NotificationConsumer(
+        connect=settings.get_rmq_connection,
+        routing_key=settings.RMQ_ROUTING_KEY,
+        prefetch=prefetch,
+    )
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, consumer.stop)
+
+    log.info(f"Starting rabbitmq consumer, pid = {os.getpid()}, concurrency = {concurrency}")
+    try:
+        await consumer.run()
     except Exception as e:
         log.error(f"Failed to fetch messages from rabbitmq: {e}")
         raise
 
 
+def worker_main(workers: int, concurrency: int, prefetch: int) -> None:
+    asyncio.run(run_worker(workers, concurrency, prefetch))
+
+
+def run_workers(workers: int, concurrency: int, prefetch: int) -> None:
+    """
+    Run consumer processes, forwarding SIGTERM/SIGINT to them and waiting for their drain
+    """
+    if workers == 1:
+        worker_main(workers, concurrency, prefetch)
+        return
+
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=worker_main, args=(workers, concurrency, prefetch))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    def forward_signal(signum: int, frame: FrameType | None) -> None:
+        for process in processes:
+            if process.pid is not None and process.is_alive():
+                os.kill(process.pid, signum)
+
+    signal.signal(signal.SIGTERM, forward_signal)
+    signal.signal(signal.SIGINT, forward_signal)
+
+    for process in processes:
+        process.join()
+
+
 if __name__ == "__main__":
-    asyncio.run(handle_notification_from_rabbitmq())
+    parser = argparse.ArgumentParser(description="Consume notifications from rabbitmq")
+    parser.add_argument(
+        "-workers",
+        type=int,
+        default=settings.RMQ_CONSUMER_WORKERS,
+        help="Number of consumer processes",
+    )
+    parser.add_argument(
+        "-concurrency",
+        type=int,
+        default=settings.TELEGRAM_MAX_CONCURRENT_SENDS,
+        help="Concurrent Telegram sends per process",
+    )
+    parser.add_argument(
+        "-prefetch",
+        type=int,
+        default=settings.RMQ_PREFETCH_COUNT,
+        help="Unacked messages per process",
+    )
+    args = parser.parse_args()
+
+    run_workers(args.workers, args.concurrency, args.prefetch)
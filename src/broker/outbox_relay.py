@@ -0,0 +1,145 @@
+import asyncio
+import contextlib
+import logging
+from collections import defaultdict
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.broker.producer import RabbitPublisher
+from src.config.config import settings
+from src.database.models import OutboxMessage as OutboxMessage_db
+from src.database.models.base_model import async_session_maker
+
+log = logging.getLogger(__name__)
+
+
+class OutboxRelay:
+    """
+    Background task moving outbox messages to the broker in batches
+
+    Rows are locked with SKIP LOCKED, so relays of several web workers share the
+    outbox without publishing the same row twice. The publisher must use confirms:
+    rows are deleted only after the broker confirmed every message of the batch, so
+    they are on its disk. If that commit fails the batch is published again, which
+    the consumer tolerates thanks to the delivery ledger.
+
+    The publisher is connected by the relay task, with exponential backoff while the
+    broker is down, so the web app starts and keeps writing outbox rows without it.
+    """
+
+    def __init__(
+            self,
+            session_maker: async_sessionmaker[AsyncSession],
+            publisher: RabbitPublisher,
+            batch_size: int,
+            interval: float,
+            min_backoff: float = 1,
+            max_backoff: float = 60,
+    ) -> None:
+        """
+        Relay up to batch_size rows per transaction, polling every interval seconds
+        """
+        if not publisher.confirms:
+            raise ValueError("Outbox relay needs a publisher with confirms enabled")
+        self.session_maker = session_maker
+        self.publisher = publisher
+        self.batch_size = batch_size
+        self.interval = interval
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            log.info(f"Outbox relay started, batch = {self.batch_size}")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        log.info("Outbox relay stopped")
+
+    def notify(self) -> None:
+        """
+        Wake the relay up right away instead of at the next poll
+        """
+        self._wakeup.set()
+
+    async def relay_batch(self) -> int:
+        async with self.session_maker() as session:
+            query = (
+                select(
+                    OutboxMessage_db.id,
+                    OutboxMessage_db.routing_key,
+                    OutboxMessage_db.body,
+                )
+                .order_by(OutboxMessage_db.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            rows = (await session.execute(query)).all()
+            if not rows:
+                return 0
+
+            bodies_by_key: dict[str, list[bytes]] = defaultdict(list)
+            for row in rows:
+                bodies_by_key[row.routing_key].append(row.body)
+            for routing_key, bodies in bodies_by_key.items():
+                await self.publisher.publish_many(bodies, routing_key=routing_key)
+
+            await session.execute(
+                delete(OutboxMessage_db).where(OutboxMessage_db.id.in_([row.id for row in rows])),
+            )
+            await session.commit()
+
+        log.info(f"Relayed {len(rows)} outbox messages")
+        return len(rows)
+
+    async def start_publisher(self) -> None:
+        """
+        Connect the publisher, retrying with exponential backoff until it succeeds
+        """
+        delay = self.min_backoff
+        while True:
+            try:
+                await self.publisher.start()
+                return
+            except Exception as e:
+                log.error(f"Failed to start publisher, retrying in {delay} seconds: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_backoff)
+
+    async def _run(self) -> None:
+        await self.start_publisher()
+        while True:
+            self._wakeup.clear()
+            try:
+                relayed = await self.relay_batch()
+            except Exception as e:
+                log.error(f"Failed to relay outbox messages: {e}")
+                relayed = 0
+
+            if relayed == self.batch_size:
+                continue
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+
+
+outbox_relay = OutboxRelay(
+    session_maker=async_session_maker,
+    publisher=RabbitPublisher(
+        connect=settings.get_rmq_connection,
+        routing_key=settings.RMQ_ROUTING_KEY,
+        pool_size=settings.RMQ_CHANNEL_POOL_SIZE,
+        confirms=True,
+        max_in_flight=settings.RMQ_MAX_IN_FLIGHT,
+    ),
+    batch_size=settings.OUTBOX_BATCH_SIZE,
+    interval=settings.OUTBOX_POLL_INTERVAL,
+)
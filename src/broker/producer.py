@@ -1,9 +1,14 @@
+import asyncio
 import logging
+import math
+from collections.abc import Awaitable, Callable, Iterable
 
 from aio_pika import Message
-from pydantic import ValidationError
+from aio_pika.abc import AbstractChannel, AbstractConnection
+from aio_pika.pool import Pool
 
-from src.config.config import settings
+from src.broker.topology import declare_topology
+from src.broker.wire import encode_compact
 from src.database.models import Notification as Notification_db
 from src.schemas.notification import Notification as Notification_schema
 from src.schemas.notification import NotificationWithUrl
@@ -11,50 +16,168 @@ from src.schemas.notification import NotificationWithUrl
 log = logging.getLogger(__name__)
 
 
-async def send_task_to_rabbitmq(notification: Notification_db, url: str) -> None:
-    settings.configure_logging()
+class RabbitPublisher:
+    """
+    Application-scoped publisher over one long-lived connection and a pool of channels
 
-    try:
-        notification_pydantic = Notification_schema.model_validate(
-            notification,
-            from_attributes=True,
-        )
-        notification_with_url_pydantic = NotificationWithUrl(
-            **notification_pydantic.model_dump(),
-            url=url,
-        )
-        body = notification_with_url_pydantic.model_dump_json().encode("utf-8")
-    except ValidationError as e:
-        log.error(f"Pydantic validation error: {e}")
-        return
-    except Exception as e:
-        log.error(f"Failed to get encoded body: {e}")
-        raise
-
-    try:
-        connection = await settings.get_rmq_connection()
-        async with connection:
-            log.info(f"Created connection: {connection}")
+    The connection is opened and the queue declared once, on start, so publishing
+    a message costs a channel checkout and a basic.publish, not an AMQP handshake.
+
+    With confirms enabled every publish waits for the broker ack, so a message is
+    on disk once publish returns. publish_many keeps up to max_in_flight messages
+    unconfirmed at a time instead of paying one round trip per message.
+    """
+
+    def __init__(
+            self,
+            connect: Callable[[], Awaitable[AbstractConnection]],
+            routing_key: str,
+            pool_size: int,
+            confirms: bool = False,
+            max_in_flight: int = 256,
+    ) -> None:
+        """
+        Use connect to open the connection, keeping up to pool_size channels
+        """
+        self.connect = connect
+        self.routing_key = routing_key
+        self.pool_size = pool_size
+        self.confirms = confirms
+        self.max_in_flight = max_in_flight
+        self._connection: AbstractConnection | None = None
+        self._channels: Pool[AbstractChannel] | None = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def started(self) -> bool:
+        return self._channels is not None
+
+    async def start(self) -> None:
+        async with self._lock:
+            if self._channels is not None:
+                return
 
+            connection = await self.connect()
             channel = await connection.channel()
-            await channel.declare_queue(
-                name=settings.RMQ_ROUTING_KEY,
-                durable=True,
-            )
-            log.info(f"Declared queue: {settings.RMQ_ROUTING_KEY}")
+            await declare_topology(channel, self.routing_key)
+            await channel.close()
 
-            message = Message(
-                body=body,
-                delivery_mode=2,
+            self._connection = connection
+            self._channels = Pool(self._open_channel, max_size=self.pool_size)
+            log.info(
+                f"Publisher started, queue = {self.routing_key}, "
+                f"channels = {self.pool_size}, confirms = {self.confirms}",
             )
 
+    async def close(self) -> None:
+        async with self._lock:
+            if self._channels is not None:
+                await self._channels.close()
+            if self._connection is not None:
+                await self._connection.close()
+            self._channels = None
+            self._connection = None
+            log.info("Publisher closed")
+
+    async def publish(self, body: bytes, routing_key: str | None = None) -> None:
+        channels = await self._get_channels()
+        async with channels.acquire() as channel:
             await channel.default_exchange.publish(
-                message=message,
-                routing_key=settings.RMQ_ROUTING_KEY,
+                message=Message(body=body, delivery_mode=2),
+                routing_key=routing_key or self.routing_key,
             )
-            log.info(f"Successfully sent message to queue: {settings.RMQ_ROUTING_KEY}")
 
-    except Exception as e:
-        log.error(f"Failed to send message to rabbitmq: {e}")
-        raise
+    async def publish_many(self, bodies: Iterable[bytes], routing_key: str | None = None) -> int:
+        """
+        Publish bodies over one channel, keeping at most max_in_flight unconfirmed
+
+        Returns the number of published messages. Raises after the whole batch was
+        attempted if the broker rejected or failed to confirm any of them.
+        """
+        channels = await self._get_channels()
+        routing_key = routing_key or self.routing_key
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        published = 0
+        failed = 0
+
+        async with channels.acquire() as channel:
+            exchange = channel.default_exchange
+
+            async def publish_one(body: bytes) -> None:
+                nonlocal published, failed
+                try:
+                    await exchange.publish(
+                        message=Message(body=body, delivery_mode=2),
+                        routing_key=routing_key,
+                    )
+                    published += 1
+                except Exception as e:
+                    failed += 1
+                    log.error(f"Failed to publish message to {routing_key}: {e}")
+                finally:
+                    in_flight.release()
 
+            tasks = []
+            for body in bodies:
+                await in_flight.acquire()
+                tasks.append(asyncio.create_task(publish_one(body)))
+            await asyncio.gather(*tasks)
+
+        log.info(f"Published {published} messages to {routing_key}, failed = {failed}")
+        if failed:
+            raise Exception(f"Failed to publish {failed} of {published + failed} messages")
+        return published
+
+    async def _get_channels(self) -> Pool[AbstractChannel]:
+        if self._channels is None:
+            await self.start()
+        assert self._channels is not None
+        return self._channels
+
+    async def _open_channel(self) -> AbstractChannel:
+        assert self._connection is not None
+        return await self._connection.channel(publisher_confirms=self.confirms)
+
+
+def encode_notification_chunks(
+        notification: Notification_db,
+        url: str,
+        chunk_size: int,
+        compact: bool = False,
+) -> list[bytes]:
+    """
+    Encode notification as messages carrying up to chunk_size recipients each
+
+    Every chunk is delivered and acked on its own, so a failed chunk is retried
+    without resending the notification to the recipients of the other chunks.
+    Compact chunks carry only ids, the consumer renders the text from the report.
+    """
+    notification_pydantic = Notification_schema.model_validate(
+        notification,
+        from_attributes=True,
+    )
+    recipient_ids = notification_pydantic.recipient_ids
+    chunks = math.ceil(len(recipient_ids) / chunk_size)
+
+    if compact:
+        return [
+            encode_compact(
+                notification_id=notification_pydantic.id,
+                report_id=notification_pydantic.report_id,
+                recipient_ids=recipient_ids[start:start + chunk_size],
+                chunk=chunk,
+                chunks=chunks,
+            )
+            for chunk, start in enumerate(range(0, len(recipient_ids), chunk_size))
+        ]
+
+    return [
+        NotificationWithUrl(
+            **notification_pydantic.model_dump(exclude={"recipient_ids"}),
+            recipient_ids=recipient_ids[start:start + chunk_size],
+            url=url,
+            chunk=chunk,
+            chunks=chunks,
+        ).model_dump_json().encode("utf-8")
+        for chunk, start in enumerate(range(0, len(recipient_ids), chunk_size))
+    ]
@@ -0,0 +1,51 @@
+from aio_pika.abc import AbstractChannel, AbstractQueue
+
+# Header counting how many times a message went through the retry queues
+RETRY_HEADER = "x-retry"
+
+# Seconds a failed message waits before its next attempt, one queue per tier
+RETRY_DELAYS = (5, 30, 300)
+
+
+def retry_queue_name(routing_key: str, delay: int) -> str:
+    return f"{routing_key}.retry.{delay}s"
+
+
+def dead_queue_name(routing_key: str) -> str:
+    return f"{routing_key}.dead"
+
+
+def retry_delay(attempt: int) -> int | None:
+    """
+    Delay before retry attempt (1-based), None when the message has used up its retries
+    """
+    if attempt > len(RETRY_DELAYS):
+        return None
+    return RETRY_DELAYS[attempt - 1]
+
+
+async def declare_topology(channel: AbstractChannel, routing_key: str) -> AbstractQueue:
+    """
+    Declare the work queue, its delay queues and the dead queue, return the work queue
+
+    Delay queues have no consumers: a message expires after the tier's TTL and is
+    dead-lettered through the default exchange back to the work queue. Messages
+    that are poison or out of retries are parked in the dead queue for inspection.
+    The work queue itself keeps no arguments, so already existing queues are
+    redeclared without a precondition error.
+    """
+    queue = await channel.declare_queue(name=routing_key, durable=True)
+
+    for delay in RETRY_DELAYS:
+        await channel.declare_queue(
+            name=retry_queue_name(routing_key, delay),
+            durable=True,
+            arguments={
+                "x-message-ttl": delay * 1000,
+                "x-dead-letter-exchange": "",
+                "x-dead-letter-routing-key": routing_key,
+            },
+        )
+
+    await channel.declare_queue(name=dead_queue_name(routing_key), durable=True)
+    return queue
@@ -0,0 +1,63 @@
+import struct
+import sys
+from array import array
+from typing import NamedTuple
+
+# Compact messages start with the magic and version, JSON ones always start with "{"
+MAGIC = b"DA\x01"
+
+# notification_id, report_id, chunk, chunks, number of recipients
+HEADER = struct.Struct("<3sqqHHI")
+
+
+class CompactNotification(NamedTuple):
+    id: int
+    report_id: int
+    chunk: int
+    chunks: int
+    recipient_ids: list[int]
+
+
+def is_compact(body: bytes) -> bool:
+    return body[:len(MAGIC)] == MAGIC
+
+
+def encode_compact(
+        notification_id: int,
+        report_id: int,
+        recipient_ids: list[int],
+        chunk: int = 0,
+        chunks: int = 1,
+) -> bytes:
+    """
+    Encode chunk as fixed header followed by recipients as packed little-endian int64
+
+    The message text and report URL are not sent, the consumer renders them by report id.
+    """
+    recipients = array("q", recipient_ids)
+    if sys.byteorder != "little":
+        recipients.byteswap()
+    header = HEADER.pack(MAGIC, notification_id, report_id, chunk, chunks, len(recipients))
+    return header + recipients.tobytes()
+
+
+def decode_compact(body: bytes) -> CompactNotification:
+    """
+    Decode compact message, raising ValueError if it is malformed
+    """
+    try:
+        magic, notification_id, report_id, chunk, chunks, count = HEADER.unpack_from(body)
+    except struct.error as e:
+        raise ValueError(f"Invalid compact notification header: {e}")
+    if magic != MAGIC:
+        raise ValueError(f"Invalid compact notification magic: {magic!r}")
+
+    payload = memoryview(body)[HEADER.size:]
+    if len(payload) != count * 8:
+        raise ValueError(f"Expected {count} recipients, got {len(payload)} bytes")
+
+    recipients = array("q")
+    recipients.frombytes(payload)
+    if sys.byteorder != "little":
+        recipients.byteswap()
+    return CompactNotification(notification_id, report_id, chunk, chunks, recipients.tolist())
@@ -1,68 +1,161 @@
 import logging
-from datetime import date
+from datetime import UTC, date, datetime
 
+from sqlalchemy.orm import Session
+
+from src.config.config import settings
+from src.database.models import Pet, ReminderKind
 from src.services.pet_service import PetServices
 
 from .config import celery_app
-from .reminder_tasks import (
-    send_fleas_ticks_reminder,
-    send_parasite_reminder,
-    send_vaccination_reminder,
-)
+from .reminder_tasks import send_reminder_batch
 from .sync_database import celery_sync_session_maker
 
 log = logging.getLogger(__name__)
 
+
+def reminder_buckets() -> int:
+    """
+    Count scans in the daily reminder window, pets are spread over them by id
+    """
+    window = settings.REMINDER_WINDOW_END_HOUR - settings.REMINDER_WINDOW_START_HOUR
+    return max(1, window * 60 // settings.REMINDER_SCAN_INTERVAL)
+
+
+def reminder_bucket(now: datetime) -> int:
+    """
+    Get the last bucket due at now, clamped to the window
+    """
+    minutes = (now.hour - settings.REMINDER_WINDOW_START_HOUR) * 60 + now.minute
+    return min(max(0, minutes // settings.REMINDER_SCAN_INTERVAL), reminder_buckets() - 1)
+
+
+# (pet_id, kind) of the logged reminder and the (telegram_id, pet_name, kind) to send
+PendingReminder = tuple[tuple[int, ReminderKind], tuple[int, str, str]]
+
+
+def queue_reminders(
+        today: date,
+        pending: list[PendingReminder],
+        count: int,
+        session: Session,
+) -> None:
+    """
+    Commit reminder logs and queue the first count pending reminders as one batch
+
+    Logs are committed before the batch is queued, so a failing scan never queues
+    it twice. The commit covers logs of all pending reminders, the scan drops those
+    of reminders it didn't queue with forget_pending when it fails.
+    """
+    session.commit()
+    send_reminder_batch.delay([reminder for _, reminder in pending[:count]])
+    del pending[:count]
+
+
+def forget_pending(today: date, pending: list[PendingReminder], session: Session) -> None:
+    """
+    Drop logs of reminders left unqueued by a failed scan, so the next scan sends them
+    """
+    session.rollback()
+    PetServices.forget_reminders(today, {key for key, _ in pending}, session)
+    session.commit()
+
+
 @celery_app.task
 def get_pets_for_reminders() -> dict:
     """
-    Получаем из БД всех Pet у которых
+    Получаем из БД одним запросом всех Pet у которых
 
     pet.next_vaccination == today
     pet.next_parasite_treatment == today
     pet.next_fleas_ticks_treatment == today
 
-    И если находим таких, то отправляем соответствующие задачи
-    send_vaccination_reminder, send_parasite_reminder, send_fleas_ticks_reminder
+    Задача запускается каждые REMINDER_SCAN_INTERVAL минут в окне
+    REMINDER_WINDOW_START_HOUR - REMINDER_WINDOW_END_HOUR (UTC). Pet распределены
+    по корзинам pet.id % reminder_buckets(), очередной запуск берет корзины
+    до текущей включительно, так что пропущенные запуски догоняются.
+    Уже отправленные сегодня напоминания записаны в ReminderLog и пропускаются.
+
+    Pet читаем потоком через server-side cursor, для каждого наступившего срока
+    и каждого владельца собираем напоминание (telegram_id, pet_name, kind)
+    и отправляем пачками по REMINDER_BATCH_SIZE в задачи send_reminder_batch,
+    как только пачка набралась
     """
-    log.info("Start daily pet reminders check")
+    log.info("Start pet reminders scan")
     try:
-        with celery_sync_session_maker() as session:
-            today = date.today()
-            log.info(f"Today date: {today}")
-
-            vacc_pets = PetServices.get_pets_by_vaccination_date(today, session)
-            parasite_pets = PetServices.get_pets_by_parasite_date(today, session)
-            fleas_ticks_pets = PetServices.get_pets_by_fleas_ticks_date(today, session)
-
-            vacc_sent = 0
-            for pet in vacc_pets:
-                telegram_ids = [owner.telegram_id for owner in pet.owners]
-                send_vaccination_reminder.delay(telegram_ids, pet.name)
-                vacc_sent += 1
-
-            parasite_sent = 0
-            for pet in parasite_pets:
-                telegram_ids = [owner.telegram_id for owner in pet.owners]
-                send_parasite_reminder.delay(telegram_ids, pet.name)
-                parasite_sent += 1
-
-            fleas_ticks_sent = 0
-            for pet in fleas_ticks_pets:
-                telegram_ids = [owner.telegram_id for owner in pet.owners]
-                send_fleas_ticks_reminder.delay(telegram_ids, pet.name)
-                fleas_ticks_sent += 1
+        # The stream keeps a server-side cursor open, so logs are committed in another session
+        with celery_sync_session_maker() as session, celery_sync_session_maker() as log_session:
+            now = datetime.now(UTC)
+            today = now.date()
+            buckets = reminder_buckets()
+            bucket = reminder_bucket(now)
+            log.info(f"Today date: {today}, bucket {bucket} of {buckets}")
+
+            PetServices.delete_old_reminder_logs(today, log_session)
+
+            batch_size = settings.REMINDER_BATCH_SIZE
+            pending: list[PendingReminder] = []
+            queued = dict.fromkeys(ReminderKind, 0)
+            batches = 0
+
+            try:
+                for due_pets in PetServices.stream_pets_due_for_reminders(
+                    today,
+                    session,
+                    batch_size,
+                    buckets=buckets,
+                    up_to_bucket=bucket,
+                ):
+                    due: list[tuple[Pet, ReminderKind]] = []
+                    for pet, vaccination_due, parasite_due, fleas_ticks_due in due_pets:
+                        for kind, is_due in (
+                            (ReminderKind.VACCINATION, vaccination_due),
+                            (ReminderKind.PARASITE, parasite_due),
+                            (ReminderKind.FLEAS_TICKS, fleas_ticks_due),
+                        ):
+                            if is_due:
+                                due.append((pet, kind))
+
+                    # Queue only what this scan logged, a concurrent scan skips it
+                    logged = PetServices.record_reminders(
+                        today,
+                        [(pet.id, kind) for pet, kind in due],
+                        log_session,
+                    )
+                    for pet, kind in due:
+                        if (pet.id, kind) not in logged:
+                            continue
+                        for owner in pet.owners:
+                            reminder = (owner.telegram_id, pet.name, kind.value)
+                            pending.append(((pet.id, kind), reminder))
+                        queued[kind] += len(pet.owners)
+
+                    # Start sending full batches while the scan goes on
+                    while len(pending) >= batch_size:
+                        queue_reminders(today, pending, batch_size, log_session)
+                        batches += 1
+
+                if pending:
+                    queue_reminders(today, pending, len(pending), log_session)
+                    batches += 1
+                # Logs of due pets without owners and the cleanup of old ones
+                log_session.commit()
+            except Exception:
+                forget_pending(today, pending, log_session)
+                raise
 
             result = {
                 "date": today.isoformat(),
-                "vaccination_sent": vacc_sent,
-                "parasite_sent": parasite_sent,
-                "fleas_ticks_sent": fleas_ticks_sent,
+                "bucket": bucket,
+                "vaccination_sent": queued[ReminderKind.VACCINATION],
+                "parasite_sent": queued[ReminderKind.PARASITE],
+                "fleas_ticks_sent": queued[ReminderKind.FLEAS_TICKS],
+                "batches": batches,
             }
 
             log.info(f"Reminders summary: {result}")
             return result
 
     except Exception as e:
-        log.error(f"Daily pet reminders FAILED: {e}")
+        log.error(f"Pet reminders scan FAILED: {e}")
         raise
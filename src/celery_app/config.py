@@ -18,13 +18,11 @@ celery_app.conf.timezone = "UTC"
 celery_app.conf.enable_utc = True
 
 celery_app.conf.beat_schedule = {
-    "get_pets_for_reminders_every_morning": {
+    "get_pets_for_reminders_every_interval": {
         "task": "src.celery_app.beat_schedule.get_pets_for_reminders",
-        "schedule": crontab(hour=10, minute=0),
+        "schedule": crontab(
+            minute=f"*/{settings.REMINDER_SCAN_INTERVAL}",
+            hour=f"{settings.REMINDER_WINDOW_START_HOUR}-{settings.REMINDER_WINDOW_END_HOUR - 1}",
+        ),
     },
-
-    "get_pets_for_reminders_every_evening": {
-        "task": "src.celery_app.beat_schedule.get_pets_for_reminders",
-        "schedule": crontab(hour=20, minute=0),
-    }
 }
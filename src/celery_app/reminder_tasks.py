@@ -1,47 +1,50 @@
 import logging
 
 from src.celery_app.config import celery_app
-from src.celery_app.separate_tg_bot import send_reminder_sync
+from src.celery_app.separate_tg_bot import send_reminders_sync
+from src.database.models import ReminderKind
 
 log = logging.getLogger(__name__)
 
+REMINDER_MESSAGES = {
+    ReminderKind.VACCINATION: "⚠️Напоминание: пора делать вакцинацию питомцу {pet_name}!",
+    ReminderKind.PARASITE: "⚠️Напоминание: пора обработать от паразитов питомца {pet_name}!",
+    ReminderKind.FLEAS_TICKS: (
+        "⚠️Напоминание: пора сделать обработку от блох и клещей для питомца {pet_name}!"
+    ),
+}
 
-@celery_app.task
-def send_vaccination_reminder(telegram_ids: list[int], pet_name: str) -> None:
-    message = f"⚠️Напоминание: пора делать вакцинацию питомцу {pet_name}!"
-    for tg_id in telegram_ids:
-        try:
-            success = send_reminder_sync(tg_id, message)
-            if success:
-                log.info(f"Vaccination reminder sent successfully to user: {tg_id}")
-            else:
-                log.error(f"Failed to send vaccination reminder to user {tg_id}")
-        except Exception as e:
-            log.error(f"Failed to send vaccination reminder - {tg_id}, {e}")
 
+def reminder_message(kind: ReminderKind, pet_name: str) -> str:
+    return REMINDER_MESSAGES[kind].format(pet_name=pet_name)
 
-@celery_app.task
-def send_parasite_reminder(telegram_ids: list[int], pet_name: str) -> None:
-    message = f"⚠️Напоминание: пора обработать от паразитов питомца {pet_name}!"
-    for tg_id in telegram_ids:
-        try:
-            success = send_reminder_sync(tg_id, message)
-            if success:
-                log.info(f"Parasite reminder sent successfully to user: {tg_id}")
-            else:
-                log.error(f"Failed to send parasite reminder to user {tg_id}")
-        except Exception as e:
-            log.error(f"Failed to send parasite reminder - {tg_id}, {e}")
 
 @celery_app.task
-def send_fleas_ticks_reminder(telegram_ids: list[int], pet_name: str) -> None:
-    message = f"⚠️Напоминание: пора сделать обработку от блох и клещей для питомца {pet_name}!"
-    for tg_id in telegram_ids:
-        try:
-            success = send_reminder_sync(tg_id, message)
-            if success:
-                log.info(f"Fleas & Ticks reminder sent successfully to user: {tg_id}")
-            else:
-                log.error(f"Failed to send Fleas & Ticks reminder to user {tg_id}")
-        except Exception as e:
-            log.error(f"Failed to send fleas & ticks reminder - {tg_id}, {e}")
+def send_reminder_batch(reminders: list[tuple[int, str, str]]) -> dict:
+    """
+    Отправляем пачку напоминаний (telegram_id, pet_name, kind) одновременно
+
+    Отправки ограничены общим для процесса rate limiter Telegram,
+    в результате возвращаем сводку отправленных и неотправленных по типам
+    """
+    messages = [
+        (telegram_id, reminder_message(ReminderKind(kind), pet_name))
+        for telegram_id, pet_name, kind in reminders
+    ]
+    results = send_reminders_sync(messages)
+
+    summary: dict = {
+        "total": len(reminders),
+        "sent": 0,
+        "failed": 0,
+        "by_kind": {kind.value: {"sent": 0, "failed": 0} for kind in ReminderKind},
+    }
+    for (telegram_id, _, kind), success in zip(reminders, results, strict=True):
+        outcome = "sent" if success else "failed"
+        summary[outcome] += 1
+        summary["by_kind"][kind][outcome] += 1
+        if not success:
+            log.error(f"Failed to send {kind} reminder to user {telegram_id}")
+
+    log.info(f"Reminder batch summary: {summary}")
+    return summary
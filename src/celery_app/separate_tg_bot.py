@@ -1,56 +1,219 @@
 import asyncio
 import logging
+import threading
+from collections.abc import Callable, Coroutine
+from concurrent.futures import Future
+from typing import TypeVar
 
 from aiogram import Bot
 from aiogram.exceptions import TelegramAPIError, TelegramRetryAfter
+from celery.concurrency import get_implementation
+from celery.concurrency.prefork import TaskPool as PreforkPool
+from celery.signals import (
+    worker_init,
+    worker_process_init,
+    worker_process_shutdown,
+    worker_shutdown,
+)
+from celery.worker import WorkController
 
+from src.bot.rate_limiter import TelegramRateLimiter
 from src.config.config import settings
 
 log = logging.getLogger(__name__)
 
-async def send_reminder_async(telegram_id: int, message: str) -> bool:
-    celery_bot = Bot(token=settings.TOKEN)
+T = TypeVar("T")
+
+
+async def send_reminder_async(
+        bot: Bot,
+        limiter: TelegramRateLimiter,
+        telegram_id: int,
+        message: str,
+) -> bool:
     max_retries = 3
-    try:
-        for attempt in range(max_retries):
-            try:
-                await celery_bot.send_message(
-                    chat_id=telegram_id,
-                    text=message,
-                )
-                log.info(f"Finish sending reminder to user {telegram_id}")
-                return True
-
-            except TelegramRetryAfter as e:
-                log.warning(f"Flood limit exceeded, sleeping for {e.retry_after} seconds")
-                await asyncio.sleep(e.retry_after)
+    for attempt in range(max_retries):
+        await limiter.acquire(telegram_id)
+        try:
+            await bot.send_message(
+                chat_id=telegram_id,
+                text=message,
+            )
+            log.info(f"Finish sending reminder to user {telegram_id}")
+            return True
+
+        except TelegramRetryAfter as e:
+            log.warning(f"Flood limit exceeded, sleeping for {e.retry_after} seconds")
+            limiter.flood_wait(e.retry_after)
+            continue
+
+        except TelegramAPIError as e:
+            log.error(f"Telegram API error for user {telegram_id}: {e}")
+            return False
+
+        except Exception as e:
+            log.error(
+                f"Unexpected error for user {telegram_id} (attempt {attempt + 1}): {e}",
+            )
+            if attempt < max_retries - 1:
+                await asyncio.sleep(2**attempt)
                 continue
+    log.error(
+        f"Failed to send message to user {telegram_id} after {max_retries} attempts",
+    )
+    return False
 
-            except TelegramAPIError as e:
-                log.error(f"Telegram API error for user {telegram_id}: {e}")
-                return False
-
-            except Exception as e:
-                log.error(
-                    f"Unexpected error for user {telegram_id} (attempt {attempt + 1}): {e}",
-                )
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(2**attempt)
-                    continue
-        log.error(
-            f"Failed to send message to user {telegram_id} after {max_retries} attempts",
-        )
-        return False
 
-    finally:
-        await celery_bot.session.close()
+class ReminderSender:
+    """
+    Event loop running in a background thread of the worker process, with one Bot
+
+    The loop and the Bot HTTP session live as long as the process, so reminders
+    reuse keep-alive connections instead of paying loop startup and TLS setup for
+    every message. Sync Celery tasks submit coroutines to the loop from any thread.
+    All sends of the process share one rate limiter and concurrency limit.
+    """
+
+    def __init__(
+            self,
+            make_bot: Callable[[], Bot],
+            global_rate: float,
+            chat_rate: float,
+            max_concurrent: int,
+    ) -> None:
+        """
+        Create the Bot with make_bot when the loop starts
+        """
+        self.make_bot = make_bot
+        self.global_rate = global_rate
+        self.chat_rate = chat_rate
+        self.max_concurrent = max_concurrent
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._bot: Bot | None = None
+        self._limiter: TelegramRateLimiter | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+
+    def start(self) -> None:
+        with self._lock:
+            if self._loop is not None:
+                return
+
+            loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=loop.run_forever,
+                name="reminder-sender",
+                daemon=True,
+            )
+            self._thread.start()
+            self._bot = self.make_bot()
+            # asyncio primitives are bound to the first loop using them
+            self._limiter = TelegramRateLimiter(self.global_rate, self.chat_rate)
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+            self._loop = loop
+            log.info("Reminder sender started")
+
+    def set_global_rate(self, rate: float) -> None:
+        """
+        Change the rate all sends of the process share
+        """
+        self.global_rate = rate
+        if self._limiter is not None:
+            self._limiter.set_global_rate(rate)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._loop is None:
+                return
+
+            if self._bot is not None:
+                asyncio.run_coroutine_threadsafe(self._bot.session.close(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            if self._thread is not None:
+                self._thread.join()
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+            self._bot = None
+            log.info("Reminder sender closed")
+
+    def submit(self, make_coro: Callable[[Bot], Coroutine[object, object, T]]) -> Future[T]:
+        """
+        Run the coroutine built for the shared Bot on the sender loop
+        """
+        if self._loop is None:
+            self.start()
+        assert self._loop is not None and self._bot is not None
+        return asyncio.run_coroutine_threadsafe(make_coro(self._bot), self._loop)
+
+    def send(self, telegram_id: int, message: str) -> bool:
+        return self.submit(lambda bot: self._send(bot, telegram_id, message)).result()
+
+    def send_many(self, messages: list[tuple[int, str]]) -> list[bool]:
+        """
+        Send (telegram_id, message) pairs concurrently, returning success of each
+        """
+        return self.submit(lambda bot: self._send_many(bot, messages)).result()
+
+    async def _send(self, bot: Bot, telegram_id: int, message: str) -> bool:
+        assert self._limiter is not None and self._semaphore is not None
+        async with self._semaphore:
+            return await send_reminder_async(bot, self._limiter, telegram_id, message)
+
+    async def _send_many(self, bot: Bot, messages: list[tuple[int, str]]) -> list[bool]:
+        return await asyncio.gather(*(
+            self._send(bot, telegram_id, message) for telegram_id, message in messages
+        ))
+
+
+reminder_sender = ReminderSender(
+    make_bot=lambda: Bot(token=settings.TOKEN),
+    global_rate=settings.TELEGRAM_GLOBAL_RATE,
+    chat_rate=settings.TELEGRAM_CHAT_RATE,
+    max_concurrent=settings.TELEGRAM_MAX_CONCURRENT_SENDS,
+)
+
+
+@worker_init.connect
+def split_reminder_rate(sender: WorkController, **kwargs: object) -> None:
+    """
+    Telegram limits the bot as a whole, so prefork child processes split the global rate
+
+    Runs in the parent before the pool forks, children inherit the divided rate.
+    """
+    pool = get_implementation(sender.pool_cls)
+    processes = sender.concurrency if issubclass(pool, PreforkPool) else 1
+    reminder_sender.set_global_rate(settings.TELEGRAM_GLOBAL_RATE / processes)
+    log.info(f"Reminder rate {reminder_sender.global_rate}/s per process, {processes} processes")
+
+
+@worker_process_init.connect
+def start_reminder_sender(**kwargs: object) -> None:
+    reminder_sender.start()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def close_reminder_sender(**kwargs: object) -> None:
+    reminder_sender.close()
 
 
 def send_reminder_sync(telegram_id: int, message: str) -> bool:
     log.info(f"Sending message to user {telegram_id}")
 
     try:
-        return asyncio.run(send_reminder_async(telegram_id, message))
+        return reminder_sender.send(telegram_id, message)
     except Exception as e:
         log.error(f"Error sending message to user {telegram_id}: {e}")
         return False
+
+
+def send_reminders_sync(messages: list[tuple[int, str]]) -> list[bool]:
+    log.info(f"Sending {len(messages)} reminders")
+
+    try:
+        return reminder_sender.send_many(messages)
+    except Exception as e:
+        log.error(f"Error sending batch of {len(messages)} reminders: {e}")
+        return [False] * len(messages)
@@ -29,6 +29,26 @@ class Settings(BaseSettings):
     RMQ_ROUTING_KEY: str
     MAIN_DOMEN: str
     START_MESSAGE_PHOTO_ID: str
+    GEO_INDEX_ENABLED: bool = False
+    GEO_INDEX_RELOAD_INTERVAL: float = 60
+    RECIPIENT_CACHE_TTL: int = 60
+    GEO_BULK_SERVICE_TOKEN: str | None = None
+    RMQ_CHANNEL_POOL_SIZE: int = 4
+    RMQ_MAX_IN_FLIGHT: int = 256
+    TELEGRAM_GLOBAL_RATE: float = 30
+    TELEGRAM_CHAT_RATE: float = 1
+    TELEGRAM_MAX_CONCURRENT_SENDS: int = 30
+    NOTIFICATION_CHUNK_SIZE: int = 100
+    OUTBOX_BATCH_SIZE: int = 500
+    OUTBOX_POLL_INTERVAL: float = 1.0
+    RMQ_CONSUMER_WORKERS: int = 1
+    RMQ_PREFETCH_COUNT: int = 10
+    NOTIFICATION_COALESCE_WINDOW: float = 1
+    NOTIFICATION_COMPACT_WIRE: bool = False
+    REMINDER_BATCH_SIZE: int = 500
+    REMINDER_SCAN_INTERVAL: int = 5
+    REMINDER_WINDOW_START_HOUR: int = 10
+    REMINDER_WINDOW_END_HOUR: int = 20
 
     model_config = SettingsConfigDict(
         env_file=os.path.join(BASE_DIR, ".env"),
@@ -0,0 +1,40 @@
+"""Add Geolocation coverage bbox for reverse radius search
+
+Revision ID: 5b2e9c7d41af
+Revises: 1cc4b59ad90e
+Create Date: 2025-06-10 14:12:41.503118
+
+"""
+from typing import Sequence, Union
+
+from geoalchemy2 import Geometry
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2e9c7d41af'
+down_revision: Union[str, None] = '1cc4b59ad90e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'geolocations',
+        sa.Column('coverage', Geometry(geometry_type='POLYGON', srid=4326, spatial_index=False), nullable=True),
+    )
+    op.execute("""
+        UPDATE geolocations
+        SET coverage = ST_Envelope(ST_Buffer(home_location, radius * 1.01)::geometry)
+        WHERE home_location IS NOT NULL AND radius IS NOT NULL
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_geolocations_coverage ON geolocations USING gist (coverage);
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS idx_geolocations_coverage")
+    op.drop_column('geolocations', 'coverage')
@@ -0,0 +1,58 @@
+"""Add geohash cell keys to geolocations and reports
+
+Revision ID: a83f5d2c96e1
+Revises: 5b2e9c7d41af
+Create Date: 2025-06-14 17:30:12.884305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a83f5d2c96e1'
+down_revision: Union[str, None] = '5b2e9c7d41af'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PRECISIONS = (4, 5, 6)
+FULL_PRECISION = max(PRECISIONS)
+COLUMNS = ', '.join(f'geohash_{precision}' for precision in PRECISIONS)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('geolocations', 'reports'):
+        for precision in PRECISIONS:
+            op.add_column(table, sa.Column(f'geohash_{precision}', sa.String(length=precision), nullable=True))
+            op.create_index(op.f(f'ix_{table}_geohash_{precision}'), table, [f'geohash_{precision}'], unique=False)
+
+    # Fill cell keys of existing rows, otherwise the geohash prefilter skips them
+    prefixes = ', '.join(f'left(cells.cell, {precision})' for precision in PRECISIONS)
+    op.execute(f"""
+        UPDATE geolocations g
+        SET ({COLUMNS}) = ({prefixes})
+        FROM (
+            SELECT id, ST_GeoHash(home_location::geometry, {FULL_PRECISION}) AS cell
+            FROM geolocations
+            WHERE home_location IS NOT NULL
+        ) AS cells
+        WHERE g.id = cells.id
+    """)
+    # Reports don't store their own location yet, so take the reporter's home cell keys
+    reporter_columns = ', '.join(f'g.geohash_{precision}' for precision in PRECISIONS)
+    op.execute(f"""
+        UPDATE reports r
+        SET ({COLUMNS}) = ({reporter_columns})
+        FROM geolocations g
+        WHERE g.user_id = r.user_id AND g.geohash_{FULL_PRECISION} IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('reports', 'geolocations'):
+        for precision in PRECISIONS:
+            op.drop_index(op.f(f'ix_{table}_geohash_{precision}'), table_name=table)
+            op.drop_column(table, f'geohash_{precision}')
@@ -0,0 +1,53 @@
+"""Add Report location & region
+
+Revision ID: c41f7a9e2d36
+Revises: a83f5d2c96e1
+Create Date: 2025-06-18 21:05:12.840217
+
+"""
+from typing import Sequence, Union
+
+from geoalchemy2 import Geography
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41f7a9e2d36'
+down_revision: Union[str, None] = 'a83f5d2c96e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'reports',
+        sa.Column('location', Geography(geometry_type='POINT', srid=4326, spatial_index=False), nullable=True),
+    )
+    op.add_column('reports', sa.Column('region', sa.String(), nullable=True))
+
+    # Existing reports were shown at the reporter's home, keep it that way
+    op.execute("""
+        UPDATE reports r
+        SET location = g.home_location, region = g.region
+        FROM geolocations g
+        WHERE g.user_id = r.user_id AND r.location IS NULL
+    """)
+
+    op.create_index(op.f('ix_reports_region'), 'reports', ['region'], unique=False)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_reports_location ON reports USING gist (location);
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_reports_active_location ON reports USING gist (location)
+        WHERE status = 'active';
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS idx_reports_active_location")
+    op.execute("DROP INDEX IF EXISTS idx_reports_location")
+    op.drop_index(op.f('ix_reports_region'), table_name='reports')
+    op.drop_column('reports', 'region')
+    op.drop_column('reports', 'location')
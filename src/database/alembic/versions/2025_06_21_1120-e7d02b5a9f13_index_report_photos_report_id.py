@@ -0,0 +1,26 @@
+"""Index ReportPhoto report_id
+
+Revision ID: e7d02b5a9f13
+Revises: c41f7a9e2d36
+Create Date: 2025-06-21 11:20:37.119546
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7d02b5a9f13'
+down_revision: Union[str, None] = 'c41f7a9e2d36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_reportphotos_report_id'), 'reportphotos', ['report_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_reportphotos_report_id'), table_name='reportphotos')
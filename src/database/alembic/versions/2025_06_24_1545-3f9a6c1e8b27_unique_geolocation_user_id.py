@@ -0,0 +1,34 @@
+"""Make Geolocation user_id unique for upserts
+
+Revision ID: 3f9a6c1e8b27
+Revises: e7d02b5a9f13
+Create Date: 2025-06-24 15:45:09.274410
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a6c1e8b27'
+down_revision: Union[str, None] = 'e7d02b5a9f13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep only the latest geolocation of every user
+    op.execute("""
+        DELETE FROM geolocations g
+        USING geolocations newer
+        WHERE newer.user_id = g.user_id AND newer.id > g.id
+    """)
+    op.drop_index(op.f('ix_geolocations_user_id'), table_name='geolocations')
+    op.create_index(op.f('ix_geolocations_user_id'), 'geolocations', ['user_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_geolocations_user_id'), table_name='geolocations')
+    op.create_index(op.f('ix_geolocations_user_id'), 'geolocations', ['user_id'], unique=False)
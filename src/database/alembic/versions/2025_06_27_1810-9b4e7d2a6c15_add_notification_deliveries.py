@@ -0,0 +1,42 @@
+"""Add Notification deliveries ledger
+
+Revision ID: 9b4e7d2a6c15
+Revises: 3f9a6c1e8b27
+Create Date: 2025-06-27 18:10:44.518302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4e7d2a6c15'
+down_revision: Union[str, None] = '3f9a6c1e8b27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('notification_deliveries',
+    sa.Column('notification_id', sa.Integer(), nullable=False),
+    sa.Column('telegram_id', sa.BigInteger(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['notification_id'], ['notifications.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('notification_id', 'telegram_id')
+    )
+
+    # Notifications sent before the ledger existed were counted as delivered to everyone
+    op.execute("""
+        INSERT INTO notification_deliveries (notification_id, telegram_id, status, attempts, updated_at)
+        SELECT DISTINCT n.id, r.telegram_id, 'delivered', 1, n.updated_at
+        FROM notifications n, unnest(n.recipient_ids) AS r(telegram_id)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('notification_deliveries')
@@ -0,0 +1,30 @@
+"""Index Pet next treatment dates
+
+Revision ID: 6a2f8e1c4d70
+Revises: d5c8a1f4e7b3
+Create Date: 2025-07-03 09:40:12.584306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '6a2f8e1c4d70'
+down_revision: Union[str, None] = 'd5c8a1f4e7b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_pets_next_vaccination'), 'pets', ['next_vaccination'], unique=False)
+    op.create_index(op.f('ix_pets_next_parasite_treatment'), 'pets', ['next_parasite_treatment'], unique=False)
+    op.create_index(op.f('ix_pets_next_fleas_ticks_treatment'), 'pets', ['next_fleas_ticks_treatment'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_pets_next_fleas_ticks_treatment'), table_name='pets')
+    op.drop_index(op.f('ix_pets_next_parasite_treatment'), table_name='pets')
+    op.drop_index(op.f('ix_pets_next_vaccination'), table_name='pets')
@@ -0,0 +1,34 @@
+"""Add Reminder logs
+
+Revision ID: b81d3e5f9a24
+Revises: 6a2f8e1c4d70
+Create Date: 2025-07-06 14:30:51.207713
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81d3e5f9a24'
+down_revision: Union[str, None] = '6a2f8e1c4d70'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('reminder_logs',
+    sa.Column('pet_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('due_date', sa.Date(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['pet_id'], ['pets.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('pet_id', 'kind', 'due_date')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('reminder_logs')
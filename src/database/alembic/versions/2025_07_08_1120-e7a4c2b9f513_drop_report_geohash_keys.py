@@ -0,0 +1,48 @@
+"""Drop geohash cell keys of reports
+
+Revision ID: e7a4c2b9f513
+Revises: b81d3e5f9a24
+Create Date: 2025-07-08 11:20:37.415062
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a4c2b9f513'
+down_revision: Union[str, None] = 'b81d3e5f9a24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PRECISIONS = (4, 5, 6)
+FULL_PRECISION = max(PRECISIONS)
+COLUMNS = ', '.join(f'geohash_{precision}' for precision in PRECISIONS)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nearby reports are searched by reports.location with its GiST index
+    for precision in PRECISIONS:
+        op.drop_index(op.f(f'ix_reports_geohash_{precision}'), table_name='reports')
+        op.drop_column('reports', f'geohash_{precision}')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for precision in PRECISIONS:
+        op.add_column('reports', sa.Column(f'geohash_{precision}', sa.String(length=precision), nullable=True))
+        op.create_index(op.f(f'ix_reports_geohash_{precision}'), 'reports', [f'geohash_{precision}'], unique=False)
+
+    prefixes = ', '.join(f'left(cells.cell, {precision})' for precision in PRECISIONS)
+    op.execute(f"""
+        UPDATE reports r
+        SET ({COLUMNS}) = ({prefixes})
+        FROM (
+            SELECT id, ST_GeoHash(location::geometry, {FULL_PRECISION}) AS cell
+            FROM reports
+            WHERE location IS NOT NULL
+        ) AS cells
+        WHERE r.id = cells.id
+    """)
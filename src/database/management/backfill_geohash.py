@@ -0,0 +1,61 @@
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import TextClause, text
+
+from src.config.config import settings
+from src.database.models.base_model import async_session_maker
+from src.services.geohash import GEOHASH_PRECISIONS
+
+log = logging.getLogger(__name__)
+
+FULL_PRECISION = max(GEOHASH_PRECISIONS)
+GEOHASH_COLUMNS = ", ".join(f"geohash_{precision}" for precision in GEOHASH_PRECISIONS)
+CELL_PREFIXES = ", ".join(f"left(batch.cell, {precision})" for precision in GEOHASH_PRECISIONS)
+
+GEOLOCATIONS_QUERY = text(f"""
+    WITH batch AS (
+        SELECT id, ST_GeoHash(home_location::geometry, {FULL_PRECISION}) AS cell
+        FROM geolocations
+        WHERE home_location IS NOT NULL AND geohash_{FULL_PRECISION} IS NULL
+        ORDER BY id
+        LIMIT :batch_size
+    )
+    UPDATE geolocations g
+    SET ({GEOHASH_COLUMNS}) = ({CELL_PREFIXES})
+    FROM batch
+    WHERE g.id = batch.id
+""")
+
+
+async def backfill(name: str, query: TextClause, batch_size: int) -> int:
+    total = 0
+    while True:
+        async with async_session_maker() as session:
+            result = await session.execute(query, {"batch_size": batch_size})
+            await session.commit()
+
+        updated = result.rowcount  # type: ignore[attr-defined]
+        total += updated
+        log.info(f"Backfilled {total} {name}")
+        if updated < batch_size:
+            return total
+
+
+async def main(batch_size: int) -> None:
+    settings.configure_logging()
+    await backfill("geolocations", GEOLOCATIONS_QUERY, batch_size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fill geohash cell keys of existing rows")
+    parser.add_argument(
+        "-batch",
+        type=int,
+        default=5000,
+        help="Number of rows updated per transaction",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(main(args.batch))
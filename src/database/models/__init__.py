@@ -1,7 +1,10 @@
 from .geo import GeoLocation
-from .notification import Notification
+from .notification import DeliveryStatus, Notification, NotificationDelivery
+from .outbox import OutboxMessage
 from .pet import Pet
+from .reminder import ReminderKind, ReminderLog
 from .report import Report, ReportPhoto, ReportStatus
 from .user import User
 
-__all__ = ["Pet", "Report", "ReportStatus", "User", "GeoLocation", "ReportPhoto", "Notification"]
+__all__ = ["Pet", "Report", "ReportStatus", "User", "GeoLocation", "ReportPhoto", "Notification",
+           "NotificationDelivery", "DeliveryStatus", "OutboxMessage", "ReminderKind", "ReminderLog"]
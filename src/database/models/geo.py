@@ -1,8 +1,8 @@
 from enum import Enum
 from typing import TYPE_CHECKING
 
-from geoalchemy2 import Geography
-from sqlalchemy import ForeignKey
+from geoalchemy2 import Geography, Geometry
+from sqlalchemy import ForeignKey, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base_model import Base
@@ -33,11 +33,23 @@ class GeoLocation(Base):
     )
     use_current_location: Mapped[bool] = mapped_column(default=False)
 
+    # Geohash cell keys of home_location for coarse spatial prefilter
+    geohash_4: Mapped[str] = mapped_column(String(4), nullable=True, index=True)
+    geohash_5: Mapped[str] = mapped_column(String(5), nullable=True, index=True)
+    geohash_6: Mapped[str] = mapped_column(String(6), nullable=True, index=True)
+
+    # Bounding box of the circle (home_location, radius), GiST-indexed for reverse radius search
+    coverage: Mapped[Geometry] = mapped_column(
+        Geometry(geometry_type="POLYGON", srid=4326),
+        nullable=True,
+    )
+
     # Relationships
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id"),
         nullable=False,
         index=True,
+        unique=True,
     )
     user: Mapped["User"] = relationship(
         back_populates="geolocation",
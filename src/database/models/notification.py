@@ -1,4 +1,5 @@
 from datetime import datetime, timezone
+from enum import Enum
 from typing import TYPE_CHECKING
 
 from sqlalchemy import ARRAY, BigInteger, DateTime, ForeignKey
@@ -9,6 +10,14 @@ from .base_model import Base
 if TYPE_CHECKING:  # Only for mypy
     from src.database.models import Report, User
 
+class DeliveryStatus(str, Enum):
+    DELIVERED = "delivered"
+    # Telegram rejected the message for good, e.g. the user blocked the bot
+    FAILED = "failed"
+    # Network or server error, the next attempt may succeed
+    RETRYING = "retrying"
+
+
 class Notification(Base):
 
     # Main fields
@@ -47,3 +56,30 @@ class Notification(Base):
         back_populates="notification",
         passive_deletes=True,
     )
+    deliveries: Mapped[list["NotificationDelivery"]] = relationship(
+        back_populates="notification",
+        passive_deletes=True,
+    )
+
+
+class NotificationDelivery(Base):
+    """
+    Delivery ledger: outcome of sending a notification to one recipient
+    """
+
+    __tablename__ = "notification_deliveries"  # type: ignore[assignment]
+
+    notification_id: Mapped[int] = mapped_column(
+        ForeignKey("notifications.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    telegram_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    status: Mapped[str] = mapped_column(nullable=False)
+    attempts: Mapped[int] = mapped_column(nullable=False, default=1)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+    notification: Mapped["Notification"] = relationship(back_populates="deliveries")
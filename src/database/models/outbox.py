@@ -0,0 +1,24 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import BigInteger, DateTime, LargeBinary
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base_model import Base
+
+
+class OutboxMessage(Base):
+    """
+    Broker message written in the same transaction as the data it announces
+
+    Rows are published and deleted by the outbox relay.
+    """
+
+    __tablename__ = "outbox_messages"  # type: ignore[assignment]
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    routing_key: Mapped[str] = mapped_column(nullable=False)
+    body: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(UTC),
+    )
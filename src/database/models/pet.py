@@ -46,6 +46,7 @@ class Pet(Base):
     next_vaccination: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True),
         nullable=True,
+        index=True,
     )
     last_parasite_treatment: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True),
@@ -54,6 +55,7 @@ class Pet(Base):
     next_parasite_treatment: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True),
         nullable=True,
+        index=True,
     )
     last_fleas_ticks_treatment: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True),
@@ -62,6 +64,7 @@ class Pet(Base):
     next_fleas_ticks_treatment: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True),
         nullable=True,
+        index=True,
     )
 
     # Relationships
@@ -0,0 +1,32 @@
+from datetime import UTC, date, datetime
+from enum import Enum
+
+from sqlalchemy import Date, DateTime, ForeignKey, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base_model import Base
+
+
+class ReminderKind(str, Enum):
+    VACCINATION = "vaccination"
+    PARASITE = "parasite"
+    FLEAS_TICKS = "fleas_ticks"
+
+
+class ReminderLog(Base):
+    """
+    Treatment reminder of a pet already queued for its due date
+    """
+
+    __tablename__ = "reminder_logs"  # type: ignore[assignment]
+
+    pet_id: Mapped[int] = mapped_column(
+        ForeignKey("pets.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    kind: Mapped[str] = mapped_column(String, primary_key=True)
+    due_date: Mapped[date] = mapped_column(Date, primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(UTC),
+    )
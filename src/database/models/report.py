@@ -2,7 +2,8 @@ from datetime import datetime, timezone
 from enum import Enum
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, ForeignKey
+from geoalchemy2 import Geography
+from sqlalchemy import DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base_model import Base
@@ -19,11 +20,20 @@ class ReportStatus(str, Enum):
 class ReportPhoto(Base):
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     url: Mapped[str] = mapped_column(nullable=False)
-    report_id: Mapped[int] = mapped_column(ForeignKey("reports.id"), nullable=False)
+    report_id: Mapped[int] = mapped_column(ForeignKey("reports.id"), nullable=False, index=True)
     report: Mapped["Report"] = relationship(back_populates="photos")
 
 
 class Report(Base):
+    __table_args__ = (
+        # Nearby feed only ever looks for active reports
+        Index(
+            "idx_reports_active_location",
+            "location",
+            postgresql_using="gist",
+            postgresql_where=text("status = 'active'"),
+        ),
+    )
 
     # Main fields
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
@@ -40,6 +50,13 @@ class Report(Base):
         onupdate=lambda: datetime.now(timezone.utc),
     )
 
+    # Where the pet was lost, fixed at report creation
+    location: Mapped[Geography] = mapped_column(
+        Geography(geometry_type="POINT", srid=4326),
+        nullable=True,
+    )
+    region: Mapped[str | None] = mapped_column(nullable=True, index=True)
+
     # Relationships
     user_id: Mapped[int | None] = mapped_column(
         ForeignKey("users.id", ondelete="SET NULL"),
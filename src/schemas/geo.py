@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Annotated
+import struct
+from typing import TYPE_CHECKING, Annotated, NamedTuple
 
 from geoalchemy2.types import WKBElement
 from pydantic import BaseModel, ConfigDict, Field, field_validator
@@ -12,6 +13,44 @@ if TYPE_CHECKING:
     from .user import User
 
 
+WKB_SRID_FLAG = 0x20000000
+
+
+class GeoPoint(NamedTuple):
+    """
+    Longitude/latitude of a geography POINT, decoded once and passed around as floats
+    """
+
+    lon: float
+    lat: float
+
+    @classmethod
+    def from_wkb(cls, wkb: WKBElement | bytes | memoryview | str) -> GeoPoint:
+        """
+        Decode (E)WKB POINT as returned for geography columns without going through WKT
+        """
+        data = wkb.data if isinstance(wkb, WKBElement) else wkb
+        raw = bytes.fromhex(data) if isinstance(data, str) else bytes(data)
+
+        byte_order = "<" if raw[0] else ">"
+        (wkb_type,) = struct.unpack_from(f"{byte_order}I", raw, 1)
+        offset = 9 if wkb_type & WKB_SRID_FLAG else 5
+        return cls(*struct.unpack_from(f"{byte_order}2d", raw, offset))
+
+    @classmethod
+    def from_wkt(cls, wkt: str) -> GeoPoint:
+        """
+        "POINT(lon lat)" or "lon lat" -> GeoPoint, for text coming from the outside
+        """
+        coords = wkt[6:-1] if wkt.startswith("POINT") else wkt
+        lon, lat = coords.split(" ")
+        return cls(float(lon), float(lat))
+
+    @property
+    def wkt(self) -> str:
+        return f"POINT({self.lon} {self.lat})"
+
+
 class GeolocationBase(BaseModel):
     region: str = Field(
         min_length=3,
@@ -70,9 +109,35 @@ class GeolocationUpdate(BaseModel):
             raise ValueError("Geography object home_location must be a valid WKT POINT string")
         return value
 
+class GeolocationUpsert(GeolocationCreate):
+    """
+    Schema for bulk creating or replacing users' geolocations
+    """
+
+    user_id: int = Field(description="Geolocation owner ID")
+    filter_type: GeoFilterType = Field(
+        default=GeoFilterType.RADIUS,
+        description="Chosen filter type for searching",
+    )
+    use_current_location: bool = Field(
+        default=False,
+        description="Whether home location follows the current one",
+    )
+
 class Geolocation(GeolocationBase):
     id: int = Field(description="Geography ID")
     filter_type: GeoFilterType = Field(description="Chosen filter type for searching")
+    home_point: GeoPoint | None = Field(
+        default=None,
+        description="Home location coordinates, decoded from the raw column",
+        exclude=True,
+    )
+
+    @field_validator("home_point", mode="before")
+    def decode_home_point(cls, value: object) -> object:
+        if isinstance(value, WKBElement | bytes | memoryview):
+            return GeoPoint.from_wkb(value)
+        return value
 
     model_config = ConfigDict(from_attributes=True, arbitrary_types_allowed=True)
 
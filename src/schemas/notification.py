@@ -64,5 +64,7 @@ class NotificationWithUrl(Notification):
     """
 
     url: str = Field(description="Report URL of notification")
+    chunk: int = Field(default=0, description="Index of this recipients chunk")
+    chunks: int = Field(default=1, description="Number of chunks the recipients are split into")
 
 
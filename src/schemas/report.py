@@ -113,6 +113,21 @@ class ReportBasePhoto(ReportBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ReportNearest(BaseModel):
+    """
+    Active report found around the user, only the fields the nearby feed shows
+    """
+
+    id: int = Field(description="Unique report ID")
+    title: str = Field(description="Report title")
+    content: str = Field(description="Report content")
+    status: ReportStatus = Field(description="Report status")
+    region: str | None = Field(default=None, description="Report region")
+    location: str = Field(description="Report location WKT")
+    distance: float = Field(description="Distance from the user in meters")
+    first_photo_url: str | None = Field(default=None, description="Url of the first photo")
+
+
 class ReportPhotoUpdate(BaseModel):
     """
     Schema for updating Report Photo
@@ -0,0 +1,477 @@
+import asyncio
+import contextlib
+import logging
+import math
+from collections.abc import Iterator, Sequence
+from typing import Any
+
+from geoalchemy2 import Geometry
+from sqlalchemy import Row, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.config.config import settings
+from src.database.models import GeoLocation as GeoLocation_db
+from src.database.models import User as User_db
+from src.database.models.base_model import async_session_maker
+from src.database.models.geo import GeoFilterType
+
+logger = logging.getLogger(__name__)
+
+Cell = tuple[int, int]
+Entry = tuple[float, float, int, int | None]  # lon, lat, telegram_id, radius
+
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_B = (1 - WGS84_F) * WGS84_A
+
+# spheroid_distance error is below 0.1% up to a couple of degrees, 1% leaves a wide margin
+PLANAR_TOLERANCE = 0.01
+PLANAR_MAX_DISTANCE = 200_000
+
+
+def parse_wkt_polygon(wkt: str) -> list[list[tuple[float, float]]]:
+    """
+    "POLYGON((lon lat, ...),(lon lat, ...))" -> rings of (lon, lat), exterior ring first
+    """
+    body = wkt[wkt.index("(") + 1:wkt.rindex(")")]
+    rings = []
+    for raw_ring in body.split("),"):
+        ring = []
+        for pair in raw_ring.strip(" ()").split(","):
+            lon, lat = pair.split()
+            ring.append((float(lon), float(lat)))
+        rings.append(ring)
+    return rings
+
+
+def metres_per_degree(lat: float) -> tuple[float, float]:
+    """
+    Length of one latitude/longitude degree in metres on the WGS84 spheroid (FCC formula)
+    """
+    phi = math.radians(lat)
+    lat_m = 111132.09 - 566.05 * math.cos(2 * phi) + 1.20 * math.cos(4 * phi)
+    lon_m = 111415.13 * math.cos(phi) - 94.55 * math.cos(3 * phi) + 0.12 * math.cos(5 * phi)
+    return lat_m, lon_m
+
+
+def spheroid_distance(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
+    """
+    Distance in metres, close to ST_Distance(use_spheroid=True) for city-scale distances
+    """
+    lat_m, lon_m = metres_per_degree((lat1 + lat2) / 2)
+    return math.hypot((lat2 - lat1) * lat_m, (lon2 - lon1) * lon_m)
+
+
+def geodesic_distance(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
+    """
+    Distance in metres on the WGS84 spheroid (Vincenty), as ST_Distance(use_spheroid=True)
+    """
+    big_l = math.radians(lon2 - lon1)
+    u1 = math.atan((1 - WGS84_F) * math.tan(math.radians(lat1)))
+    u2 = math.atan((1 - WGS84_F) * math.tan(math.radians(lat2)))
+    sin_u1, cos_u1 = math.sin(u1), math.cos(u1)
+    sin_u2, cos_u2 = math.sin(u2), math.cos(u2)
+
+    lam = big_l
+    for _ in range(100):
+        sin_lam, cos_lam = math.sin(lam), math.cos(lam)
+        sin_sigma = math.hypot(cos_u2 * sin_lam, cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lam)
+        if sin_sigma == 0:
+            return 0.0
+        cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lam
+        sigma = math.atan2(sin_sigma, cos_sigma)
+        sin_alpha = cos_u1 * cos_u2 * sin_lam / sin_sigma
+        cos2_alpha = 1 - sin_alpha ** 2
+        cos_2sm = cos_sigma - 2 * sin_u1 * sin_u2 / cos2_alpha if cos2_alpha else 0.0
+        c = WGS84_F / 16 * cos2_alpha * (4 + WGS84_F * (4 - 3 * cos2_alpha))
+        lam_prev = lam
+        lam = big_l + (1 - c) * WGS84_F * sin_alpha * (
+            sigma + c * sin_sigma * (cos_2sm + c * cos_sigma * (-1 + 2 * cos_2sm ** 2))
+        )
+        if abs(lam - lam_prev) < 1e-12:
+            break
+
+    u_sq = cos2_alpha * (WGS84_A ** 2 - WGS84_B ** 2) / WGS84_B ** 2
+    big_a = 1 + u_sq / 16384 * (4096 + u_sq * (-768 + u_sq * (320 - 175 * u_sq)))
+    big_b = u_sq / 1024 * (256 + u_sq * (-128 + u_sq * (74 - 47 * u_sq)))
+    delta_sigma = big_b * sin_sigma * (cos_2sm + big_b / 4 * (
+        cos_sigma * (-1 + 2 * cos_2sm ** 2)
+        - big_b / 6 * cos_2sm * (-3 + 4 * sin_sigma ** 2) * (-3 + 4 * cos_2sm ** 2)
+    ))
+    return WGS84_B * big_a * (sigma - delta_sigma)
+
+
+def within_distance(lon1: float, lat1: float, lon2: float, lat2: float, radius: float) -> bool:
+    """
+    Check ST_DWithin(use_spheroid=True): decide by the cheap estimate unless it is close
+
+    Up to PLANAR_MAX_DISTANCE the estimate is off by well under PLANAR_TOLERANCE, so
+    only points near the edge of the circle need the exact geodesic distance.
+    """
+    estimate = spheroid_distance(lon1, lat1, lon2, lat2)
+    if estimate <= PLANAR_MAX_DISTANCE:
+        if estimate < radius * (1 - PLANAR_TOLERANCE):
+            return True
+        if estimate > radius * (1 + PLANAR_TOLERANCE):
+            return False
+    return geodesic_distance(lon1, lat1, lon2, lat2) <= radius
+
+
+class PreparedPolygon:
+    """
+    Polygon prepared for repeated point-in-polygon tests
+
+    Edges of all rings are split into horizontal bands, so the even-odd ray casting
+    only walks the edges of the band the point falls into.
+    """
+
+    __slots__ = ("min_lon", "min_lat", "max_lon", "max_lat", "_band_height", "_bands")
+
+    def __init__(self, rings: list[list[tuple[float, float]]]) -> None:
+        """
+        Rings of (lon, lat), exterior ring first, then holes
+        """
+        exterior = rings[0]
+        self.min_lon = min(lon for lon, _ in exterior)
+        self.max_lon = max(lon for lon, _ in exterior)
+        self.min_lat = min(lat for _, lat in exterior)
+        self.max_lat = max(lat for _, lat in exterior)
+
+        edges = [
+            (lon1, lat1, lon2, lat2)
+            for ring in rings
+            for (lon1, lat1), (lon2, lat2) in zip(ring, ring[1:] + ring[:1])
+            if lat1 != lat2
+        ]
+        band_count = max(1, len(edges) // 4)
+        self._band_height = (self.max_lat - self.min_lat) / band_count or 1.0
+        self._bands: list[list[tuple[float, float, float, float]]] = [
+            [] for _ in range(band_count)
+        ]
+        for edge in edges:
+            low, high = sorted((edge[1], edge[3]))
+            for band in range(self._band(low), self._band(high) + 1):
+                self._bands[band].append(edge)
+
+    @classmethod
+    def from_wkt(cls, wkt: str) -> "PreparedPolygon":
+        return cls(parse_wkt_polygon(wkt))
+
+    def _band(self, lat: float) -> int:
+        band = int((lat - self.min_lat) / self._band_height)
+        return min(max(band, 0), len(self._bands) - 1)
+
+    def contains(self, lon: float, lat: float) -> bool:
+        if not (self.min_lon <= lon <= self.max_lon and self.min_lat <= lat <= self.max_lat):
+            return False
+
+        inside = False
+        for lon1, lat1, lon2, lat2 in self._bands[self._band(lat)]:
+            if (lat1 > lat) != (lat2 > lat):
+                if lon < lon1 + (lat - lat1) * (lon2 - lon1) / (lat2 - lat1):
+                    inside = not inside
+        return inside
+
+
+class GeoGridIndex:
+    """
+    In-memory grid index over users' home locations
+
+    Points are bucketed into square cells of `cell_size` degrees, so radius lookup
+    only checks points from cells that overlap the bounding box of the search circle.
+    The own circle (home location + radius) of every RADIUS subscriber and the polygon
+    of every POLYGON subscriber are also registered in all `coverage_cell_size` cells
+    their bounding boxes overlap, so "whose circles / polygons contain this point" is
+    answered by a single cell lookup.
+    """
+
+    def __init__(self, cell_size: float = 0.05, coverage_cell_size: float = 0.1) -> None:
+        """
+        cell_size, coverage_cell_size - grid cell sides in degrees
+        """
+        self.cell_size = cell_size
+        self.coverage_cell_size = coverage_cell_size
+        self.ready = False
+        self._cells: dict[Cell, dict[int, Entry]] = {}
+        self._coverage: dict[Cell, dict[int, Entry]] = {}
+        self._user_cell: dict[int, Cell] = {}
+        self._user_coverage: dict[int, list[Cell]] = {}
+        self._polygons: dict[Cell, dict[int, tuple[PreparedPolygon, int]]] = {}
+        self._user_polygon_cells: dict[int, list[Cell]] = {}
+        # Users changed while a rebuild is running, their state is carried into the new index
+        self._changed_during_load: set[int] | None = None
+
+    def __len__(self) -> int:
+        return len(self._user_cell)
+
+    @staticmethod
+    def _grid_cell(lon: float, lat: float, size: float) -> Cell:
+        return math.floor(lon / size), math.floor(lat / size)
+
+    def _cell(self, lon: float, lat: float) -> Cell:
+        return self._grid_cell(lon, lat, self.cell_size)
+
+    def _cells_in_bbox(
+            self,
+            lon: float,
+            lat: float,
+            radius: float,
+            size: float,
+    ) -> Iterator[Cell]:
+        # The margin keeps points the exact check may still accept, and a degree of
+        # longitude is shortest on the side of the circle farther from the equator
+        radius *= 1 + PLANAR_TOLERANCE
+        lat_m, _ = metres_per_degree(lat)
+        d_lat = radius / lat_m
+        _, lon_m = metres_per_degree(min(abs(lat) + d_lat, 89.9))
+        d_lon = radius / max(lon_m, 1.0)
+
+        min_x, min_y = self._grid_cell(lon - d_lon, lat - d_lat, size)
+        max_x, max_y = self._grid_cell(lon + d_lon, lat + d_lat, size)
+        for x in range(min_x, max_x + 1):
+            for y in range(min_y, max_y + 1):
+                yield x, y
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._coverage.clear()
+        self._user_cell.clear()
+        self._user_coverage.clear()
+        self._polygons.clear()
+        self._user_polygon_cells.clear()
+        self.ready = False
+
+    def upsert(
+            self,
+            user_id: int,
+            telegram_id: int,
+            lon: float,
+            lat: float,
+            radius: int | None = None,
+            filter_type: GeoFilterType = GeoFilterType.RADIUS,
+    ) -> None:
+        self.remove(user_id)
+        self._mark_changed(user_id)
+        entry = (lon, lat, telegram_id, radius)
+
+        cell = self._cell(lon, lat)
+        self._cells.setdefault(cell, {})[user_id] = entry
+        self._user_cell[user_id] = cell
+
+        if radius and filter_type == GeoFilterType.RADIUS:
+            coverage = list(self._cells_in_bbox(lon, lat, radius, self.coverage_cell_size))
+            for coverage_cell in coverage:
+                self._coverage.setdefault(coverage_cell, {})[user_id] = entry
+            self._user_coverage[user_id] = coverage
+
+    def upsert_polygon(self, user_id: int, telegram_id: int, polygon: PreparedPolygon) -> None:
+        self.remove_polygon(user_id)
+        self._mark_changed(user_id)
+
+        size = self.coverage_cell_size
+        min_x, min_y = self._grid_cell(polygon.min_lon, polygon.min_lat, size)
+        max_x, max_y = self._grid_cell(polygon.max_lon, polygon.max_lat, size)
+        cells = [(x, y) for x in range(min_x, max_x + 1) for y in range(min_y, max_y + 1)]
+        for cell in cells:
+            self._polygons.setdefault(cell, {})[user_id] = (polygon, telegram_id)
+        self._user_polygon_cells[user_id] = cells
+
+    def remove_polygon(self, user_id: int) -> None:
+        self._mark_changed(user_id)
+        for cell in self._user_polygon_cells.pop(user_id, []):
+            self._discard(self._polygons, cell, user_id)
+
+    def remove(self, user_id: int) -> None:
+        self.remove_polygon(user_id)
+
+        cell = self._user_cell.pop(user_id, None)
+        if cell is None:
+            return
+        self._discard(self._cells, cell, user_id)
+
+        for coverage_cell in self._user_coverage.pop(user_id, []):
+            self._discard(self._coverage, coverage_cell, user_id)
+
+    def _mark_changed(self, user_id: int) -> None:
+        if self._changed_during_load is not None:
+            self._changed_during_load.add(user_id)
+
+    def _copy_user(self, user_id: int, target: "GeoGridIndex") -> None:
+        """
+        Replace user's entries in target with the ones from this index
+        """
+        target.remove(user_id)
+        cell = self._user_cell.get(user_id)
+        if cell is not None:
+            lon, lat, telegram_id, radius = self._cells[cell][user_id]
+            filter_type = (
+                GeoFilterType.RADIUS if user_id in self._user_coverage else GeoFilterType.REGION
+            )
+            target.upsert(user_id, telegram_id, lon, lat, radius, filter_type)
+        polygon_cells = self._user_polygon_cells.get(user_id)
+        if polygon_cells:
+            polygon, telegram_id = self._polygons[polygon_cells[0]][user_id]
+            target.upsert_polygon(user_id, telegram_id, polygon)
+
+    def _swap(self, other: "GeoGridIndex") -> None:
+        self._cells = other._cells
+        self._coverage = other._coverage
+        self._user_cell = other._user_cell
+        self._user_coverage = other._user_coverage
+        self._polygons = other._polygons
+        self._user_polygon_cells = other._user_polygon_cells
+
+    @staticmethod
+    def _discard(grid: dict[Cell, dict[int, Any]], cell: Cell, user_id: int) -> None:
+        bucket = grid[cell]
+        del bucket[user_id]
+        if not bucket:
+            del grid[cell]
+
+    def within_radius(self, lon: float, lat: float, radius: float) -> list[int]:
+        """
+        Telegram IDs of users whose home location is within radius (metres) of the point
+        """
+        telegram_ids = []
+        for cell in self._cells_in_bbox(lon, lat, radius, self.cell_size):
+            bucket = self._cells.get(cell)
+            if not bucket:
+                continue
+            for p_lon, p_lat, telegram_id, _ in bucket.values():
+                if within_distance(lon, lat, p_lon, p_lat, radius):
+                    telegram_ids.append(telegram_id)
+
+        telegram_ids.sort()
+        return telegram_ids
+
+    def covering(self, lon: float, lat: float) -> list[int]:
+        """
+        Telegram IDs of RADIUS subscribers whose radius around home location contains the point
+        """
+        bucket = self._coverage.get(self._grid_cell(lon, lat, self.coverage_cell_size))
+        if not bucket:
+            return []
+
+        telegram_ids = [
+            telegram_id
+            for p_lon, p_lat, telegram_id, radius in bucket.values()
+            if radius and within_distance(lon, lat, p_lon, p_lat, radius)
+        ]
+        telegram_ids.sort()
+        return telegram_ids
+
+    def in_polygons(self, lon: float, lat: float) -> list[int]:
+        """
+        Telegram IDs of users whose polygon filter contains the point
+        """
+        bucket = self._polygons.get(self._grid_cell(lon, lat, self.coverage_cell_size))
+        if not bucket:
+            return []
+
+        telegram_ids = [
+            telegram_id
+            for polygon, telegram_id in bucket.values()
+            if polygon.contains(lon, lat)
+        ]
+        telegram_ids.sort()
+        return telegram_ids
+
+    async def load(self, session: AsyncSession) -> int:
+        """
+        Rebuild the index from all geolocations in db
+
+        The new index is built in a worker thread and replaces the current one only once
+        it is complete, so lookups keep using the previous snapshot meanwhile and after
+        a failed rebuild. Changes made through this index during the rebuild are kept.
+        """
+        point = cast(GeoLocation_db.home_location, Geometry)
+        query = (
+            select(
+                GeoLocation_db.user_id,
+                User_db.telegram_id,
+                func.ST_X(point),
+                func.ST_Y(point),
+                GeoLocation_db.radius,
+                GeoLocation_db.filter_type,
+                func.ST_AsText(GeoLocation_db.polygon),
+            )
+            .join(User_db, GeoLocation_db.user)
+            .where(GeoLocation_db.home_location.is_not(None))
+        )
+        self._changed_during_load = set()
+        try:
+            rows = (await session.execute(query)).all()
+            fresh = await asyncio.to_thread(self._build, rows)
+            for user_id in self._changed_during_load:
+                self._copy_user(user_id, fresh)
+        finally:
+            self._changed_during_load = None
+
+        self._swap(fresh)
+        self.ready = True
+
+        logger.info(f"Geo index loaded: {len(self)} home locations")
+        return len(self)
+
+    def _build(self, rows: Sequence[Row]) -> "GeoGridIndex":
+        fresh = GeoGridIndex(self.cell_size, self.coverage_cell_size)
+        for user_id, telegram_id, lon, lat, radius, filter_type, polygon in rows:
+            fresh.upsert(user_id, telegram_id, lon, lat, radius, filter_type)
+            if filter_type == GeoFilterType.POLYGON and polygon:
+                fresh.upsert_polygon(user_id, telegram_id, PreparedPolygon.from_wkt(polygon))
+        return fresh
+
+
+class GeoIndexReloader:
+    """
+    Background task rebuilding the index from db every interval seconds
+
+    Writes made through this process update the index right away. Changes made by
+    other web workers, the bot or directly in db show up after the next reload.
+    """
+
+    def __init__(
+            self,
+            index: GeoGridIndex,
+            session_maker: async_sessionmaker[AsyncSession],
+            interval: float,
+    ) -> None:
+        """
+        Reload index with a session from session_maker every interval seconds
+        """
+        self.index = index
+        self.session_maker = session_maker
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Geo index reloads started, interval = {self.interval}s")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        logger.info("Geo index reloads stopped")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                async with self.session_maker() as session:
+                    await self.index.load(session)
+            except Exception as e:
+                # load() swaps only a complete index, so the previous snapshot stays in use
+                logger.error(f"Failed to reload geo index: {e}")
+
+
+geo_index = GeoGridIndex()
+geo_index_reloader = GeoIndexReloader(
+    index=geo_index,
+    session_maker=async_session_maker,
+    interval=settings.GEO_INDEX_RELOAD_INTERVAL,
+)
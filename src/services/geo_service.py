@@ -1,30 +1,137 @@
 import logging
+from typing import Any
 
 from fastapi import HTTPException
-from geoalchemy2 import WKTElement, functions
-from sqlalchemy import func, select, text
+from geoalchemy2 import Geography, Geometry, WKTElement, functions
+from sqlalchemy import ColumnElement, Integer, Select, any_, cast, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import InstrumentedAttribute, QueryableAttribute, selectinload
+from sqlalchemy.sql.dml import ReturningInsert
 
 from src.database.models import GeoLocation as GeoLocation_db
-from src.database.models import Report as Report_db
-from src.database.models import ReportStatus
 from src.database.models import User as User_db
 from src.database.models.geo import GeoFilterType
-from src.schemas import User as User_schema
 from src.schemas.geo import Geolocation as Geolocation_schema
 from src.schemas.geo import (
     GeolocationCreate,
-    GeolocationNearest,
     GeolocationNearestResponse,
-    GeolocationNearestResponseWithReports,
-    GeolocationNearestWithRegion,
     GeolocationUpdate,
+    GeolocationUpsert,
+    GeoPoint,
 )
-from src.schemas.report import ReportBasePhoto as ReportBasePhoto_schema
+from src.services import geohash
+from src.services.geo_index import PreparedPolygon, geo_index, geodesic_distance
+from src.services.recipient_cache import cover_key, radius_key, recipient_cache
 
 logger = logging.getLogger(__name__)
 
+# 12 bind parameters per row keep a batch well below the 32767 parameters limit
+UPSERT_BATCH_SIZE = 1000
+
+
+def geohash_prefilter(lon: float, lat: float, radius: float) -> ColumnElement[bool]:
+    """
+    Cheap B-tree filter by geohash cells covering the circle before exact spheroid distance
+
+    Rows without cell keys yet (written before the geohash migration and not backfilled)
+    are kept as candidates, so the exact distance check still decides for them
+    """
+    precision, cells = geohash.cells_covering(lon, lat, radius)
+    column: InstrumentedAttribute[str] = getattr(GeoLocation_db, f"geohash_{precision}")
+    return or_(column.in_(cells), column.is_(None))
+
+
+def coverage_bbox(
+        home_location: WKTElement | QueryableAttribute[Any],
+        radius: int,
+) -> ColumnElement[Any]:
+    """
+    Bounding box of the circle around home_location (with 1% margin) for GeoLocation.coverage
+    """
+    return func.ST_Envelope(
+        cast(func.ST_Buffer(cast(home_location, Geography), radius * 1.01), Geometry),
+    )
+
+
+def point_expression(point: GeoPoint) -> ColumnElement[Any]:
+    """
+    Geometry POINT made from the coordinates in SQL, without WKT text in between
+    """
+    return func.ST_SetSRID(func.ST_MakePoint(point.lon, point.lat), 4326)
+
+
+def cell_envelope(cell: str) -> ColumnElement[Any]:
+    """
+    Geohash cell as a geometry rectangle
+    """
+    return func.ST_MakeEnvelope(*geohash.bbox(cell), 4326)
+
+
+def cell_prefilter(cell: str, radius: float) -> ColumnElement[bool]:
+    """
+    Geohash prefilter for subscribers within radius of any point of the geohash cell
+    """
+    min_lon, min_lat, max_lon, max_lat = geohash.bbox(cell)
+    lon, lat = (min_lon + max_lon) / 2, (min_lat + max_lat) / 2
+    # No point of the cell is farther from its centre than the corners
+    half_diagonal = max(
+        geodesic_distance(lon, lat, max_lon, max_lat),
+        geodesic_distance(lon, lat, max_lon, min_lat),
+    )
+    return geohash_prefilter(lon, lat, radius + half_diagonal)
+
+
+def candidate_recipients_query(geolocation_ids: list[int]) -> Select[tuple[int]]:
+    """
+    Select telegram IDs of the cached candidate geolocations, as one array parameter
+    """
+    return (
+        select(User_db.telegram_id)
+        .join(GeoLocation_db, User_db.geolocation)
+        .where(GeoLocation_db.id == any_(literal(geolocation_ids, ARRAY(Integer))))
+        .distinct()
+        .order_by(User_db.telegram_id)
+    )
+
+
+def upsert_statement(geos: list[GeolocationUpsert]) -> ReturningInsert[tuple]:
+    """
+    INSERT ... ON CONFLICT (user_id) DO UPDATE of the geolocations returning WKT text
+    """
+    rows = []
+    for geo in geos:
+        home_location = WKTElement(geo.home_location, srid=4326)
+        lon, lat = GeoPoint.from_wkt(geo.home_location)
+        rows.append({
+            "user_id": geo.user_id,
+            "filter_type": geo.filter_type,
+            "region": geo.region,
+            "home_location": home_location,
+            "radius": geo.radius,
+            "polygon": WKTElement(geo.polygon, srid=4326),
+            "use_current_location": geo.use_current_location,
+            "coverage": coverage_bbox(home_location, geo.radius) if geo.radius else None,
+            **geohash.cell_keys(lon, lat),
+        })
+
+    statement = insert(GeoLocation_db).values(rows)
+    updated_columns = [column for column in rows[0] if column != "user_id"]
+    return statement.on_conflict_do_update(
+        index_elements=[GeoLocation_db.user_id],
+        set_={column: statement.excluded[column] for column in updated_columns},
+    ).returning(
+        GeoLocation_db.id,
+        GeoLocation_db.user_id,
+        GeoLocation_db.filter_type,
+        GeoLocation_db.region,
+        func.ST_AsText(GeoLocation_db.home_location).label("home_location"),
+        GeoLocation_db.home_location.label("home_point"),
+        GeoLocation_db.radius,
+        func.ST_AsText(GeoLocation_db.polygon).label("polygon"),
+        GeoLocation_db.use_current_location,
+    )
+
 
 class GeoServices:
     @classmethod
@@ -38,6 +145,7 @@ class GeoServices:
             GeoLocation_db.filter_type,
             GeoLocation_db.region,
             func.ST_AsText(GeoLocation_db.home_location).label("home_location"),
+            GeoLocation_db.home_location.label("home_point"),
             GeoLocation_db.radius,
             func.ST_AsText(GeoLocation_db.polygon).label("polygon"),
             GeoLocation_db.use_current_location,
@@ -66,6 +174,7 @@ class GeoServices:
             GeoLocation_db.filter_type,
             GeoLocation_db.region,
             func.ST_AsText(GeoLocation_db.home_location).label("home_location"),
+            GeoLocation_db.home_location.label("home_point"),
             GeoLocation_db.radius,
             func.ST_AsText(GeoLocation_db.polygon).label("polygon"),
             GeoLocation_db.use_current_location,
@@ -98,12 +207,21 @@ class GeoServices:
         new_geo.user_id = user_id
 
         if isinstance(data_dict.get("home_location"), str):
-            new_geo.home_location = WKTElement(data_dict.get("home_location"), srid=4326)  # type: ignore[assignment, arg-type]
+            home_location = WKTElement(data_dict.get("home_location"), srid=4326)  # type: ignore[arg-type]
+            new_geo.home_location = home_location  # type: ignore[assignment]
+            home_lon, home_lat = GeoPoint.from_wkt(data_dict["home_location"])
+            for column, cell_key in geohash.cell_keys(home_lon, home_lat).items():
+                setattr(new_geo, column, cell_key)
+            if new_geo.radius:
+                new_geo.coverage = coverage_bbox(home_location, new_geo.radius)  # type: ignore[assignment]
         if isinstance(data_dict.get("polygon"), str):
             new_geo.polygon = WKTElement(data_dict.get("polygon"), srid=4326)  # type: ignore[assignment, arg-type]
 
         session.add(new_geo)
-        return await cls.update_and_get_geo(new_geo, session)
+        created_geo = await cls.update_and_get_geo(new_geo, session)
+        recipient_cache.subscriber_changed(new_geo.region)
+        await cls.sync_geo_index(user_id, created_geo, session)
+        return created_geo
 
     @classmethod
     async def update_geolocation(
@@ -119,10 +237,17 @@ class GeoServices:
         if not user_geo:
             raise HTTPException(status_code=404, detail="Geolocation not found")
 
+        previous_region = user_geo.region
         try:
             user_geo.region = geo_data.region  # type: ignore[assignment]
-            user_geo.home_location = WKTElement(geo_data.home_location, srid=4326)  # type: ignore[assignment, arg-type]
+            home_location = WKTElement(geo_data.home_location, srid=4326)  # type: ignore[arg-type]
+            user_geo.home_location = home_location  # type: ignore[assignment]
+            home_lon, home_lat = GeoPoint.from_wkt(geo_data.home_location)  # type: ignore[arg-type]
+            for column, cell_key in geohash.cell_keys(home_lon, home_lat).items():
+                setattr(user_geo, column, cell_key)
             user_geo.filter_type = geo_data.filter_type  # type: ignore[assignment]
+            if user_geo.radius:
+                user_geo.coverage = coverage_bbox(home_location, user_geo.radius)  # type: ignore[assignment]
 
             await session.commit()
             await session.refresh(user_geo)
@@ -135,6 +260,7 @@ class GeoServices:
             GeoLocation_db.filter_type,
             GeoLocation_db.region,
             func.ST_AsText(GeoLocation_db.home_location).label("home_location"),
+            GeoLocation_db.home_location.label("home_point"),
             GeoLocation_db.radius,
             func.ST_AsText(GeoLocation_db.polygon).label("polygon"),
             GeoLocation_db.use_current_location,
@@ -143,10 +269,80 @@ class GeoServices:
         result_updated_geo = await session.execute(query_updated_geo)
         row = result_updated_geo.first()
 
+        recipient_cache.subscriber_changed(previous_region, geo_data.region)
+
         if row:
-            return Geolocation_schema(**row._asdict())
+            updated_geo = Geolocation_schema(**row._asdict())
+            await cls.sync_geo_index(user_id, updated_geo, session)
+            return updated_geo
         return None
 
+    @classmethod
+    async def upsert_geolocations(
+            cls,
+            geos: list[GeolocationUpsert],
+            session: AsyncSession,
+    ) -> list[Geolocation_schema]:
+        """
+        Create or replace geolocations of many users, one statement per UPSERT_BATCH_SIZE rows
+        """
+        # ON CONFLICT DO UPDATE can't change a row twice, the last entry of a user wins
+        geos = list({geo.user_id: geo for geo in geos}.values())
+
+        upserted_rows = []
+        try:
+            for start in range(0, len(geos), UPSERT_BATCH_SIZE):
+                batch = geos[start:start + UPSERT_BATCH_SIZE]
+                result = await session.execute(upsert_statement(batch))
+                upserted_rows.extend(result.all())
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            raise HTTPException(status_code=422, detail=f"Failed to upsert Geolocations: {str(e)}")
+
+        logger.info(f"UPSERTED GEOLOCATIONS = {len(upserted_rows)}")
+        recipient_cache.clear()
+
+        upserted = {}
+        for row in upserted_rows:
+            geo_dict = row._asdict()
+            upserted[geo_dict.pop("user_id")] = Geolocation_schema(**geo_dict)
+
+        if geo_index.ready and upserted:
+            result = await session.execute(
+                select(User_db.id, User_db.telegram_id).where(User_db.id.in_(upserted)),
+            )
+            for user_id, telegram_id in result.all():
+                geo = upserted[user_id]
+                if geo.home_point is None:
+                    continue
+                geo_index.upsert(user_id, telegram_id, *geo.home_point, geo.radius, geo.filter_type)
+                if geo.filter_type == GeoFilterType.POLYGON:
+                    polygon = PreparedPolygon.from_wkt(geo.polygon)
+                    geo_index.upsert_polygon(user_id, telegram_id, polygon)
+
+        return list(upserted.values())
+
+    @classmethod
+    async def sync_geo_index(
+            cls,
+            user_id: int,
+            geo: Geolocation_schema | None,
+            session: AsyncSession,
+    ) -> None:
+        if not geo_index.ready:
+            return
+
+        if geo is None or geo.home_point is None:
+            geo_index.remove(user_id)
+            return
+
+        result = await session.execute(select(User_db.telegram_id).filter_by(id=user_id))
+        telegram_id = result.scalar_one()
+        geo_index.upsert(user_id, telegram_id, *geo.home_point, geo.radius, geo.filter_type)
+        if geo.filter_type == GeoFilterType.POLYGON and geo.polygon:
+            geo_index.upsert_polygon(user_id, telegram_id, PreparedPolygon.from_wkt(geo.polygon))
+
     @classmethod
     async def update_geo_filter_type(
             cls,
@@ -163,27 +359,26 @@ class GeoServices:
             return None
 
         user_geo.filter_type = filter_type
-        user_geo.radius = radius or user_geo.radius
-        return await cls.update_and_get_geo(user_geo, session)
+        if radius and radius != user_geo.radius:
+            user_geo.radius = radius
+            user_geo.coverage = coverage_bbox(GeoLocation_db.home_location, radius)  # type: ignore[assignment]
+
+        updated_geo = await cls.update_and_get_geo(user_geo, session)
+        recipient_cache.subscriber_changed(user_geo.region)
+        await cls.sync_geo_index(user_id, updated_geo, session)
+        return updated_geo
 
     @classmethod
     async def find_all_geos_within_radius(
             cls,
-            geo_data: GeolocationNearest,
+            point: GeoPoint,
+            radius: int,
             session: AsyncSession,
     ) -> list[GeolocationNearestResponse]:
-        logger.info(f"GEO DATA = {geo_data.__dict__}")
+        logger.info(f"GEO DATA = {point}, radius = {radius}")
 
-        if geo_data.home_location.startswith("POINT"):
-            coords = geo_data.home_location[6:-1]
-        else:
-            coords = geo_data.home_location
-
-        lat = coords.split(" ")[1]
-        lon = coords.split(" ")[0]
-
-        user_point = WKTElement(f"POINT({lon} {lat})", srid=4326)
-        logger.info(f"USER_POINT = {user_point}")
+        lon, lat = point
+        user_point = point_expression(point)
         query = (
             select(
                 GeoLocation_db,
@@ -196,10 +391,11 @@ class GeoServices:
             )
             .join(User_db, GeoLocation_db.user)
             .where(
+                geohash_prefilter(lon, lat, radius),
                 functions.ST_DWithin(
                     GeoLocation_db.home_location,
                     user_point,
-                    geo_data.radius,
+                    radius,
                     use_spheroid=True,
                 ),
             )
@@ -226,216 +422,183 @@ class GeoServices:
         ]
 
     @classmethod
-    async def find_all_geos_within_radius_with_user_reports(
+    async def find_all_telegram_uids_within_radius(
             cls,
-            geo_data: GeolocationNearest,
+            point: GeoPoint,
+            radius: int,
             session: AsyncSession,
-    ) -> list[GeolocationNearestResponseWithReports]:
-
-        if geo_data.home_location.startswith("POINT"):
-            coords = geo_data.home_location[6:-1]
-        else:
-            coords = geo_data.home_location
-
-        lat = coords.split(" ")[1]
-        lon = coords.split(" ")[0]
-
-        user_point = WKTElement(f"POINT({lon} {lat})", srid=4326)
-        logger.info(f"USER_POINT = {user_point}")
-        query = (
-            select(
-                GeoLocation_db,
-                func.ST_AsText(GeoLocation_db.home_location).label("home_location"),
-                functions.ST_Distance(
-                    GeoLocation_db.home_location,
-                    user_point,
-                    use_spheroid=True,
-                ).label("distance"),
+    ) -> list[int]:
+        lon, lat = point
+
+        if geo_index.ready:
+            telegram_ids = geo_index.within_radius(lon, lat, radius)
+            logger.info(f"USERS TG WITHIN RADIUS (index) = {len(telegram_ids)}")
+            return telegram_ids
+
+        key = radius_key(lon, lat, radius)
+        candidate_ids = recipient_cache.get_candidates(key)
+        if candidate_ids is None:
+            cell, bucket = key[1], key[2]
+            query = (
+                select(GeoLocation_db.id)
+                .where(
+                    cell_prefilter(cell, bucket * 1.01),
+                    functions.ST_DWithin(
+                        GeoLocation_db.home_location,
+                        cast(cell_envelope(cell), Geography),
+                        bucket * 1.01,
+                        use_spheroid=True,
+                    ),
+                )
             )
-            .join(User_db, GeoLocation_db.user)
-            .join(Report_db, Report_db.user_id == User_db.id)
-            .where(
-                functions.ST_DWithin(
-                    GeoLocation_db.home_location,
-                    user_point,
-                    geo_data.radius,
-                    use_spheroid=True,
-                ),
-                Report_db.status == ReportStatus.ACTIVE,
+            result = await session.execute(query)
+            candidate_ids = list(result.scalars())
+            recipient_cache.put_candidates(key, candidate_ids)
+
+        telegram_ids = []
+        if candidate_ids:
+            query = (
+                candidate_recipients_query(candidate_ids)
+                .where(
+                    functions.ST_DWithin(
+                        GeoLocation_db.home_location,
+                        point_expression(point),
+                        radius,
+                        use_spheroid=True,
+                    ),
+                )
             )
-            .options(
-                selectinload(GeoLocation_db.user)
-                .selectinload(User_db.reports)
-                .selectinload(Report_db.photos),
-            )
-            .order_by("distance")
-            .distinct()
-        )
-        result = await session.execute(query)
-        rows_geos = result.all()
+            result = await session.execute(query)
+            telegram_ids = [int(user_tg_id) for user_tg_id in result.scalars()]
+        logger.info(f"USERS TG WITHIN RADIUS = {len(telegram_ids)}")
 
-        for geo_location, home_location, distance in rows_geos:
-            logger.info(f"ROW USER = {geo_location}, {home_location}, {distance}")
-
-        return [
-            GeolocationNearestResponseWithReports(
-                home_location=home_location,
-                distance=distance,
-                radius=geo_location.radius,
-                filter_type=geo_location.filter_type,
-                region=geo_location.region,
-                user=User_schema.model_validate(geo_location.user),
-                reports=[
-                    ReportBasePhoto_schema.model_validate(report)
-                    for report in geo_location.user.reports
-                ],
-            )
-            for geo_location, home_location, distance in rows_geos
-        ]
+        return telegram_ids
 
     @classmethod
-    async def find_all_geos_by_city_with_user_reports(
+    async def find_all_telegram_uids_covering_point(
             cls,
-            geo_data: GeolocationNearestWithRegion,
+            coords: GeoPoint,
             session: AsyncSession,
-    ) -> list[GeolocationNearestResponseWithReports]:
-
-        if geo_data.home_location.startswith("POINT"):
-            coords = geo_data.home_location[6:-1]
-        else:
-            coords = geo_data.home_location
-
-        lat = coords.split(" ")[1]
-        lon = coords.split(" ")[0]
-
-        user_point = WKTElement(f"POINT({lon} {lat})", srid=4326)
-        logger.info(f"USER_POINT = {user_point}")
-        query = (
-            select(
-                GeoLocation_db,
-                func.ST_AsText(GeoLocation_db.home_location).label("home_location"),
-                functions.ST_Distance(
-                    GeoLocation_db.home_location,
-                    user_point,
-                    use_spheroid=True,
-                ).label("distance"),
-            )
-            .join(User_db, GeoLocation_db.user)
-            .join(Report_db, Report_db.user_id == User_db.id)
-            .where(
-                GeoLocation_db.region == geo_data.region,
-                Report_db.status == ReportStatus.ACTIVE,
+    ) -> list[int]:
+        """
+        Telegram IDs of RADIUS subscribers whose radius around home location contains the point
+        """
+        if geo_index.ready:
+            telegram_ids = geo_index.covering(coords.lon, coords.lat)
+            logger.info(f"USERS TG COVERING POINT (index) = {len(telegram_ids)}")
+            return telegram_ids
+
+        key = cover_key(coords.lon, coords.lat)
+        candidate_ids = recipient_cache.get_candidates(key)
+        if candidate_ids is None:
+            query = (
+                select(GeoLocation_db.id)
+                .where(functions.ST_Intersects(GeoLocation_db.coverage, cell_envelope(key[1])))
             )
-            .options(
-                selectinload(GeoLocation_db.user)
-                .selectinload(User_db.reports)
-                .selectinload(Report_db.photos),
+            result = await session.execute(query)
+            candidate_ids = list(result.scalars())
+            recipient_cache.put_candidates(key, candidate_ids)
+
+        telegram_ids = []
+        if candidate_ids:
+            query = (
+                candidate_recipients_query(candidate_ids)
+                .where(
+                    GeoLocation_db.filter_type == GeoFilterType.RADIUS,
+                    functions.ST_DWithin(
+                        GeoLocation_db.home_location,
+                        point_expression(coords),
+                        GeoLocation_db.radius,
+                        use_spheroid=True,
+                    ),
+                )
             )
-            .order_by("distance")
-            .distinct()
-        )
-        result = await session.execute(query)
-        rows_geos = result.all()
-
-        for geo_location, home_location, distance in rows_geos:
-            logger.info(f"ROW USER = {geo_location}, {home_location}, {distance}")
-
-        return [
-            GeolocationNearestResponseWithReports(
-                home_location=home_location,
-                distance=distance,
-                radius=geo_location.radius,
-                filter_type=geo_location.filter_type,
-                region=geo_location.region,
-                user=User_schema.model_validate(geo_location.user),
-                reports=[
-                    ReportBasePhoto_schema.model_validate(report)
-                    for report in geo_location.user.reports
-                ],
-            )
-            for geo_location, home_location, distance in rows_geos
-        ]
+            result = await session.execute(query)
+            telegram_ids = [int(user_tg_id) for user_tg_id in result.scalars()]
+        logger.info(f"USERS TG COVERING POINT = {len(telegram_ids)}")
 
+        return telegram_ids
 
     @classmethod
-    async def find_all_telegram_uids_within_radius(
+    async def find_all_telegram_uids_by_polygon(
             cls,
-            geo_data: GeolocationNearest,
+            coords: GeoPoint,
             session: AsyncSession,
     ) -> list[int]:
-
-        if geo_data.home_location.startswith("POINT"):
-            coords = geo_data.home_location[6:-1]
-        else:
-            coords = geo_data.home_location
-
-        lat = coords.split(" ")[1]
-        lon = coords.split(" ")[0]
-
-        user_point = WKTElement(f"POINT({lon} {lat})", srid=4326)
+        """
+        Telegram IDs of users with POLYGON filter type whose polygon contains the point
+        """
+        if geo_index.ready:
+            telegram_ids = geo_index.in_polygons(coords.lon, coords.lat)
+            logger.info(f"USERS TG BY POLYGON (index) = {len(telegram_ids)}")
+            return telegram_ids
+
+        point = cast(point_expression(coords), Geography)
         query = (
-            select(
-                User_db.telegram_id,
-                functions.ST_Distance(
-                    GeoLocation_db.home_location,
-                    user_point,
-                    use_spheroid=True,
-                ).label("distance"),
-            )
+            select(User_db.telegram_id)
             .join(GeoLocation_db, User_db.geolocation)
             .where(
-                functions.ST_DWithin(
-                    GeoLocation_db.home_location,
-                    user_point,
-                    geo_data.radius,
-                    use_spheroid=True,
-                ),
+                GeoLocation_db.filter_type == GeoFilterType.POLYGON,
+                functions.ST_Covers(GeoLocation_db.polygon, point),
             )
-            .distinct(User_db.telegram_id)
-            .order_by(User_db.telegram_id, text("distance"))
+            .distinct()
+            .order_by(User_db.telegram_id)
         )
         result = await session.execute(query)
-        row = result.all()
+        telegram_ids = [int(user_tg_id) for user_tg_id in result.scalars()]
+        logger.info(f"USERS TG BY POLYGON = {len(telegram_ids)}")
 
-        for user_tg_id, distance in row:
-            logger.info(f"USER TG = {user_tg_id}, distance = {distance}")
-
-        return [int(user_tg_id) for user_tg_id, distance in row]
+        return telegram_ids
 
     @classmethod
     async def find_all_telegram_uids_by_city(
             cls,
-            geo_data: Geolocation_schema,
+            region: str,
             session: AsyncSession,
     ) -> list[int]:
+        """
+        Telegram IDs of users with REGION filter type in the region
+        """
+        cached = recipient_cache.get_region(region)
+        if cached is not None:
+            logger.info(f"USERS TG BY CITY (cache) = {len(cached)}")
+            return cached
 
-        if geo_data.home_location.startswith("POINT"):
-            coords = geo_data.home_location[6:-1]
-        else:
-            coords = geo_data.home_location
-
-        lat = coords.split(" ")[1]
-        lon = coords.split(" ")[0]
-
-        user_point = WKTElement(f"POINT({lon} {lat})", srid=4326)
         query = (
-            select(
-                User_db.telegram_id,
-                functions.ST_Distance(
-                    GeoLocation_db.home_location,
-                    user_point,
-                    use_spheroid=True,
-                ).label("distance"),
-            )
+            select(User_db.telegram_id)
             .join(GeoLocation_db, User_db.geolocation)
-            .where(GeoLocation_db.region == geo_data.region)
-            .distinct(User_db.telegram_id)
-            .order_by(User_db.telegram_id, text("distance"))
+            .where(
+                GeoLocation_db.filter_type == GeoFilterType.REGION,
+                GeoLocation_db.region == region,
+            )
+            .distinct()
+            .order_by(User_db.telegram_id)
         )
         result = await session.execute(query)
-        row = result.all()
+        telegram_ids = [int(user_tg_id) for user_tg_id in result.scalars()]
+        logger.info(f"USERS TG BY CITY = {len(telegram_ids)}")
 
-        for user_tg_id, distance in row:
-            logger.info(f"USER TG = {user_tg_id}, distance = {distance}")
+        recipient_cache.put_region(region, telegram_ids)
+        return telegram_ids
 
-        return [int(user_tg_id) for user_tg_id, distance in row]
+    @classmethod
+    async def find_all_telegram_uids_for_report(
+            cls,
+            coords: GeoPoint | None,
+            region: str | None,
+            session: AsyncSession,
+    ) -> list[int]:
+        """
+        Telegram IDs of all users subscribed to a report at coords in region
+
+        Each subscriber is matched by their own filter type: RADIUS subscribers whose
+        circle covers the point, POLYGON subscribers whose polygon contains it and
+        REGION subscribers of the region.
+        """
+        telegram_ids: set[int] = set()
+        if coords is not None:
+            telegram_ids.update(await cls.find_all_telegram_uids_covering_point(coords, session))
+            telegram_ids.update(await cls.find_all_telegram_uids_by_polygon(coords, session))
+        if region:
+            telegram_ids.update(await cls.find_all_telegram_uids_by_city(region, session))
+        return sorted(telegram_ids)
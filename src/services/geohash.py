@@ -0,0 +1,104 @@
+from src.services.geo_index import metres_per_degree
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Stored resolutions: ~39x20 km, ~4.9x4.9 km, ~1.2x0.6 km cells
+GEOHASH_PRECISIONS = (4, 5, 6)
+MAX_PREFILTER_CELLS = 32
+
+
+def encode(lon: float, lat: float, precision: int) -> str:
+    """
+    Encode point to standard geohash, the same as PostGIS ST_GeoHash(point, precision)
+    """
+    lon_range = [-180.0, 180.0]
+    lat_range = [-90.0, 90.0]
+    chars: list[str] = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(chars) < precision:
+        rng, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = bits * 2 + 1
+            rng[0] = mid
+        else:
+            bits = bits * 2
+            rng[1] = mid
+        even = not even
+
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+def bbox(cell: str) -> tuple[float, float, float, float]:
+    """
+    Bounds (min_lon, min_lat, max_lon, max_lat) of the geohash cell
+    """
+    lon_range = [-180.0, 180.0]
+    lat_range = [-90.0, 90.0]
+    even = True
+
+    for char in cell:
+        bits = BASE32.index(char)
+        for shift in range(4, -1, -1):
+            rng = lon_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if bits >> shift & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+
+    return lon_range[0], lat_range[0], lon_range[1], lat_range[1]
+
+
+def cell_size(precision: int) -> tuple[float, float]:
+    """
+    Geohash cell (lon, lat) size in degrees
+    """
+    lon_bits = (precision * 5 + 1) // 2
+    lat_bits = precision * 5 // 2
+    return 360.0 / 2 ** lon_bits, 180.0 / 2 ** lat_bits
+
+
+def cell_keys(lon: float, lat: float) -> dict[str, str]:
+    """
+    Values of geohash_<precision> columns for the point
+    """
+    full = encode(lon, lat, max(GEOHASH_PRECISIONS))
+    return {f"geohash_{precision}": full[:precision] for precision in GEOHASH_PRECISIONS}
+
+
+def cells_covering(lon: float, lat: float, radius: float) -> tuple[int, set[str]]:
+    """
+    Find the finest stored precision and its cells covering the bbox of the circle
+
+    The finest precision that needs no more than MAX_PREFILTER_CELLS cells is chosen,
+    falling back to the coarsest one for very large radii.
+    """
+    lat_m, lon_m = metres_per_degree(lat)
+    d_lat = radius / lat_m
+    d_lon = radius / max(lon_m, 1.0)
+
+    for precision in sorted(GEOHASH_PRECISIONS, reverse=True):
+        size_lon, size_lat = cell_size(precision)
+        columns = int(2 * d_lon / size_lon) + 2
+        rows = int(2 * d_lat / size_lat) + 2
+        if columns * rows <= MAX_PREFILTER_CELLS or precision == min(GEOHASH_PRECISIONS):
+            break
+
+    cells = set()
+    for row in range(rows):
+        cell_lat = min(lat - d_lat + row * size_lat, lat + d_lat)
+        for column in range(columns):
+            cell_lon = min(lon - d_lon + column * size_lon, lon + d_lon)
+            cells.add(encode(cell_lon, cell_lat, precision))
+    return precision, cells
@@ -1,14 +1,56 @@
 import logging
 
-from sqlalchemy import func, select
+from sqlalchemy import case, func, select
+from sqlalchemy.dialects.postgresql import Insert, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.broker.producer import encode_notification_chunks
+from src.config.config import settings
+from src.database.models import DeliveryStatus
 from src.database.models import Notification as Notification_db
+from src.database.models import NotificationDelivery as NotificationDelivery_db
+from src.database.models import OutboxMessage as OutboxMessage_db
 from src.schemas.notification import NotificationCreate
 
 logger = logging.getLogger(__name__)
 
 
+def delivery_upsert_statement(outcomes: dict[tuple[int, int], DeliveryStatus]) -> Insert:
+    """
+    Build one insert of (notification id, telegram id) outcomes, counting known attempts
+
+    A recipient once delivered stays delivered even if a later attempt failed.
+    """
+    stmt = insert(NotificationDelivery_db).values([
+        {
+            "notification_id": notif_id,
+            "telegram_id": telegram_id,
+            "status": status,
+            "attempts": 1,
+            "updated_at": func.now(),
+        }
+        for (notif_id, telegram_id), status in outcomes.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            NotificationDelivery_db.notification_id,
+            NotificationDelivery_db.telegram_id,
+        ],
+        set_={
+            "status": case(
+                (
+                    NotificationDelivery_db.status == DeliveryStatus.DELIVERED,
+                    NotificationDelivery_db.status,
+                ),
+                else_=stmt.excluded.status,
+            ),
+            "attempts": NotificationDelivery_db.attempts + 1,
+            "updated_at": func.now(),
+        },
+    )
+    return stmt
+
+
 class NotificationServices:
     @classmethod
     async def create_notification(
@@ -28,6 +70,47 @@ class NotificationServices:
 
         return db_notif
 
+    @classmethod
+    async def create_notification_with_outbox(
+            cls,
+            notif_data: NotificationCreate,
+            url: str,
+            session: AsyncSession,
+            commit: bool = True,
+    ) -> Notification_db:
+        """
+        Create notification and its broker messages in the outbox in one transaction
+
+        The outbox relay publishes them afterwards, so the caller never waits on the broker.
+        With commit=False they join the caller's transaction, e.g. the one creating the report.
+        """
+        db_notif = Notification_db(**notif_data.model_dump(exclude_unset=True))
+        session.add(db_notif)
+
+        try:
+            await session.flush()
+            bodies = encode_notification_chunks(
+                db_notif,
+                url,
+                settings.NOTIFICATION_CHUNK_SIZE,
+                compact=settings.NOTIFICATION_COMPACT_WIRE,
+            )
+            session.add_all([
+                OutboxMessage_db(routing_key=settings.RMQ_ROUTING_KEY, body=body)
+                for body in bodies
+            ])
+            if commit:
+                await session.commit()
+                await session.refresh(db_notif)
+            else:
+                await session.flush()
+        except Exception as e:
+            await session.rollback()
+            raise Exception(f"Failed to create notification: {str(e)}")
+
+        logger.info(f"Notification {db_notif.id} queued as {len(bodies)} outbox messages")
+        return db_notif
+
     @classmethod
     async def find_one_or_none_by_id(
             cls,
@@ -41,12 +124,54 @@ class NotificationServices:
 
     @classmethod
     async def get_total_notification_count(cls, session: AsyncSession) -> int:
-        query = select(func.sum(
-            func.cardinality(Notification_db.recipient_ids)
-        ))
+        query = (
+            select(func.count())
+            .select_from(NotificationDelivery_db)
+            .where(NotificationDelivery_db.status == DeliveryStatus.DELIVERED)
+        )
         result = await session.execute(query)
         total = result.scalar()
 
         return total if total is not None else 0
 
+    @classmethod
+    async def find_finished_telegram_ids(
+            cls,
+            notif_id: int,
+            telegram_ids: list[int],
+            session: AsyncSession,
+    ) -> set[int]:
+        """
+        Recipients that got the notification or that Telegram won't deliver it to
+        """
+        query = select(NotificationDelivery_db.telegram_id).where(
+            NotificationDelivery_db.notification_id == notif_id,
+            NotificationDelivery_db.telegram_id.in_(telegram_ids),
+            NotificationDelivery_db.status.in_([DeliveryStatus.DELIVERED, DeliveryStatus.FAILED]),
+        )
+        result = await session.execute(query)
+
+        return set(result.scalars().all())
+
+    @classmethod
+    async def record_deliveries(
+            cls,
+            outcomes: dict[tuple[int, int], DeliveryStatus],
+            session: AsyncSession,
+    ) -> None:
+        """
+        Write send outcomes of (notification id, telegram id) pairs in one statement
+        """
+        if not outcomes:
+            return
+
+        stmt = delivery_upsert_statement(outcomes)
+
+        try:
+            await session.execute(stmt)
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            raise Exception(f"Failed to record notification deliveries: {str(e)}")
+
 
@@ -1,12 +1,26 @@
 import logging
-from collections.abc import Sequence
-from datetime import date
-
-from sqlalchemy import Date, cast, func, select
+from collections.abc import Iterator, Sequence
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    and_,
+    delete,
+    exists,
+    false,
+    func,
+    or_,
+    select,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, selectinload
 
 from src.database.models.pet import Pet as Pet_db
+from src.database.models.reminder import ReminderKind
+from src.database.models.reminder import ReminderLog as ReminderLog_db
 from src.database.models.user import User as User_db
 from src.schemas.pet import PetCreate, PetUpdate
 
@@ -142,55 +156,146 @@ class PetServices:
         return result.scalars().all()
 
     @classmethod
-    def get_pets_by_vaccination_date(
+    def _pets_due_for_reminders_query(
             cls,
             today: date,
-            session: Session,
-    ) -> Sequence[Pet_db]:
+            buckets: int,
+            up_to_bucket: int,
+    ) -> Select[tuple[Pet_db, bool, bool, bool]]:
+        day_start = datetime.combine(today, time.min)
+        day_end = day_start + timedelta(days=1)
+
+        def not_reminded(kind: ReminderKind) -> ColumnElement[bool]:
+            return ~exists().where(
+                ReminderLog_db.pet_id == Pet_db.id,
+                ReminderLog_db.kind == kind.value,
+                ReminderLog_db.due_date == today,
+            )
+
+        vaccination_due = and_(
+            Pet_db.next_vaccination >= day_start,
+            Pet_db.next_vaccination < day_end,
+            not_reminded(ReminderKind.VACCINATION),
+        )
+        parasite_due = and_(
+            Pet_db.next_parasite_treatment >= day_start,
+            Pet_db.next_parasite_treatment < day_end,
+            not_reminded(ReminderKind.PARASITE),
+        )
+        fleas_ticks_due = and_(
+            Pet_db.next_fleas_ticks_treatment >= day_start,
+            Pet_db.next_fleas_ticks_treatment < day_end,
+            not_reminded(ReminderKind.FLEAS_TICKS),
+        )
+
         query = (
-            select(Pet_db)
-            .where(cast(Pet_db.next_vaccination, Date) == today)
+            select(
+                Pet_db,
+                func.coalesce(vaccination_due, false()).label("vaccination_due"),
+                func.coalesce(parasite_due, false()).label("parasite_due"),
+                func.coalesce(fleas_ticks_due, false()).label("fleas_ticks_due"),
+            )
+            .where(or_(vaccination_due, parasite_due, fleas_ticks_due))
             .options(
                 selectinload(Pet_db.owners),
             ))
-        result = session.execute(query)
-        pets = result.scalars().all()
+        if buckets > 1:
+            query = query.where(Pet_db.id % buckets <= up_to_bucket)
+        return query
 
-        return pets
+    @classmethod
+    def get_pets_due_for_reminders(
+            cls,
+            today: date,
+            session: Session,
+            buckets: int = 1,
+            up_to_bucket: int = 0,
+    ) -> Sequence[tuple[Pet_db, bool, bool, bool]]:
+        """
+        Get pets with any treatment due today and not reminded yet, with a flag per treatment
+
+        Rows are (pet, vaccination_due, parasite_due, fleas_ticks_due). The day is
+        compared as a half-open range, not by casting the column to date, so each
+        condition can use the index on its next_* column. Treatments with a
+        ReminderLog for today are skipped. With buckets > 1 only pets whose
+        id % buckets is at most up_to_bucket are returned.
+        """
+        result = session.execute(cls._pets_due_for_reminders_query(today, buckets, up_to_bucket))
+        return result.tuples().all()
 
     @classmethod
-    def get_pets_by_parasite_date(
+    def stream_pets_due_for_reminders(
             cls,
             today: date,
             session: Session,
-    ) -> Sequence[Pet_db]:
-        query = (
-            select(Pet_db)
-            .where(cast(Pet_db.next_parasite_treatment, Date) == today)
-            .options(
-                selectinload(Pet_db.owners),
-            ))
-        result = session.execute(query)
-        pets = result.scalars().all()
+            batch_size: int,
+            buckets: int = 1,
+            up_to_bucket: int = 0,
+    ) -> Iterator[Sequence[tuple[Pet_db, bool, bool, bool]]]:
+        """
+        Yield rows of get_pets_due_for_reminders in batches as they are fetched
+
+        Rows are read through a server-side cursor and owners are loaded per batch.
+        The session identity map holds weak references, so pets of a batch are freed
+        once the caller drops it and memory doesn't grow with the number of due pets.
+        """
+        query = cls._pets_due_for_reminders_query(today, buckets, up_to_bucket)
+        result = session.execute(query.execution_options(yield_per=batch_size))
+        yield from result.tuples().partitions()
 
-        return pets
+    @classmethod
+    def delete_old_reminder_logs(cls, today: date, session: Session) -> None:
+        """
+        Delete logs of earlier days, only reminders due today are checked against the log
+        """
+        session.execute(delete(ReminderLog_db).where(ReminderLog_db.due_date < today))
 
     @classmethod
-    def get_pets_by_fleas_ticks_date(
+    def record_reminders(
             cls,
             today: date,
+            reminders: list[tuple[int, ReminderKind]],
             session: Session,
-    ) -> Sequence[Pet_db]:
-        query = (
-            select(Pet_db)
-            .where(cast(Pet_db.next_fleas_ticks_treatment, Date) == today)
-            .options(
-                selectinload(Pet_db.owners),
-            ))
-        result = session.execute(query)
-        pets = result.scalars().all()
+    ) -> set[tuple[int, ReminderKind]]:
+        """
+        Log (pet_id, kind) reminders as queued for today, returning the ones logged now
+
+        Reminders already logged, also by a concurrent scan that hasn't committed yet,
+        are not returned. Changes are committed by the caller.
+        """
+        if not reminders:
+            return set()
+        result = session.execute(
+            insert(ReminderLog_db)
+            .values([
+                {"pet_id": pet_id, "kind": kind.value, "due_date": today}
+                for pet_id, kind in reminders
+            ])
+            .on_conflict_do_nothing()
+            .returning(ReminderLog_db.pet_id, ReminderLog_db.kind),
+        )
+        return {(pet_id, ReminderKind(kind)) for pet_id, kind in result.tuples()}
 
-        return pets
+    @classmethod
+    def forget_reminders(
+            cls,
+            today: date,
+            reminders: set[tuple[int, ReminderKind]],
+            session: Session,
+    ) -> None:
+        """
+        Delete today's logs of (pet_id, kind) reminders that weren't queued after all
+        """
+        if not reminders:
+            return
+        session.execute(
+            delete(ReminderLog_db).where(
+                ReminderLog_db.due_date == today,
+                tuple_(ReminderLog_db.pet_id, ReminderLog_db.kind).in_(
+                    [(pet_id, kind.value) for pet_id, kind in reminders],
+                ),
+            ),
+        )
 
     @classmethod
     async def get_total_pet_count(cls, session: AsyncSession) -> int | None:
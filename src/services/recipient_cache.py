@@ -0,0 +1,104 @@
+import logging
+import math
+import time
+from collections.abc import Hashable
+from typing import TypeVar
+
+from src.config.config import settings
+from src.services import geohash
+
+logger = logging.getLogger(__name__)
+
+# ~4.9x4.9 km cells: one report burst over a district hits a handful of entries
+CELL_PRECISION = 5
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+def cover_key(lon: float, lat: float) -> tuple[str, str]:
+    return "cover", geohash.encode(lon, lat, CELL_PRECISION)
+
+
+def radius_key(lon: float, lat: float, radius: float) -> tuple[str, str, int]:
+    return "radius", geohash.encode(lon, lat, CELL_PRECISION), radius_bucket(radius)
+
+
+def radius_bucket(radius: float) -> int:
+    """
+    Round radius up to the power of two metres, so close radii share candidates
+    """
+    return 2 ** max(0, math.ceil(math.log2(max(radius, 1))))
+
+
+class RecipientCache:
+    """
+    Per-process TTL cache of report recipients
+
+    Region entries hold final telegram IDs. Cell entries hold only candidate geolocation
+    IDs: every subscriber who may match any point of the geohash cell. The exact match
+    for a particular report point is checked in SQL against the current rows, so moved
+    or deleted subscribers are never notified; subscribers added by other processes
+    are only picked up when the entry expires.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 10_000) -> None:
+        """
+        Keep entries for ttl seconds, dropping the oldest ones above max_entries
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._regions: dict[str, tuple[float, list[int]]] = {}
+        self._cells: dict[tuple, tuple[float, list[int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._regions) + len(self._cells)
+
+    def get_region(self, region: str) -> list[int] | None:
+        return self._get(self._regions, region)
+
+    def put_region(self, region: str, telegram_ids: list[int]) -> None:
+        self._put(self._regions, region, telegram_ids)
+
+    def get_candidates(self, key: tuple) -> list[int] | None:
+        return self._get(self._cells, key)
+
+    def put_candidates(self, key: tuple, geolocation_ids: list[int]) -> None:
+        self._put(self._cells, key, geolocation_ids)
+
+    def subscriber_changed(self, *regions: str | None) -> None:
+        """
+        Drop entries a changed subscriber may belong to: their regions and all cells
+        """
+        for region in regions:
+            if region:
+                self._regions.pop(region, None)
+        self._cells.clear()
+        logger.info(f"Recipient cache invalidated, regions = {regions}")
+
+    def clear(self) -> None:
+        self._regions.clear()
+        self._cells.clear()
+
+    def _get(self, store: dict[K, tuple[float, V]], key: K) -> V | None:
+        entry = store.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del store[key]
+            return None
+        return value
+
+    def _put(self, store: dict[K, tuple[float, V]], key: K, value: V) -> None:
+        if self.ttl <= 0:
+            return
+
+        store.pop(key, None)
+        store[key] = (time.monotonic() + self.ttl, value)
+        while len(store) > self.max_entries:
+            del store[next(iter(store))]
+
+
+recipient_cache = RecipientCache(ttl=settings.RECIPIENT_CACHE_TTL)
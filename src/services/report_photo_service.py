@@ -63,6 +63,7 @@ class ReportPhotoServices:
             report_id: int,
             report_photo_data_list: list[ReportPhotoCreate],
             session: AsyncSession,
+            commit: bool = True,
     ) -> list[ReportPhoto_db] | None:
         report_query = await session.execute(select(Report_db).filter_by(id=report_id))
         report_exists = report_query.scalar_one_or_none()
@@ -78,9 +79,12 @@ class ReportPhotoServices:
         session.add_all(photos)
 
         try:
-            await session.commit()
-            for photo in photos:
-                await session.refresh(photo)
+            if commit:
+                await session.commit()
+                for photo in photos:
+                    await session.refresh(photo)
+            else:
+                await session.flush()
         except Exception as e:
             await session.rollback()
             raise Exception(f"Failed to add report photos: {str(e)}")
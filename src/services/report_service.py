@@ -1,16 +1,44 @@
+import base64
+import binascii
 import logging
 from collections.abc import Sequence
 
-from sqlalchemy import func, select
+from geoalchemy2 import Geography, WKTElement, functions
+from sqlalchemy import ColumnElement, Float, cast, func, literal, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from src.database.models.report import Report as Report_db
+from src.database.models.report import ReportPhoto as ReportPhoto_db
 from src.database.models.report import ReportStatus
-from src.schemas.report import ReportCreate, ReportUpdate
+from src.schemas.geo import GeoPoint
+from src.schemas.report import ReportCreate, ReportNearest, ReportUpdate
+from src.services.geo_service import point_expression
 
 logger = logging.getLogger(__name__)
 
+# Keyset of the nearby reports feed: (distance, report id)
+NearbyCursor = tuple[float, int]
+
+
+def encode_cursor(report: ReportNearest) -> str:
+    """
+    Make opaque next-page cursor from the last report of a page
+    """
+    raw = f"{report.distance!r}:{report.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> NearbyCursor:
+    """
+    Parse cursor made by encode_cursor, raise ValueError on malformed input
+    """
+    try:
+        distance, report_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        return float(distance), int(report_id)
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
 
 class ReportServices:
     @classmethod
@@ -34,10 +62,23 @@ class ReportServices:
             user_id: int,
             pet_id: int,
             session: AsyncSession,
+            location: GeoPoint | None = None,
+            region: str | None = None,
+            commit: bool = True,
     ) -> Report_db | None:
+        """
+        Create the report unless the pet already has an active one
+
+        With commit=False the report is only flushed, so the caller can write related
+        rows in the same transaction and commit them all at once.
+        """
         report_dict = report_data.model_dump()
         report_dict["user_id"] = user_id
         report_dict["pet_id"] = pet_id
+        report_dict["region"] = region
+
+        if location:
+            report_dict["location"] = cast(point_expression(location), Geography)
 
         query = select(Report_db).filter(
             Report_db.pet_id == pet_id,
@@ -53,8 +94,11 @@ class ReportServices:
         session.add(new_report)
 
         try:
-            await session.commit()
-            await session.refresh(new_report)
+            if commit:
+                await session.commit()
+                await session.refresh(new_report)
+            else:
+                await session.flush()
         except Exception as e:
             await session.rollback()
             raise Exception(f"Failed to create report: {str(e)}")
@@ -78,6 +122,115 @@ class ReportServices:
         report = await session.execute(query)
         return report.scalar_one_or_none()
 
+    @classmethod
+    async def find_active_reports(
+            cls,
+            point: GeoPoint,
+            condition: ColumnElement[bool],
+            user_id: int,
+            session: AsyncSession,
+            limit: int,
+            after: NearbyCursor | None = None,
+    ) -> list[ReportNearest]:
+        """
+        Find a page of other users' active reports matching the condition, nearest first
+
+        Pages are keyset-based on (distance, report id), pass the key of the last
+        report of the previous page as `after`.
+
+        Distance is the geography KNN operator (sphere distance, within 0.5% of the
+        spheroid one), so the GiST index on location returns reports nearest first
+        instead of computing and sorting the distance of every matching report.
+        """
+        user_point = cast(point_expression(point), Geography)
+        distance = Report_db.location.op("<->", return_type=Float)(user_point)
+        first_photo_url = (
+            select(ReportPhoto_db.url)
+            .where(ReportPhoto_db.report_id == Report_db.id)
+            .order_by(ReportPhoto_db.id)
+            .limit(1)
+            .correlate(Report_db)
+            .scalar_subquery()
+        )
+
+        # Plain columns only, the feed never needs ORM entities or their relationships
+        query = (
+            select(
+                Report_db.id,
+                Report_db.title,
+                Report_db.content,
+                Report_db.status,
+                Report_db.region,
+                func.ST_AsText(Report_db.location).label("location"),
+                distance.label("distance"),
+                first_photo_url.label("first_photo_url"),
+            )
+            .where(
+                condition,
+                Report_db.status == ReportStatus.ACTIVE,
+                Report_db.location.isnot(None),
+                # Also drops reports of deleted users, they have nobody to contact
+                Report_db.user_id != user_id,
+            )
+            .order_by(distance, Report_db.id)
+            .limit(limit)
+        )
+        if after is not None:
+            after_distance, after_id = after
+            query = query.where(
+                tuple_(distance, Report_db.id) > tuple_(literal(after_distance), literal(after_id)),
+            )
+
+        result = await session.execute(query)
+
+        # Values come from typed columns, so validation is skipped
+        return [ReportNearest.model_construct(**row._mapping) for row in result.all()]
+
+    @classmethod
+    async def find_active_reports_within_radius(
+            cls,
+            point: GeoPoint,
+            radius: int,
+            user_id: int,
+            session: AsyncSession,
+            limit: int,
+            after: NearbyCursor | None = None,
+    ) -> list[ReportNearest]:
+        condition = functions.ST_DWithin(
+            Report_db.location,
+            point_expression(point),
+            radius,
+            use_spheroid=True,
+        )
+        return await cls.find_active_reports(point, condition, user_id, session, limit, after)
+
+    @classmethod
+    async def find_active_reports_by_region(
+            cls,
+            point: GeoPoint,
+            region: str,
+            user_id: int,
+            session: AsyncSession,
+            limit: int,
+            after: NearbyCursor | None = None,
+    ) -> list[ReportNearest]:
+        condition = Report_db.region == region
+        return await cls.find_active_reports(point, condition, user_id, session, limit, after)
+
+    @classmethod
+    async def find_active_reports_within_polygon(
+            cls,
+            point: GeoPoint,
+            polygon: str,
+            user_id: int,
+            session: AsyncSession,
+            limit: int,
+            after: NearbyCursor | None = None,
+    ) -> list[ReportNearest]:
+        user_polygon = cast(WKTElement(polygon, srid=4326), Geography)
+        condition = functions.ST_Covers(user_polygon, Report_db.location)
+        return await cls.find_active_reports(point, condition, user_id, session, limit, after)
+
     @classmethod
     async def update_report(
             cls,
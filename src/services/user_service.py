@@ -5,13 +5,17 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from src.database.models import DeliveryStatus
 from src.database.models import Notification as Notification_db
+from src.database.models import NotificationDelivery as NotificationDelivery_db
 from src.database.models import Pet as Pet_db
 from src.database.models import Report as Report_db
 from src.database.models.geo import GeoLocation as GeoLocation_db
 from src.database.models.user import User as User_db
 from src.schemas.geo import Geolocation as Geolocation_schema
 from src.schemas.user import UserCreate, UserUpdate
+from src.services.geo_index import geo_index
+from src.services.recipient_cache import recipient_cache
 
 logger = logging.getLogger(__name__)
 
@@ -120,11 +124,14 @@ class UserServices:
 
         try:
             await session.commit()
-            return True
         except Exception as e:
             await session.rollback()
             raise Exception(f"Failed to delete user: {str(e)}")
 
+        geo_index.remove(user_id)
+        recipient_cache.clear()
+        return True
+
     @classmethod
     async def get_all_user_pets(
             cls,
@@ -180,6 +187,7 @@ class UserServices:
                 GeoLocation_db.filter_type,
                 GeoLocation_db.region,
                 func.ST_AsText(GeoLocation_db.home_location).label("home_location"),
+                GeoLocation_db.home_location.label("home_point"),
                 GeoLocation_db.radius,
                 func.ST_AsText(GeoLocation_db.polygon).label("polygon"),
                 GeoLocation_db.use_current_location,
@@ -255,9 +263,15 @@ class UserServices:
             user_id: int,
             session: AsyncSession,
     ) -> int:
-        query = select(func.sum(
-            func.cardinality(Notification_db.recipient_ids)
-        )).where(Notification_db.sender_id == user_id)
+        query = (
+            select(func.count())
+            .select_from(NotificationDelivery_db)
+            .join(Notification_db, Notification_db.id == NotificationDelivery_db.notification_id)
+            .where(
+                Notification_db.sender_id == user_id,
+                NotificationDelivery_db.status == DeliveryStatus.DELIVERED,
+            )
+        )
         result = await session.execute(query)
         total = result.scalar()
 
@@ -1,19 +1,15 @@
-from src.schemas import GeolocationNearestResponseWithReports
-from src.schemas.report import ReportBasePhoto
+from src.schemas.report import ReportNearest
 
 
-def extract_data(
-        report: ReportBasePhoto,
-        geo_schema: GeolocationNearestResponseWithReports,
-) -> dict:
+def extract_data(report: ReportNearest) -> dict:
     report_id = report.id
     report_title = report.title
     report_content = report.content
     report_status = report.status
-    report_first_photo_url = report.photos[0].url if report.photos else None
-    report_region = geo_schema.region
-    geo = geo_schema.home_location
-    geo_distance = round(geo_schema.distance / 1000)
+    report_first_photo_url = report.first_photo_url
+    report_region = report.region
+    geo = report.location
+    geo_distance = round(report.distance / 1000)
 
     return {
         "report_id": report_id,
@@ -8,10 +8,14 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import TypeAdapter
 
+from src.broker.outbox_relay import outbox_relay
+from src.config.config import settings
 from src.config.logger import setup_logging
+from src.database.models.base_model import async_session_maker
 from src.schemas.pet import Pet
 from src.schemas.report import Report
 from src.schemas.user import User
+from src.services.geo_index import geo_index, geo_index_reloader
 from src.web.routers.api.geo import router as geo_api_router
 from src.web.routers.api.notifications import router as notifications_api_router
 
@@ -42,7 +46,19 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     connector = aiohttp.TCPConnector(limit=5)  # !!! ssl=False НЕ ДЛЯ ПРОДА
     session = aiohttp.ClientSession(connector=connector)
     app.state.aiohttp_session = session
+
+    if settings.GEO_INDEX_ENABLED:
+        async with async_session_maker() as db_session:
+            await geo_index.load(db_session)
+        geo_index_reloader.start()
+
+    # The relay connects the publisher in the background, the app starts without RabbitMQ
+    outbox_relay.start()
+
     yield
+    await geo_index_reloader.stop()
+    await outbox_relay.stop()
+    await outbox_relay.publisher.close()
     await session.close()
 
 app = FastAPI(
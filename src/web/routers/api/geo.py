@@ -1,13 +1,14 @@
 import logging
+import secrets
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.config.config import settings
 from src.database.db_session import get_async_session
-from src.database.models.geo import GeoFilterType
-from src.schemas.geo import Coordinates, GeolocationNearest
-from src.schemas.geo import Geolocation as Geolocation_schema
+from src.schemas.geo import Coordinates, GeolocationNearest, GeolocationUpsert, GeoPoint
 from src.services.geo_service import GeoServices
+from src.web.dependencies.get_data_from_cookie import get_user_id_from_cookie
 
 logger = logging.getLogger(__name__)
 
@@ -25,32 +26,38 @@ async def get_nearest_users_tguids_by_radius(
         session: AsyncSession = Depends(get_async_session),
 ) -> dict:
     nearest_users_tguids = await GeoServices.find_all_telegram_uids_within_radius(
-        geo_data=geo_data,
+        point=GeoPoint.from_wkt(geo_data.home_location),
+        radius=geo_data.radius,
         session=session,
     )
     logger.info(f"NEAR USERS TG LIST = {nearest_users_tguids}")
     return {"total": len(nearest_users_tguids), "nearest_users_tguids": nearest_users_tguids}
 
+@router.post("/cover/tg_uids",
+             summary="Get Users' Telegram IDs whose own radius covers the point",
+             response_model=dict,
+             )
+async def get_users_tguids_covering_point(
+        coords: Coordinates,
+        session: AsyncSession = Depends(get_async_session),
+) -> dict:
+    users_tguids = await GeoServices.find_all_telegram_uids_covering_point(
+        coords=GeoPoint(lon=coords.lon, lat=coords.lat),
+        session=session,
+    )
+    logger.info(f"COVERING USERS TG LIST = {users_tguids}")
+    return {"total": len(users_tguids), "users_tguids": users_tguids}
+
 @router.post("/city/tg_uids",
              summary="Get nearest Users' Telegram IDs by city",
              response_model=dict,
              )
 async def get_nearest_users_tguids_by_city(
-        coords: Coordinates,
         city: str,
         session: AsyncSession = Depends(get_async_session),
 ) -> dict:
-    geo_pydantic = Geolocation_schema(
-        id=1,
-        filter_type=GeoFilterType.REGION,
-        region=city,
-        home_location=f"POINT({coords.lon} {coords.lat})",
-        radius=5000,
-        polygon="POLYGON((30.5 50.45, 30.6 50.5, 30.55 50.55, 30.5 50.45))",
-    )
-
     nearest_users_tguids = await GeoServices.find_all_telegram_uids_by_city(
-        geo_data=geo_pydantic,
+        region=city,
         session=session,
     )
     logger.info(f"NEAR USERS TG LIST = {nearest_users_tguids}")
@@ -63,8 +70,42 @@ async def get_nearest_users_geos_by_radius(
         session: AsyncSession = Depends(get_async_session),
 ) -> dict:
     nearest_users = await GeoServices.find_all_geos_within_radius(
-        geo_data=geo_data,
+        point=GeoPoint.from_wkt(geo_data.home_location),
+        radius=geo_data.radius,
         session=session,
     )
     logger.info(f"NEAR_USERS = {nearest_users}")
     return {"total": len(nearest_users), "nearest_users": nearest_users}
+
+
+def is_service_request(request: Request) -> bool:
+    """
+    Check the request carries the service token that allows bulk writes for any user
+    """
+    token = request.headers.get("X-Service-Token")
+    if not token or not settings.GEO_BULK_SERVICE_TOKEN:
+        return False
+    return secrets.compare_digest(token, settings.GEO_BULK_SERVICE_TOKEN)
+
+
+@router.post("/bulk", summary="Create or replace Users' geolocations in bulk", response_model=dict)
+async def upsert_users_geos(
+        request: Request,
+        geos: list[GeolocationUpsert],
+        session: AsyncSession = Depends(get_async_session),
+) -> dict:
+    if not is_service_request(request):
+        user_id_str = get_user_id_from_cookie(request)
+        if not user_id_str:
+            raise HTTPException(status_code=401, detail="User not authorized")
+        if any(str(geo.user_id) != user_id_str for geo in geos):
+            raise HTTPException(
+                status_code=403,
+                detail="Not allowed to change other users' geolocations",
+            )
+
+    upserted = await GeoServices.upsert_geolocations(
+        geos=geos,
+        session=session,
+    )
+    return {"total": len(upserted), "geolocations": upserted}
@@ -267,14 +267,13 @@ async def get_user_geo_city(
 ) -> dict | None:
     user_geo = await UserServices.get_user_geolocation(user_id, session)
 
-    if user_geo is None:
+    if user_geo is None or user_geo.home_point is None:
         raise HTTPException(status_code=404, detail="User's geolocation not found")
 
     aiohttp_session = request.app.state.aiohttp_session
-    coordinates = (user_geo.home_location[6:-1]).split(" ")
     request_city = await get_city_from_geo(
-        lat=float(coordinates[1]),
-        lon=float(coordinates[0]),
+        lat=user_geo.home_point.lat,
+        lon=user_geo.home_point.lon,
         session=aiohttp_session,
     )
     if not request_city:
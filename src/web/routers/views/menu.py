@@ -9,15 +9,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.db_session import get_async_session
 from src.database.models.geo import GeoFilterType
-from src.schemas.geo import GeolocationNearest, GeolocationNearestWithRegion
 from src.schemas.pet import Pet as Pet_schema
 from src.schemas.pet import PetFirstPhotoResponse, PetHealthData
 from src.schemas.report import Report as Report_schema
 from src.schemas.report import ReportFirstPhotoResponse
-from src.services.geo_service import GeoServices
 from src.services.notification_service import NotificationServices
 from src.services.pet_service import PetServices
-from src.services.report_service import ReportServices
+from src.services.report_service import ReportServices, decode_cursor, encode_cursor
 from src.services.user_service import UserServices
 from src.web.dependencies.calculate_health_days import calculate_days_delta
 from src.web.dependencies.date_format import format_russian_date
@@ -131,6 +129,8 @@ async def show_reports_page(
 async def get_nearby_reports(
             request: Request,
             filter_type: str = Query(..., description="Geo filter type: radius, region, polygon"),
+            limit: int = Query(20, ge=1, le=100, description="Page size"),
+            cursor: str | None = Query(None, description="next_cursor of the previous page"),
             session: AsyncSession = Depends(get_async_session),
 ) -> JSONResponse:
     user_id_str = get_user_id_from_cookie(request)
@@ -141,6 +141,14 @@ async def get_nearby_reports(
             status_code=401,
         )
 
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        return JSONResponse(
+            content={"error": "Invalid cursor"},
+            status_code=400,
+        )
+
     user_id = int(user_id_str)
 
     async with asyncio.TaskGroup() as tg:
@@ -150,56 +158,38 @@ async def get_nearby_reports(
     user_db = user_db_task.result()
     user_geo = user_geo_task.result()
 
-    if user_db is None or user_geo is None:
+    if user_db is None or user_geo is None or user_geo.home_point is None:
         return JSONResponse(
             content={"error": "User not found"},
             status_code=404,
         )
 
-    geo_data: GeolocationNearest | GeolocationNearestWithRegion  # mypy assignment
-
     if filter_type == GeoFilterType.RADIUS:
-        geo_data = GeolocationNearest(
-            home_location=user_geo.home_location,
+        nearest_reports = await ReportServices.find_active_reports_within_radius(
+            point=user_geo.home_point,
             radius=user_geo.radius,
-        )
-        nearest_geo = await GeoServices.find_all_geos_within_radius_with_user_reports(
-            geo_data=geo_data,
+            user_id=user_db.id,
             session=session,
-        )
-        logger.info(
-            f"NEAREST GEO BF ({len(nearest_geo)}) = "
-            f"{[geo.__dict__ for geo in nearest_geo]}",
+            limit=limit + 1,  # one extra row tells if there is a next page
+            after=after,
         )
     elif filter_type == GeoFilterType.REGION:
-        geo_data = GeolocationNearestWithRegion(
-            home_location=user_geo.home_location,
-            radius=user_geo.radius,
+        nearest_reports = await ReportServices.find_active_reports_by_region(
+            point=user_geo.home_point,
             region=user_geo.region,
-        )
-        nearest_geo = await GeoServices.find_all_geos_by_city_with_user_reports(
-            geo_data=geo_data,
+            user_id=user_db.id,
             session=session,
-        )
-        logger.info(
-            f"NEAREST GEO BF ({len(nearest_geo)}) = "
-            f"{[geo.__dict__ for geo in nearest_geo]}",
+            limit=limit + 1,  # one extra row tells if there is a next page
+            after=after,
         )
     elif filter_type == GeoFilterType.POLYGON:
-
-        # THE SAME AS FOR GeoFilterType.RADIUS
-        # WILL BE UPDATED LATER
-        geo_data = GeolocationNearest(
-            home_location=user_geo.home_location,
-            radius=user_geo.radius,
-        )
-        nearest_geo = await GeoServices.find_all_geos_within_radius_with_user_reports(
-            geo_data=geo_data,
+        nearest_reports = await ReportServices.find_active_reports_within_polygon(
+            point=user_geo.home_point,
+            polygon=user_geo.polygon,
+            user_id=user_db.id,
             session=session,
-        )
-        logger.info(
-            f"NEAREST GEO BF ({len(nearest_geo)}) = "
-            f"{[geo.__dict__ for geo in nearest_geo]}",
+            limit=limit + 1,  # one extra row tells if there is a next page
+            after=after,
         )
     else:
         return JSONResponse(
@@ -207,42 +197,14 @@ async def get_nearby_reports(
             status_code=400,
         )
 
-    if len(nearest_geo) >= 1:
-        nearest_geo_dict = {geo.user.id: geo for geo in nearest_geo}
-        user_to_remove = user_db.id
-
-        if user_to_remove in nearest_geo_dict:
-            del nearest_geo_dict[user_to_remove]
+    page = nearest_reports[:limit]
+    next_cursor = encode_cursor(page[-1]) if len(nearest_reports) > limit else None
 
-        nearest_geo_reports = list(nearest_geo_dict.values())
-        logger.info(
-            f"NEAREST GEO AFT ({len(nearest_geo_reports)}) = "
-            f"{[geo.__dict__ for geo in nearest_geo]}",
-        )
-
-        """
-         {
-            "report_id": report_id,
-            "report_title": report_title,
-            "report_content": report_content,
-            "report_status": report_status,
-            "report_first_photo_url": report_first_photo_url,
-            "report_region": report_region,
-            "geo": geo,
-            "geo_distance": geo_distance,
-        }
-        """
-
-        nearest_reports_with_data = []
-        for geo_schema in nearest_geo_reports:
-            for report in geo_schema.reports:
-                nearest_reports_with_data.append(extract_data(report, geo_schema))
-
-    else:
-        nearest_reports_with_data = []
+    logger.info(f"NEAREST REPORTS ({len(page)}) for user {user_db.id}")
+    nearest_reports_with_data = [extract_data(report) for report in page]
 
     return JSONResponse(
-        content={"reports": nearest_reports_with_data},
+        content={"reports": nearest_reports_with_data, "next_cursor": next_cursor},
     )
 
 @router.get("/health", response_class=HTMLResponse, include_in_schema=True)
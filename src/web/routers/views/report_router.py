@@ -10,12 +10,10 @@ from fastapi.templating import Jinja2Templates
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.broker.producer import send_task_to_rabbitmq
+from src.broker.outbox_relay import outbox_relay
 from src.config.config import settings
 from src.database.db_session import get_async_session
-from src.database.models.geo import GeoFilterType
 from src.schemas import ReportCreate, ReportPhotoCreate, ReportUpdate
-from src.schemas.geo import GeolocationNearest
 from src.schemas.notification import NotificationCreate, NotificationMethod
 from src.services.geo_service import GeoServices
 from src.services.notification_service import NotificationServices
@@ -109,42 +107,6 @@ async def create_report_with_photos(
             status_code=404,
         )
 
-    try:
-        new_report_schema = ReportCreate(
-            title=title,
-            content=content,
-        )
-
-        report_created = await ReportServices.create_report(
-            report_data=new_report_schema,
-            user_id=user_id,
-            pet_id=pet_id,
-            session=session,
-        )
-        if report_created is None:
-            return JSONResponse(
-                content={
-                    "status": "error",
-                    "message": "У этого питомца уже есть активное объявление!",
-                },
-                status_code=400,
-            )
-    except ValidationError as e:
-        logger.error(f"ValidationError = {e}")
-        return JSONResponse(
-            content={"status": "error", "message": "Ошибка валидации. Проверьте введенные поля"},
-            status_code=422,
-        )
-    except Exception as e:
-        logger.error(f"Report creation error = {e}")
-        return JSONResponse(
-            content={
-                "status": "error",
-                "message": "Ошибка при создании объявления. Попробуйте снова",
-            },
-            status_code=500,
-        )
-
     logger.info(f"Получен запрос на загрузку {len(photos)} фото от пользователя {user_id_str}")
 
     if not photos:
@@ -222,74 +184,91 @@ async def create_report_with_photos(
             continue
         report_photo_urls.append(url)
 
-    report_photo_schemas = [ReportPhotoCreate(url=url) for url in report_photo_urls]
+    if not user_geo:
+        return JSONResponse(
+            content={"status": "error", "message": "Отсутствует геолокация"},
+            status_code=404,
+        )
+
+    recipients_telegram_ids = await GeoServices.find_all_telegram_uids_for_report(
+        coords=user_geo.home_point,
+        region=user_geo.region,
+        session=session,
+    )
 
     try:
+        new_report_schema = ReportCreate(
+            title=title,
+            content=content,
+        )
+
+        # Report, photos, notification and its outbox messages are committed together
+        report_created = await ReportServices.create_report(
+            report_data=new_report_schema,
+            user_id=user_id,
+            pet_id=pet_id,
+            session=session,
+            location=user_geo.home_point,
+            region=user_geo.region,
+            commit=False,
+        )
+        if report_created is None:
+            return JSONResponse(
+                content={
+                    "status": "error",
+                    "message": "У этого питомца уже есть активное объявление!",
+                },
+                status_code=400,
+            )
+
         report_photo_created = await ReportPhotoServices.create_many_report_photos(
             report_id=report_created.id,
-            report_photo_data_list=report_photo_schemas,
+            report_photo_data_list=[ReportPhotoCreate(url=url) for url in report_photo_urls],
+            session=session,
+            commit=False,
+        )
+
+        notification_schema = NotificationCreate(
+            method=NotificationMethod.TELEGRAM_CHAT,
+            message=notification_content(report_created, reported_pet),
+            recipient_ids=recipients_telegram_ids,
+            sender_id=user_id,
+            report_id=report_created.id,
+        )
+        report_url = f"{settings.MAIN_DOMEN}/reports/{report_created.id}"
+        logger.info(f"REPORT URL = {report_url}")
+
+        report_notification = await NotificationServices.create_notification_with_outbox(
+            notif_data=notification_schema,
+            url=report_url,
             session=session,
+            commit=False,
+        )
+        await session.commit()
+    except ValidationError as e:
+        await session.rollback()
+        logger.error(f"ValidationError = {e}")
+        return JSONResponse(
+            content={"status": "error", "message": "Ошибка валидации. Проверьте введенные поля"},
+            status_code=422,
         )
     except Exception as e:
-        logger.error(f"Report Photo creating error = {e}")
+        await session.rollback()
+        logger.error(f"Report creation error = {e}")
         return JSONResponse(
-            content={"status": "error", "message": "Ошибка при добавлении фотографий"},
+            content={
+                "status": "error",
+                "message": "Ошибка при создании объявления. Попробуйте снова",
+            },
             status_code=500,
         )
 
+    outbox_relay.notify()
+
     logger.info(f"Report created = {report_created.__dict__}")
     logger.info(f"Report with id={report_created.id} photos added = {report_photo_created}")
-
-    if user_geo:
-        if user_geo.filter_type == GeoFilterType.REGION:
-
-            recipients_telegram_ids = await GeoServices.find_all_telegram_uids_by_city(
-                geo_data=user_geo,
-                session=session,
-            )
-        elif user_geo.filter_type == GeoFilterType.RADIUS:
-
-            user_geo_nearest_by_radius = GeolocationNearest(
-                home_location=user_geo.home_location,
-                radius=user_geo.radius,
-            )
-
-            recipients_telegram_ids = await GeoServices.find_all_telegram_uids_within_radius(
-                geo_data=user_geo_nearest_by_radius,
-                session=session,
-            )
-        elif user_geo.filter_type == GeoFilterType.POLYGON:
-            recipients_telegram_ids = [237716145, 237716145, 237716145, 237716145, 237716145]
-        else:
-            logger.error("No filter type")
-            return JSONResponse(
-                content={"status": "error", "message": "Некорректная настройка уведомлений"},
-                status_code=404,
-            )
-    else:
-        return JSONResponse(
-            content={"status": "error", "message": "Отсутствует геолокация"},
-            status_code=404,
-        )
-
-    notification_schema = NotificationCreate(
-        method=NotificationMethod.TELEGRAM_CHAT,
-        message=notification_content(report_created, reported_pet),
-        recipient_ids=recipients_telegram_ids,
-        sender_id=user_id,
-        report_id=report_created.id,
-    )
-    report_notification = await NotificationServices.create_notification(
-        notif_data=notification_schema,
-        session=session,
-    )
-
     logger.info(f"-- REPORT NOTIF = {report_notification.__dict__}")
 
-    report_url = f"{settings.MAIN_DOMEN}/reports/{report_created.id}"
-    logger.info(f"REPORT URL = {report_url}")
-    await send_task_to_rabbitmq(report_notification, report_url)
-
     return JSONResponse(
         content={
             "status": "success",
@@ -86,13 +86,11 @@ async def show_user_settings_page(
     user_photo_url_str = user.telegram_photo
 
     user_geo = await UserServices.get_user_geolocation(user_id, session)
-    if user_geo:
-        user_coords = (user_geo.home_location[6:-1]).split(" ")
-
+    if user_geo and user_geo.home_point:
         aiohttp_session = request.app.state.aiohttp_session
         user_address_dict = await get_city_from_geo(
-            lat=float(user_coords[1]),
-            lon=float(user_coords[0]),
+            lat=user_geo.home_point.lat,
+            lon=user_geo.home_point.lon,
             session=aiohttp_session,
         )
     else:
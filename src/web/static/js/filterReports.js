@@ -3,6 +3,12 @@ document.addEventListener('DOMContentLoaded', function() {
     const loadingSpinner = document.getElementById('loading-spinner');
     const errorMessage = document.getElementById('error-message');
     const nearbyContainer = document.getElementById('nearby-reports-container');
+    const loadMoreButton = document.getElementById('load-more-button');
+
+    const PAGE_SIZE = 20;
+    let currentFilter = 'radius';
+    let nextCursor = null;
+    let requestId = 0;
 
     // Автоматически загружаем объявления при загрузке страницы
     loadReports('radius');
@@ -11,25 +17,46 @@ document.addEventListener('DOMContentLoaded', function() {
         loadReports(this.value);
     });
 
-    async function loadReports(filterType) {
+    loadMoreButton.addEventListener('click', function() {
+        if (nextCursor) {
+            loadReports(currentFilter, nextCursor);
+        }
+    });
+
+    async function loadReports(filterType, cursor = null) {
+        // Ответ на устаревший запрос (сменили фильтр) игнорируем
+        const thisRequest = ++requestId;
+        currentFilter = filterType;
+
         // Скрываем ошибки и показываем загрузку
         errorMessage.style.display = 'none';
         loadingSpinner.style.display = 'block';
-        nearbyContainer.innerHTML = '';
+        loadMoreButton.style.display = 'none';
+        if (!cursor) {
+            nearbyContainer.innerHTML = '';
+        }
 
         try {
-            const response = await fetch(`/reports/nearby?filter_type=${filterType}`);
+            const params = new URLSearchParams({ filter_type: filterType, limit: PAGE_SIZE });
+            if (cursor) {
+                params.append('cursor', cursor);
+            }
+            const response = await fetch(`/reports/nearby?${params}`);
 
             if (!response.ok) {
                 throw new Error('Ошибка сервера');
             }
 
             const data = await response.json();
+            if (thisRequest !== requestId) {
+                return;
+            }
             loadingSpinner.style.display = 'none';
+            nextCursor = data.next_cursor;
 
             if (data.reports && data.reports.length > 0) {
                 renderReports(data.reports);
-            } else {
+            } else if (!cursor) {
                 nearbyContainer.innerHTML = `
                     <div class="report-no-ads-card">
                         <div class="report-content">
@@ -39,7 +66,14 @@ document.addEventListener('DOMContentLoaded', function() {
                 `;
             }
 
+            if (nextCursor) {
+                loadMoreButton.style.display = 'block';
+            }
+
         } catch (error) {
+            if (thisRequest !== requestId) {
+                return;
+            }
             console.error('Ошибка:', error);
             loadingSpinner.style.display = 'none';
             errorMessage.style.display = 'block';
@@ -72,7 +106,7 @@ document.addEventListener('DOMContentLoaded', function() {
             </a>
         `).join('');
 
-        nearbyContainer.innerHTML = reportsHtml;
+        nearbyContainer.insertAdjacentHTML('beforeend', reportsHtml);
     }
 
     function getBadgeColor(status) {
@@ -0,0 +1,45 @@
+import pytest
+from aiogram.exceptions import TelegramForbiddenError, TelegramServerError
+from aiogram.methods import SendMessage
+
+from src.bot.handlers import notification
+from src.database.models import DeliveryStatus
+
+METHOD = SendMessage(chat_id=1, text="x")
+
+
+@pytest.fixture
+def send_raises(monkeypatch):
+    errors = []
+
+    async def acquire(telegram_id):
+        pass
+
+    async def send_message(**kwargs):
+        raise errors.pop(0)
+
+    monkeypatch.setattr(notification.telegram_limiter, "acquire", acquire)
+    monkeypatch.setattr(notification.bot, "send_message", send_message)
+    return errors
+
+
+async def test_blocked_bot_is_a_final_failure(send_raises):
+    send_raises.append(TelegramForbiddenError(METHOD, "Forbidden: bot was blocked by the user"))
+    status = await notification.send_message_to_user(1, "x", None)
+    assert status == DeliveryStatus.FAILED
+
+
+async def test_server_error_is_retried_later(send_raises):
+    send_raises.append(TelegramServerError(METHOD, "Internal Server Error"))
+    status = await notification.send_message_to_user(1, "x", None)
+    assert status == DeliveryStatus.RETRYING
+
+
+async def test_digest_reports_retry_over_final_failure(send_raises):
+    send_raises.extend([
+        TelegramForbiddenError(METHOD, "Forbidden"),
+        TelegramServerError(METHOD, "Bad Gateway"),
+    ])
+    alerts = [("x", "https://x/1")] * (notification.DIGEST_MAX_ALERTS + 1)
+    status = await notification.send_digest_to_user(1, alerts)
+    assert status == DeliveryStatus.RETRYING
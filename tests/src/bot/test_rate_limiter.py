@@ -0,0 +1,47 @@
+import asyncio
+import time
+
+from src.bot.rate_limiter import TelegramRateLimiter, TokenBucket
+
+
+async def test_bucket_spends_burst_then_waits():
+    bucket = TokenBucket(rate=100, capacity=5)
+
+    start = time.monotonic()
+    for _ in range(15):
+        await bucket.acquire()
+
+    # 5 tokens at once, 10 more refilled at 100 per second
+    assert time.monotonic() - start >= 0.09
+
+
+async def test_pause_blocks_acquire():
+    bucket = TokenBucket(rate=1000, capacity=10)
+    bucket.pause(0.05)
+
+    start = time.monotonic()
+    await bucket.acquire()
+    assert time.monotonic() - start >= 0.045
+
+
+async def test_same_chat_is_throttled_others_are_not():
+    limiter = TelegramRateLimiter(global_rate=1000, chat_rate=20)
+
+    start = time.monotonic()
+    await asyncio.gather(*(limiter.acquire(chat_id) for chat_id in range(50)))
+    assert time.monotonic() - start < 0.04
+
+    start = time.monotonic()
+    await asyncio.gather(*(limiter.acquire(7) for _ in range(3)))
+    # the first send into chat 7 already used its token
+    assert time.monotonic() - start >= 0.14
+
+
+async def test_idle_chats_are_pruned():
+    limiter = TelegramRateLimiter(global_rate=1000, chat_rate=1000, max_chats=10)
+    for chat_id in range(10):
+        await limiter.acquire(chat_id)
+    await asyncio.sleep(0.01)
+
+    await limiter.acquire(100)
+    assert len(limiter._chats) == 1
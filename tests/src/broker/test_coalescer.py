@@ -0,0 +1,170 @@
+import asyncio
+import contextlib
+from datetime import UTC, datetime
+
+from src.bot.handlers.notification import MESSAGE_MAX_LENGTH, digest_content, telegram_length
+from src.broker import consumer
+from src.broker.coalescer import Coalescer, UndeliveredError
+from src.database.models import DeliveryStatus
+from src.schemas.notification import NotificationWithUrl
+
+
+def alert(notif_id, recipient_ids, message="Пропала собака возле парка"):
+    now = datetime.now(UTC)
+    return NotificationWithUrl(
+        id=notif_id,
+        message=message,
+        created_at=now,
+        updated_at=now,
+        recipient_ids=recipient_ids,
+        sender_id=1,
+        report_id=notif_id,
+        url=f"https://x/{notif_id}",
+    )
+
+
+async def test_notifications_within_window_are_one_batch():
+    batches = []
+
+    async def deliver(notifications):
+        batches.append([notification.id for notification in notifications])
+        return [True] * len(notifications)
+
+    coalescer = Coalescer(window=0.02, deliver=deliver)
+    await asyncio.gather(*(coalescer.submit(alert(i, [1])) for i in range(3)))
+    await coalescer.submit(alert(3, [1]))
+
+    assert batches == [[0, 1, 2], [3]]
+
+
+async def test_idle_coalescer_delivers_right_away():
+    batches = []
+    release = asyncio.Event()
+
+    async def deliver(notifications):
+        batches.append([notification.id for notification in notifications])
+        if len(batches) == 1:
+            await release.wait()
+        return [True] * len(notifications)
+
+    coalescer = Coalescer(window=0.05, deliver=deliver)
+    first = asyncio.create_task(coalescer.submit(alert(1, [1])))
+    await asyncio.sleep(0.01)
+    assert batches == [[1]]
+
+    # Alerts arriving while a batch is on its way share the window
+    later = [asyncio.create_task(coalescer.submit(alert(i, [1]))) for i in (2, 3)]
+    await asyncio.sleep(0.01)
+    assert batches == [[1]]
+
+    release.set()
+    await asyncio.gather(first, *later)
+    assert batches == [[1], [2, 3]]
+
+
+async def test_batch_error_reaches_every_submitter():
+    async def deliver(notifications):
+        raise RuntimeError("broken")
+
+    coalescer = Coalescer(window=0, deliver=deliver)
+    results = await asyncio.gather(
+        coalescer.submit(alert(1, [1])),
+        coalescer.submit(alert(2, [1])),
+        return_exceptions=True,
+    )
+    assert [str(result) for result in results] == ["broken", "broken"]
+
+
+async def test_only_undelivered_notifications_fail():
+    async def deliver(notifications):
+        return [notification.id != 2 for notification in notifications]
+
+    coalescer = Coalescer(window=0, deliver=deliver)
+    results = await asyncio.gather(
+        coalescer.submit(alert(1, [1])),
+        coalescer.submit(alert(2, [1])),
+        return_exceptions=True,
+    )
+    assert results[0] is None
+    assert isinstance(results[1], UndeliveredError)
+
+
+def test_digest_fits_telegram_limit():
+    text = digest_content(["x" * 1000] * 10)
+    assert telegram_length(text) <= MESSAGE_MAX_LENGTH
+    assert text.count("…") == 10
+
+
+def test_digest_counts_emoji_as_telegram_does():
+    # Every 📢🐶🙏 takes two UTF-16 code units, so the text is twice as long for Telegram
+    text = digest_content(["📢🐶🙏" * 300] * 10)
+    assert telegram_length(text) <= MESSAGE_MAX_LENGTH
+    assert len(text) < telegram_length(text)
+    assert "\ufffd" not in text
+
+
+def patch_delivery(monkeypatch, delivered, failed=(), rejected=()):
+    recorded = {}
+    sent = {}
+
+    class Services:
+        @staticmethod
+        async def find_finished_telegram_ids(notif_id, telegram_ids, session):
+            return delivered.get(notif_id, set())
+
+        @staticmethod
+        async def record_deliveries(outcomes, session):
+            # Every send is recorded on its own, right after it completes
+            assert len({tg_id for _, tg_id in outcomes}) == 1
+            recorded.update(outcomes)
+
+    async def send_alerts_to_user(telegram_id, alerts):
+        sent[telegram_id] = alerts
+        if telegram_id in failed:
+            return DeliveryStatus.RETRYING
+        if telegram_id in rejected:
+            return DeliveryStatus.FAILED
+        return DeliveryStatus.DELIVERED
+
+    @contextlib.asynccontextmanager
+    async def session_maker():
+        yield None
+
+    monkeypatch.setattr(consumer, "NotificationServices", Services)
+    monkeypatch.setattr(consumer, "send_alerts_to_user", send_alerts_to_user)
+    monkeypatch.setattr(consumer, "async_session_maker", session_maker)
+    return sent, recorded
+
+
+async def test_overlapping_alerts_become_one_message(monkeypatch):
+    sent, recorded = patch_delivery(monkeypatch, delivered={1: {10}})
+
+    results = await consumer.deliver_notifications(
+        [alert(1, [10, 11, 12]), alert(2, [11, 13])],
+    )
+
+    assert results == [True, True]
+    assert sorted(sent) == [11, 12, 13]
+    assert [url for _, url in sent[11]] == ["https://x/1", "https://x/2"]
+    assert set(recorded) == {(1, 11), (1, 12), (2, 11), (2, 13)}
+    assert set(recorded.values()) == {DeliveryStatus.DELIVERED}
+
+
+async def test_chunks_with_failed_recipients_are_reported(monkeypatch):
+    _, recorded = patch_delivery(monkeypatch, delivered={}, failed={13})
+
+    results = await consumer.deliver_notifications(
+        [alert(1, [10, 11]), alert(2, [11, 13]), alert(3, [13])],
+    )
+
+    assert results == [True, False, False]
+    assert recorded[(2, 13)] == recorded[(3, 13)] == DeliveryStatus.RETRYING
+
+
+async def test_recipients_telegram_refused_are_not_retried(monkeypatch):
+    _, recorded = patch_delivery(monkeypatch, delivered={}, failed={13}, rejected={12})
+
+    results = await consumer.deliver_notifications([alert(1, [11, 12]), alert(2, [12, 13])])
+
+    assert results == [True, False]
+    assert recorded[(1, 12)] == recorded[(2, 12)] == DeliveryStatus.FAILED
@@ -0,0 +1,100 @@
+import asyncio
+
+from src.broker.consumer import NotificationConsumer
+
+
+class FakeQueue:
+    def __init__(self):
+        self.callback = None
+        self.cancelled = False
+
+    async def consume(self, callback):
+        self.callback = callback
+        return "tag"
+
+    async def cancel(self, consumer_tag):
+        self.cancelled = True
+
+
+class FakeChannel:
+    def __init__(self, queue):
+        self.queue = queue
+        self.default_exchange = None
+        self.prefetch = None
+
+    async def set_qos(self, prefetch_count):
+        self.prefetch = prefetch_count
+
+    async def declare_queue(self, name, durable, arguments=None):
+        return self.queue
+
+
+class FakeConnection:
+    def __init__(self, queue):
+        self.queue = queue
+        self.closed = False
+        self.channels = []
+
+    async def channel(self):
+        channel = FakeChannel(self.queue)
+        self.channels.append(channel)
+        return channel
+
+    async def close(self):
+        self.closed = True
+
+
+async def test_stop_waits_for_in_flight_messages():
+    queue = FakeQueue()
+    connection = FakeConnection(queue)
+    finished = []
+
+    async def handler(exchange, message):
+        await asyncio.sleep(0.02)
+        finished.append(message)
+
+    async def connect():
+        return connection
+
+    consumer = NotificationConsumer(connect, routing_key="alerts", prefetch=7, handler=handler)
+    run = asyncio.create_task(consumer.run())
+    await asyncio.sleep(0)
+
+    deliveries = [asyncio.create_task(queue.callback(i)) for i in range(3)]
+    await asyncio.sleep(0)
+    consumer.stop()
+    await run
+
+    assert queue.cancelled
+    assert connection.closed
+    assert connection.channels[0].prefetch == 7
+    assert sorted(finished) == [0, 1, 2]
+    await asyncio.gather(*deliveries)
+
+
+async def test_drain_gives_up_after_timeout():
+    queue = FakeQueue()
+    connection = FakeConnection(queue)
+
+    async def handler(exchange, message):
+        await asyncio.sleep(10)
+
+    async def connect():
+        return connection
+
+    consumer = NotificationConsumer(
+        connect,
+        routing_key="alerts",
+        prefetch=1,
+        handler=handler,
+        drain_timeout=0.01,
+    )
+    run = asyncio.create_task(consumer.run())
+    await asyncio.sleep(0)
+    delivery = asyncio.create_task(queue.callback(1))
+    await asyncio.sleep(0)
+    consumer.stop()
+    await run
+
+    assert connection.closed
+    delivery.cancel()
@@ -0,0 +1,108 @@
+import contextlib
+from types import SimpleNamespace
+
+from src.broker import consumer
+from src.broker.coalescer import UndeliveredError
+from src.broker.topology import RETRY_HEADER, retry_delay
+
+
+class FakeExchange:
+    def __init__(self):
+        self.published = []
+
+    async def publish(self, message, routing_key):
+        self.published.append((routing_key, message.headers))
+
+
+def incoming(body, headers=None):
+    message = SimpleNamespace(body=body, headers=headers or {}, acked=False)
+
+    async def ack():
+        message.acked = True
+
+    message.ack = ack
+    return message
+
+
+def test_retry_delays_grow_and_run_out():
+    assert [retry_delay(attempt) for attempt in (1, 2, 3, 4)] == [5, 30, 300, None]
+
+
+async def test_failed_message_goes_to_next_delay_queue(monkeypatch):
+    monkeypatch.setattr(consumer.settings, "RMQ_ROUTING_KEY", "alerts")
+    exchange = FakeExchange()
+    message = incoming(b"{}", {RETRY_HEADER: 1})
+
+    await consumer.retry_later(exchange, message)
+
+    assert exchange.published == [("alerts.retry.30s", {RETRY_HEADER: 2})]
+    assert message.acked
+
+
+async def test_message_out_of_retries_is_parked(monkeypatch):
+    monkeypatch.setattr(consumer.settings, "RMQ_ROUTING_KEY", "alerts")
+    exchange = FakeExchange()
+    message = incoming(b"{}", {RETRY_HEADER: 3})
+
+    await consumer.retry_later(exchange, message)
+
+    assert exchange.published == [("alerts.dead", {RETRY_HEADER: 4})]
+
+
+async def test_poison_message_is_parked_without_retries(monkeypatch):
+    monkeypatch.setattr(consumer.settings, "RMQ_ROUTING_KEY", "alerts")
+    exchange = FakeExchange()
+    message = incoming(b"not json")
+
+    await consumer.process_new_message(exchange, message)
+
+    assert exchange.published == [("alerts.dead", {RETRY_HEADER: 0})]
+    assert message.acked
+
+
+async def test_undelivered_chunk_is_retried(monkeypatch):
+    monkeypatch.setattr(consumer.settings, "RMQ_ROUTING_KEY", "alerts")
+
+    async def submit(notification):
+        raise UndeliveredError("recipient 13 failed")
+
+    async def parse_notification(body):
+        return SimpleNamespace(id=1, chunk=0)
+
+    monkeypatch.setattr(consumer, "parse_notification", parse_notification)
+    monkeypatch.setattr(consumer.coalescer, "submit", submit)
+    exchange = FakeExchange()
+    message = incoming(b"{}")
+
+    await consumer.process_new_message(exchange, message)
+
+    assert exchange.published == [("alerts.retry.5s", {RETRY_HEADER: 1})]
+    assert message.acked
+
+
+async def test_rendered_message_expires(monkeypatch):
+    now = 1000.0
+    renders = []
+
+    class Services:
+        @staticmethod
+        async def find_one_or_none_by_id(report_id, session):
+            renders.append(report_id)
+            return SimpleNamespace(pet=SimpleNamespace())
+
+    @contextlib.asynccontextmanager
+    async def session_maker():
+        yield None
+
+    monkeypatch.setattr(consumer.time, "monotonic", lambda: now)
+    monkeypatch.setattr(consumer, "ReportServices", Services)
+    monkeypatch.setattr(consumer, "async_session_maker", session_maker)
+    monkeypatch.setattr(consumer, "notification_content", lambda report, pet: f"v{len(renders)}")
+    monkeypatch.setattr(consumer, "rendered_messages", {})
+
+    assert await consumer.render_message(7) == "v1"
+    now += consumer.RENDERED_CACHE_TTL - 1
+    assert await consumer.render_message(7) == "v1"
+    now += 2
+    assert await consumer.render_message(7) == "v2"
+    assert renders == [7, 7]
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from src.broker.outbox_relay import OutboxRelay, outbox_relay
+
+
+class FlakyPublisher:
+    confirms = True
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.attempts = 0
+
+    async def start(self):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise ConnectionError("broker is down")
+
+
+class CountingRelay(OutboxRelay):
+    def __init__(self, batches, publisher=None):
+        super().__init__(
+            session_maker=None,
+            publisher=publisher or FlakyPublisher(),
+            batch_size=10,
+            interval=60,
+            min_backoff=0.001,
+            max_backoff=0.004,
+        )
+        self.batches = batches
+        self.calls = 0
+
+    async def relay_batch(self):
+        self.calls += 1
+        return self.batches.pop(0) if self.batches else 0
+
+
+async def test_full_batches_are_drained_without_waiting():
+    relay = CountingRelay([10, 10, 3])
+    relay.start()
+    await asyncio.sleep(0.01)
+    await relay.stop()
+
+    assert relay.calls == 3
+
+
+async def test_notify_wakes_relay_before_poll_interval():
+    relay = CountingRelay([])
+    relay.start()
+    await asyncio.sleep(0.01)
+    assert relay.calls == 1
+
+    relay.notify()
+    await asyncio.sleep(0.01)
+    await relay.stop()
+    assert relay.calls == 2
+
+
+async def test_publisher_is_started_with_backoff(monkeypatch):
+    delays = []
+    sleep = asyncio.sleep
+
+    async def record_sleep(delay):
+        delays.append(delay)
+        await sleep(0)
+
+    publisher = FlakyPublisher(failures=4)
+    relay = CountingRelay([], publisher=publisher)
+    monkeypatch.setattr(asyncio, "sleep", record_sleep)
+    relay.start()
+    for _ in range(20):
+        await sleep(0)
+    await relay.stop()
+
+    assert publisher.attempts == 5
+    assert delays == [0.001, 0.002, 0.004, 0.004]
+    assert relay.calls == 1
+
+
+def test_relay_requires_publisher_confirms():
+    publisher = FlakyPublisher()
+    publisher.confirms = False
+    with pytest.raises(ValueError):
+        CountingRelay([], publisher=publisher)
+
+    assert outbox_relay.publisher.confirms
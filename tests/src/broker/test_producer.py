@@ -0,0 +1,125 @@
+import asyncio
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+import pytest
+
+from src.broker.producer import RabbitPublisher, encode_notification_chunks
+from src.schemas.notification import NotificationMethod, NotificationWithUrl
+
+
+class FakeExchange:
+    def __init__(self, broker):
+        self.broker = broker
+
+    async def publish(self, message, routing_key):
+        self.broker.in_flight += 1
+        self.broker.max_in_flight = max(self.broker.max_in_flight, self.broker.in_flight)
+        await asyncio.sleep(0.001)
+        self.broker.in_flight -= 1
+        if message.body in self.broker.reject:
+            raise RuntimeError("nack")
+        self.broker.published.append((routing_key, message.body))
+
+
+class FakeChannel:
+    def __init__(self, broker, confirms):
+        self.confirms = confirms
+        self.default_exchange = FakeExchange(broker)
+
+    async def declare_queue(self, name, durable, arguments=None):
+        pass
+
+    async def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.connections = 0
+        self.channels = []
+        self.published = []
+        self.reject = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def connect(self):
+        self.connections += 1
+        return self
+
+    async def channel(self, publisher_confirms=True):
+        channel = FakeChannel(self, publisher_confirms)
+        self.channels.append(channel)
+        return channel
+
+    async def close(self):
+        pass
+
+
+async def test_publish_reuses_connection():
+    broker = FakeConnection()
+    publisher = RabbitPublisher(broker.connect, routing_key="queue", pool_size=2)
+
+    for i in range(10):
+        await publisher.publish(str(i).encode())
+    await publisher.close()
+
+    assert broker.connections == 1
+    assert len(broker.published) == 10
+    assert not broker.channels[-1].confirms
+
+
+async def test_publish_many_bounds_in_flight():
+    broker = FakeConnection()
+    publisher = RabbitPublisher(
+        broker.connect,
+        routing_key="queue",
+        pool_size=2,
+        confirms=True,
+        max_in_flight=8,
+    )
+
+    published = await publisher.publish_many(str(i).encode() for i in range(100))
+
+    assert published == 100
+    assert broker.max_in_flight == 8
+    assert broker.channels[-1].confirms
+
+
+async def test_publish_many_raises_after_failed_confirms():
+    broker = FakeConnection()
+    broker.reject = {b"3", b"7"}
+    publisher = RabbitPublisher(broker.connect, routing_key="queue", pool_size=1, confirms=True)
+
+    with pytest.raises(Exception, match="2 of 10"):
+        await publisher.publish_many(str(i).encode() for i in range(10))
+    assert len(broker.published) == 8
+
+
+def make_notification(recipient_ids):
+    now = datetime.now(UTC)
+    return SimpleNamespace(
+        id=1,
+        method=NotificationMethod.TELEGRAM_CHAT,
+        message="Lost dog near the park",
+        created_at=now,
+        updated_at=now,
+        recipient_ids=recipient_ids,
+        sender_id=2,
+        report_id=3,
+    )
+
+
+def test_recipients_are_split_into_chunks():
+    bodies = encode_notification_chunks(make_notification(list(range(250))), "https://x/3", 100)
+
+    chunks = [NotificationWithUrl.model_validate_json(body) for body in bodies]
+    assert [len(chunk.recipient_ids) for chunk in chunks] == [100, 100, 50]
+    assert [chunk.chunk for chunk in chunks] == [0, 1, 2]
+    assert {chunk.chunks for chunk in chunks} == {3}
+    assert sum((chunk.recipient_ids for chunk in chunks), []) == list(range(250))
+    assert {chunk.url for chunk in chunks} == {"https://x/3"}
+
+
+def test_no_recipients_no_chunks():
+    assert encode_notification_chunks(make_notification([]), "https://x/3", 100) == []
@@ -0,0 +1,30 @@
+import pytest
+
+from src.broker.wire import MAGIC, decode_compact, encode_compact, is_compact
+
+
+def test_round_trip_keeps_large_telegram_ids():
+    recipient_ids = [1, 7_000_000_000, 2**63 - 1]
+    body = encode_compact(5, 9, recipient_ids, chunk=2, chunks=3)
+
+    assert is_compact(body)
+    assert len(body) == 3 + 8 * 2 + 2 * 2 + 4 + 8 * len(recipient_ids)
+    decoded = decode_compact(body)
+    assert decoded.id == 5
+    assert decoded.report_id == 9
+    assert (decoded.chunk, decoded.chunks) == (2, 3)
+    assert decoded.recipient_ids == recipient_ids
+
+
+def test_json_is_not_compact():
+    assert not is_compact(b'{"id": 1}')
+
+
+@pytest.mark.parametrize("body", [
+    MAGIC,
+    encode_compact(1, 1, [1, 2])[:-1],
+    b"XX\x01" + encode_compact(1, 1, [])[3:],
+])
+def test_malformed_body_raises_value_error(body):
+    with pytest.raises(ValueError):
+        decode_compact(body)
@@ -0,0 +1,161 @@
+from collections.abc import Iterator
+from datetime import UTC, datetime, time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.celery_app import beat_schedule
+from src.database.models import Pet, ReminderLog, User
+from src.database.models.association_tables import user_pet_association
+
+
+@pytest.fixture
+def session_maker(monkeypatch) -> Iterator[sessionmaker]:
+    engine = create_engine("sqlite://")
+    tables = [Pet.__table__, User.__table__, ReminderLog.__table__, user_pet_association]
+    Pet.metadata.create_all(engine, tables=tables)  # type: ignore[arg-type]
+    session_maker = sessionmaker(bind=engine)
+    monkeypatch.setattr(beat_schedule, "celery_sync_session_maker", session_maker)
+    # Scan every bucket
+    monkeypatch.setattr(beat_schedule, "reminder_bucket", lambda now: beat_schedule.reminder_buckets() - 1)
+    yield session_maker
+
+
+@pytest.fixture
+def batches(monkeypatch) -> list[list[tuple[int, str, str]]]:
+    batches: list[list[tuple[int, str, str]]] = []
+    monkeypatch.setattr(beat_schedule.settings, "REMINDER_BATCH_SIZE", 5)
+    monkeypatch.setattr(beat_schedule.send_reminder_batch, "delay", batches.append)
+    return batches
+
+
+def test_reminders_are_dispatched_in_batches(session_maker, batches):
+    noon = datetime.combine(datetime.now(UTC).date(), time(12))
+    with session_maker() as session:
+        for i in range(3):
+            pet = Pet(name=f"pet_{i}", next_vaccination=noon, next_parasite_treatment=noon)
+            pet.owners = [User(telegram_id=10 * i + 1), User(telegram_id=10 * i + 2)]
+            session.add(pet)
+        session.add(Pet(name="not_due", next_vaccination=datetime(2000, 1, 1)))
+        session.commit()
+
+    result = beat_schedule.get_pets_for_reminders()
+
+    assert [len(batch) for batch in batches] == [5, 5, 2]
+    assert sorted(reminder for batch in batches for reminder in batch) == sorted(
+        (10 * i + owner, f"pet_{i}", kind)
+        for i in range(3)
+        for owner in (1, 2)
+        for kind in ("vaccination", "parasite")
+    )
+    assert result["vaccination_sent"] == 6
+    assert result["parasite_sent"] == 6
+    assert result["fleas_ticks_sent"] == 0
+    assert result["batches"] == 3
+
+
+def test_reminders_are_queued_once_a_day(session_maker, batches):
+    noon = datetime.combine(datetime.now(UTC).date(), time(12))
+    with session_maker() as session:
+        pet = Pet(name="Бобик", next_vaccination=noon)
+        pet.owners = [User(telegram_id=1)]
+        session.add(pet)
+        session.commit()
+
+    beat_schedule.get_pets_for_reminders()
+    result = beat_schedule.get_pets_for_reminders()
+
+    assert batches == [[(1, "Бобик", "vaccination")]]
+    assert result["vaccination_sent"] == 0
+    with session_maker() as session:
+        assert session.query(ReminderLog).count() == 1
+
+
+def test_failed_scan_is_not_logged(session_maker, batches, monkeypatch):
+    noon = datetime.combine(datetime.now(UTC).date(), time(12))
+    with session_maker() as session:
+        pet = Pet(name="Бобик", next_vaccination=noon)
+        pet.owners = [User(telegram_id=1)]
+        session.add(pet)
+        session.commit()
+
+    def broker_down(reminders: list) -> None:
+        raise ConnectionError("broker is down")
+
+    monkeypatch.setattr(beat_schedule.send_reminder_batch, "delay", broker_down)
+    with pytest.raises(ConnectionError):
+        beat_schedule.get_pets_for_reminders()
+
+    with session_maker() as session:
+        assert session.query(ReminderLog).count() == 0
+
+
+def test_queued_batches_are_not_resent_after_failure(session_maker, batches, monkeypatch):
+    noon = datetime.combine(datetime.now(UTC).date(), time(12))
+    with session_maker() as session:
+        for i in range(3):
+            pet = Pet(name=f"pet_{i}", next_vaccination=noon)
+            pet.owners = [User(telegram_id=10 * i + 1), User(telegram_id=10 * i + 2)]
+            session.add(pet)
+        session.commit()
+
+    def flaky_delay(reminders: list) -> None:
+        # Logs of a batch are committed before it is queued
+        with session_maker() as session:
+            assert session.query(ReminderLog).count() == 3
+        if batches:
+            raise ConnectionError("broker is down")
+        batches.append(reminders)
+
+    monkeypatch.setattr(beat_schedule.send_reminder_batch, "delay", flaky_delay)
+    with pytest.raises(ConnectionError):
+        beat_schedule.get_pets_for_reminders()
+    assert len(batches) == 1 and len(batches[0]) == 5
+
+    # Only the reminder that failed to queue is picked up again, with its pet's other owner
+    monkeypatch.setattr(beat_schedule.send_reminder_batch, "delay", batches.append)
+    beat_schedule.get_pets_for_reminders()
+    assert sorted(batches[1]) == [(21, "pet_2", "vaccination"), (22, "pet_2", "vaccination")]
+
+
+def test_failed_scan_drops_logs_of_unqueued_reminders(session_maker, batches, monkeypatch):
+    noon = datetime.combine(datetime.now(UTC).date(), time(12))
+    with session_maker() as session:
+        for i in range(3):
+            pet = Pet(name=f"pet_{i}", next_vaccination=noon)
+            pet.owners = [User(telegram_id=10 * i + 1), User(telegram_id=10 * i + 2)]
+            session.add(pet)
+        session.commit()
+
+    stream = beat_schedule.PetServices.stream_pets_due_for_reminders
+
+    def broken_stream(*args, **kwargs):
+        yield from stream(*args, **kwargs)
+        raise ConnectionError("db connection lost")
+
+    monkeypatch.setattr(beat_schedule.PetServices, "stream_pets_due_for_reminders", broken_stream)
+    with pytest.raises(ConnectionError):
+        beat_schedule.get_pets_for_reminders()
+    assert len(batches) == 1 and len(batches[0]) == 5
+    with session_maker() as session:
+        assert session.query(ReminderLog).count() == 2
+
+    # The reminder left in the scan is sent by the next one
+    monkeypatch.setattr(beat_schedule.PetServices, "stream_pets_due_for_reminders", stream)
+    beat_schedule.get_pets_for_reminders()
+    assert sorted(batches[1]) == [(21, "pet_2", "vaccination"), (22, "pet_2", "vaccination")]
+
+
+@pytest.mark.parametrize(("hour", "minute", "bucket"), [
+    (8, 0, 0),
+    (10, 0, 0),
+    (10, 4, 0),
+    (10, 5, 1),
+    (19, 55, 119),
+    (23, 0, 119),
+])
+def test_scans_are_spread_over_the_window(hour, minute, bucket):
+    assert beat_schedule.reminder_buckets() == 120
+    now = datetime(2025, 7, 3, hour, minute, tzinfo=UTC)
+    assert beat_schedule.reminder_bucket(now) == bucket
@@ -0,0 +1,41 @@
+from src.celery_app import reminder_tasks
+from src.celery_app.reminder_tasks import reminder_message, send_reminder_batch
+from src.database.models import ReminderKind
+
+
+def test_batch_sends_all_reminders_at_once_and_summarizes(monkeypatch):
+    batches: list[list[tuple[int, str]]] = []
+
+    def send_reminders_sync(messages: list[tuple[int, str]]) -> list[bool]:
+        batches.append(messages)
+        return [telegram_id != 2 for telegram_id, _ in messages]
+
+    monkeypatch.setattr(reminder_tasks, "send_reminders_sync", send_reminders_sync)
+
+    summary = send_reminder_batch([
+        (1, "Бобик", "vaccination"),
+        (2, "Бобик", "vaccination"),
+        (1, "Шарик", "fleas_ticks"),
+    ])
+
+    assert batches == [[
+        (1, reminder_message(ReminderKind.VACCINATION, "Бобик")),
+        (2, reminder_message(ReminderKind.VACCINATION, "Бобик")),
+        (1, reminder_message(ReminderKind.FLEAS_TICKS, "Шарик")),
+    ]]
+    assert summary == {
+        "total": 3,
+        "sent": 2,
+        "failed": 1,
+        "by_kind": {
+            "vaccination": {"sent": 1, "failed": 1},
+            "parasite": {"sent": 0, "failed": 0},
+            "fleas_ticks": {"sent": 1, "failed": 0},
+        },
+    }
+
+
+def test_messages_name_the_pet():
+    assert reminder_message(ReminderKind.PARASITE, "Бобик") == (
+        "⚠️Напоминание: пора обработать от паразитов питомца Бобик!"
+    )
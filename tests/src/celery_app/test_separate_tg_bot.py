@@ -0,0 +1,111 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError
+
+from src.celery_app import separate_tg_bot
+from src.celery_app.separate_tg_bot import ReminderSender
+
+
+class FakeSession:
+    def __init__(self) -> None:
+        self.closed = False
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FakeBot:
+    def __init__(self) -> None:
+        self.session = FakeSession()
+        self.sent: list[int] = []
+        self.loops: set[asyncio.AbstractEventLoop] = set()
+
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def send_message(self, chat_id: int, text: str) -> None:
+        self.loops.add(asyncio.get_running_loop())
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if chat_id < 0:
+            raise TelegramForbiddenError(method=None, message="bot was blocked by the user")  # type: ignore[arg-type]
+        self.sent.append(chat_id)
+
+
+def make_sender() -> tuple[ReminderSender, list[FakeBot]]:
+    bots: list[FakeBot] = []
+
+    def make_bot() -> Bot:
+        bots.append(FakeBot())
+        return bots[-1]  # type: ignore[return-value]
+
+    sender = ReminderSender(make_bot=make_bot, global_rate=1000, chat_rate=1000, max_concurrent=3)
+    return sender, bots
+
+
+def test_sends_share_one_bot_and_loop():
+    sender, bots = make_sender()
+
+    assert all(sender.send(telegram_id, "Напоминание") for telegram_id in range(5))
+
+    assert len(bots) == 1
+    assert bots[0].sent == [0, 1, 2, 3, 4]
+    assert len(bots[0].loops) == 1
+    sender.close()
+
+
+def test_sends_from_several_threads():
+    sender, bots = make_sender()
+    sender.start()
+
+    threads = [
+        threading.Thread(target=sender.send, args=(telegram_id, "Напоминание"))
+        for telegram_id in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(bots[0].sent) == list(range(10))
+    sender.close()
+
+
+def test_close_closes_session_and_allows_restart():
+    sender, bots = make_sender()
+    sender.start()
+    sender.close()
+
+    assert bots[0].session.closed
+
+    sender.send(1, "Напоминание")
+    assert len(bots) == 2
+    sender.close()
+
+
+def test_send_many_runs_concurrently_up_to_limit():
+    sender, bots = make_sender()
+
+    results = sender.send_many([(telegram_id, "Напоминание") for telegram_id in (1, 2, -3, 4, 5)])
+
+    assert results == [True, True, False, True, True]
+    assert sorted(bots[0].sent) == [1, 2, 4, 5]
+    assert bots[0].max_in_flight == 3
+    sender.close()
+
+
+def test_prefork_processes_split_global_rate(monkeypatch):
+    sender, _ = make_sender()
+    monkeypatch.setattr(separate_tg_bot, "reminder_sender", sender)
+    monkeypatch.setattr(separate_tg_bot.settings, "TELEGRAM_GLOBAL_RATE", 28)
+
+    separate_tg_bot.split_reminder_rate(SimpleNamespace(pool_cls="prefork", concurrency=4))
+    assert sender.global_rate == 7
+
+    separate_tg_bot.split_reminder_rate(SimpleNamespace(pool_cls="threads", concurrency=4))
+    assert sender.global_rate == 28
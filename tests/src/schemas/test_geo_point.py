@@ -0,0 +1,39 @@
+import struct
+
+from geoalchemy2 import WKBElement
+
+from src.schemas.geo import Geolocation, GeoPoint
+
+MOSCOW = (37.6176, 55.7558)
+POLYGON = "POLYGON((37.5 55.7, 37.7 55.7, 37.7 55.8, 37.5 55.7))"
+
+
+def test_from_wkt():
+    assert GeoPoint.from_wkt("POINT(37.61 55.75)") == (37.61, 55.75)
+    assert GeoPoint.from_wkt("37.61 55.75") == GeoPoint(lon=37.61, lat=55.75)
+    assert GeoPoint.from_wkt(GeoPoint(*MOSCOW).wkt) == MOSCOW
+
+
+def test_from_wkb_both_byte_orders_with_and_without_srid():
+    ewkb_ndr = struct.pack("<BII2d", 1, 1 | 0x20000000, 4326, *MOSCOW)
+    wkb_xdr = struct.pack(">BI2d", 0, 1, *MOSCOW)
+
+    assert GeoPoint.from_wkb(ewkb_ndr) == MOSCOW
+    assert GeoPoint.from_wkb(ewkb_ndr.hex()) == MOSCOW
+    assert GeoPoint.from_wkb(wkb_xdr) == MOSCOW
+    assert GeoPoint.from_wkb(WKBElement(ewkb_ndr.hex(), extended=True)) == MOSCOW
+
+
+def test_geolocation_decodes_raw_home_point():
+    geo = Geolocation(
+        id=1,
+        filter_type="radius",
+        region="Moscow",
+        home_location="POINT(37.6176 55.7558)",
+        radius=1000,
+        polygon=POLYGON,
+        home_point=WKBElement(struct.pack("<BII2d", 1, 1 | 0x20000000, 4326, *MOSCOW)),
+    )
+
+    assert geo.home_point == MOSCOW
+    assert "home_point" not in geo.model_dump()
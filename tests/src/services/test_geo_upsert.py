@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from src.schemas.geo import GeolocationUpsert
+from src.services.geo_service import GeoServices, upsert_statement
+
+POLYGON = "POLYGON((37.5 55.7, 37.7 55.7, 37.7 55.8, 37.5 55.7))"
+
+
+def geolocation(user_id, radius=1000):
+    return GeolocationUpsert(
+        user_id=user_id,
+        region="Moscow",
+        home_location="POINT(37.6176 55.7558)",
+        radius=radius,
+        polygon=POLYGON,
+    )
+
+
+def test_upsert_is_one_statement_for_all_rows():
+    compiled = upsert_statement([geolocation(1), geolocation(2), geolocation(3)]).compile(
+        dialect=postgresql.dialect(),
+    )
+    sql = str(compiled)
+
+    assert sql.count("INSERT INTO geolocations") == 1
+    assert "ON CONFLICT (user_id) DO UPDATE SET" in sql
+    assert "user_id = excluded.user_id" not in sql
+    assert "RETURNING" in sql and "ST_AsText(geolocations.home_location)" in sql
+    assert [compiled.params[f"user_id_m{i}"] for i in range(3)] == [1, 2, 3]
+    assert compiled.params["geohash_6_m0"] == "ucfv0n"
+
+
+def test_upsert_without_radius_has_no_coverage():
+    compiled = upsert_statement([geolocation(1, radius=0)]).compile(dialect=postgresql.dialect())
+    assert compiled.params["coverage_m0"] is None
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return SimpleNamespace(all=lambda: [])
+
+    async def commit(self):
+        pass
+
+
+async def test_upsert_keeps_last_entry_of_duplicate_users():
+    session = RecordingSession()
+    geos = [geolocation(1, radius=1000), geolocation(2), geolocation(1, radius=3000)]
+
+    await GeoServices.upsert_geolocations(geos, session)
+
+    [statement] = session.statements
+    params = statement.compile(dialect=postgresql.dialect()).params
+    assert [params[f"user_id_m{i}"] for i in range(2)] == [1, 2]
+    assert params["radius_m0"] == 3000
+    assert "user_id_m2" not in params
@@ -0,0 +1,45 @@
+import random
+
+from src.services import geohash
+from src.services.geo_index import metres_per_degree
+
+MOSCOW = (37.6176, 55.7558)
+
+
+def test_encode_known_values():
+    assert geohash.encode(10.40744, 57.64911, 11) == "u4pruydqqvj"
+    assert geohash.encode(-5.6, 42.6, 5) == "ezs42"
+
+
+def test_cell_keys_are_prefixes():
+    keys = geohash.cell_keys(*MOSCOW)
+    assert keys == {"geohash_4": "ucfv", "geohash_5": "ucfv0", "geohash_6": "ucfv0n"}
+
+
+def test_cells_covering_contains_every_point_of_circle():
+    rnd = random.Random(5)
+    for radius in (300, 1000, 5000, 20000, 100000):
+        lon = MOSCOW[0] + rnd.uniform(-0.3, 0.3)
+        lat = MOSCOW[1] + rnd.uniform(-0.2, 0.2)
+        precision, cells = geohash.cells_covering(lon, lat, radius)
+
+        assert precision in geohash.GEOHASH_PRECISIONS
+        assert len(cells) <= geohash.MAX_PREFILTER_CELLS or precision == 4
+
+        lat_m, lon_m = metres_per_degree(lat)
+        for _ in range(500):
+            p_lon = lon + rnd.uniform(-1, 1) * radius / lon_m
+            p_lat = lat + rnd.uniform(-1, 1) * radius / lat_m
+            assert geohash.encode(p_lon, p_lat, precision) in cells
+
+
+def test_bbox_contains_encoded_point():
+    rnd = random.Random(9)
+    for precision in (1, 4, 5, 6, 9):
+        lon = rnd.uniform(-180, 180)
+        lat = rnd.uniform(-90, 90)
+        cell = geohash.encode(lon, lat, precision)
+        min_lon, min_lat, max_lon, max_lat = geohash.bbox(cell)
+
+        assert min_lon <= lon <= max_lon and min_lat <= lat <= max_lat
+        assert (max_lon - min_lon, max_lat - min_lat) == geohash.cell_size(precision)
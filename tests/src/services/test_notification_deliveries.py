@@ -0,0 +1,29 @@
+from sqlalchemy.dialects import postgresql
+
+from src.database.models import DeliveryStatus
+from src.services.notification_service import delivery_upsert_statement
+
+
+def test_outcomes_are_written_in_one_statement():
+    compiled = delivery_upsert_statement({
+        (7, 11): DeliveryStatus.DELIVERED,
+        (7, 12): DeliveryStatus.FAILED,
+        (8, 11): DeliveryStatus.DELIVERED,
+    }).compile(
+        dialect=postgresql.dialect(),
+    )
+    sql = str(compiled)
+
+    assert sql.count("INSERT INTO notification_deliveries") == 1
+    assert "ON CONFLICT (notification_id, telegram_id) DO UPDATE SET" in sql
+    assert "attempts = (notification_deliveries.attempts +" in sql
+    assert [compiled.params[f"telegram_id_m{i}"] for i in range(3)] == [11, 12, 11]
+    assert [compiled.params[f"notification_id_m{i}"] for i in range(3)] == [7, 7, 8]
+    assert compiled.params["status_m0"] == DeliveryStatus.DELIVERED
+    assert compiled.params["status_m1"] == DeliveryStatus.FAILED
+
+
+def test_delivered_status_is_never_downgraded():
+    sql = str(delivery_upsert_statement({(7, 11): DeliveryStatus.RETRYING}).compile(dialect=postgresql.dialect()))
+    assert "CASE WHEN (notification_deliveries.status = " in sql
+    assert "ELSE excluded.status END" in sql
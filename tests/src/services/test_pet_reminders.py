@@ -0,0 +1,103 @@
+from collections.abc import Iterator
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from src.database.models import Pet, ReminderKind, ReminderLog, User
+from src.database.models.association_tables import user_pet_association
+from src.services.pet_service import PetServices
+
+TODAY = date(2025, 7, 3)
+
+
+@pytest.fixture
+def session() -> Iterator[Session]:
+    engine = create_engine("sqlite://")
+    tables = [Pet.__table__, User.__table__, ReminderLog.__table__, user_pet_association]
+    Pet.metadata.create_all(engine, tables=tables)  # type: ignore[arg-type]
+    with Session(engine) as session:
+        yield session
+
+
+def add_pet(session: Session, name: str, **dates: datetime) -> None:
+    session.add(Pet(name=name, **dates))
+    session.commit()
+
+
+def test_one_query_flags_every_due_treatment(session: Session):
+    add_pet(session, "Бобик", next_vaccination=datetime(2025, 7, 3, 0, 0))
+    add_pet(
+        session,
+        "Шарик",
+        next_parasite_treatment=datetime(2025, 7, 3, 23, 59, 59),
+        next_fleas_ticks_treatment=datetime(2025, 7, 3, 12, 0),
+    )
+    add_pet(session, "Рекс", next_vaccination=datetime(2025, 7, 4, 0, 0))
+    add_pet(session, "Тузик", next_parasite_treatment=datetime(2025, 7, 2, 23, 59, 59))
+
+    rows = PetServices.get_pets_due_for_reminders(TODAY, session)
+
+    due = {pet.name: flags for pet, *flags in rows}
+    assert due == {
+        "Бобик": [True, False, False],
+        "Шарик": [False, True, True],
+    }
+
+
+def test_query_compares_ranges_not_casts(session: Session):
+    statements: list[str] = []
+
+    def capture(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(session.get_bind(), "before_cursor_execute", capture)
+    PetServices.get_pets_due_for_reminders(TODAY, session)
+
+    sql = statements[0]
+    assert "CAST" not in sql
+    assert "pets.next_vaccination >= ?" in sql
+    assert "pets.next_fleas_ticks_treatment < ?" in sql
+
+
+def test_stream_yields_batches_with_owners(session: Session):
+    for i in range(5):
+        pet = Pet(name=f"pet_{i}", next_vaccination=datetime(2025, 7, 3, 10, 0))
+        pet.owners = [User(telegram_id=100 + i)]
+        session.add(pet)
+    add_pet(session, "Рекс", next_vaccination=datetime(2025, 7, 4, 10, 0))
+
+    batches = list(PetServices.stream_pets_due_for_reminders(TODAY, session, batch_size=2))
+
+    assert [len(rows) for rows in batches] == [2, 2, 1]
+    assert sorted(
+        (pet.name, [owner.telegram_id for owner in pet.owners])
+        for rows in batches
+        for pet, *_ in rows
+    ) == [(f"pet_{i}", [100 + i]) for i in range(5)]
+
+
+def test_buckets_limit_pets_by_id(session: Session):
+    for i in range(6):
+        add_pet(session, f"pet_{i}", next_vaccination=datetime(2025, 7, 3, 10, 0))
+
+    rows = PetServices.get_pets_due_for_reminders(TODAY, session, buckets=4, up_to_bucket=1)
+
+    assert sorted(pet.id for pet, *_ in rows) == [1, 4, 5]
+
+
+def test_logged_reminders_are_skipped(session: Session):
+    add_pet(
+        session,
+        "Бобик",
+        next_vaccination=datetime(2025, 7, 3, 10, 0),
+        next_parasite_treatment=datetime(2025, 7, 3, 10, 0),
+    )
+
+    logged = PetServices.record_reminders(TODAY, [(1, ReminderKind.VACCINATION)], session)
+    assert logged == {(1, ReminderKind.VACCINATION)}
+    assert PetServices.record_reminders(TODAY, [(1, ReminderKind.VACCINATION)], session) == set()
+
+    rows = PetServices.get_pets_due_for_reminders(TODAY, session)
+    assert [flags for _, *flags in rows] == [[False, True, False]]
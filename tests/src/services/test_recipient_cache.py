@@ -0,0 +1,80 @@
+from sqlalchemy.dialects import postgresql
+
+from src.services import recipient_cache
+from src.services.geo_index import geodesic_distance
+from src.services.geo_service import candidate_recipients_query, cell_prefilter
+from src.services.recipient_cache import RecipientCache
+
+MOSCOW = (37.6176, 55.7558)
+
+
+def test_entries_expire(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(recipient_cache.time, "monotonic", lambda: now)
+    cache = RecipientCache(ttl=60)
+
+    cache.put_region("Москва", [1, 2, 3])
+    assert cache.get_region("Москва") == [1, 2, 3]
+
+    now += 61
+    assert cache.get_region("Москва") is None
+    assert len(cache) == 0
+
+
+def test_disabled_with_zero_ttl():
+    cache = RecipientCache(ttl=0)
+    cache.put_region("Москва", [1])
+    assert cache.get_region("Москва") is None
+
+
+def test_oldest_entries_are_dropped():
+    cache = RecipientCache(ttl=60, max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.put_candidates(("cover", key), [])
+
+    assert cache.get_candidates(("cover", "a")) is None
+    assert cache.get_candidates(("cover", "c")) == []
+
+
+def test_subscriber_changed_drops_regions_and_cells():
+    cache = RecipientCache(ttl=60)
+    cache.put_region("Москва", [1])
+    cache.put_region("Казань", [2])
+    cache.put_candidates(recipient_cache.cover_key(*MOSCOW), [1])
+
+    cache.subscriber_changed("Москва", None)
+
+    assert cache.get_region("Москва") is None
+    assert cache.get_region("Казань") == [2]
+    assert cache.get_candidates(recipient_cache.cover_key(*MOSCOW)) is None
+
+
+def test_radius_bucket():
+    assert recipient_cache.radius_bucket(1000) == 1024
+    assert recipient_cache.radius_bucket(1024) == 1024
+    assert recipient_cache.radius_bucket(5000) == 8192
+    assert recipient_cache.radius_bucket(0) == 1
+
+
+def test_cell_prefilter_keeps_points_around_the_whole_cell():
+    cell = recipient_cache.cover_key(*MOSCOW)[1]
+    min_lon, min_lat, max_lon, max_lat = recipient_cache.geohash.bbox(cell)
+    prefilter = cell_prefilter(cell, 2000)
+    column, cells = prefilter.clauses[0].left.key, prefilter.clauses[0].right.value
+    precision = int(column.removeprefix("geohash_"))
+
+    # Points 1.9 km outside every corner of the cell still pass the prefilter
+    for corner_lon, corner_lat in [(min_lon, min_lat), (max_lon, max_lat)]:
+        for d_lon, d_lat in [(-0.027, 0), (0.027, 0), (0, -0.017), (0, 0.017)]:
+            lon, lat = corner_lon + d_lon, corner_lat + d_lat
+            if geodesic_distance(corner_lon, corner_lat, lon, lat) <= 2000:
+                assert recipient_cache.geohash.encode(lon, lat, precision) in cells
+
+
+def test_candidate_ids_are_one_array_parameter():
+    compiled = candidate_recipients_query(list(range(50_000))).compile(
+        dialect=postgresql.dialect(),
+    )
+
+    assert "geolocations.id = ANY (%(param_1)s::INTEGER[])" in str(compiled)
+    assert len(compiled.params["param_1"]) == 50_000
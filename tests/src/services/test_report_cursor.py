@@ -0,0 +1,26 @@
+import pytest
+
+from src.schemas.report import ReportNearest
+from src.services.report_service import decode_cursor, encode_cursor
+
+
+def nearest_report(report_id, distance):
+    return ReportNearest(
+        id=report_id,
+        title="Lost dog",
+        content="Lost near the park",
+        status="active",
+        location="POINT(37.61 55.75)",
+        distance=distance,
+    )
+
+
+@pytest.mark.parametrize("distance", [0.0, 1234.5678901234, 1e-07, 98765.4321])
+def test_cursor_roundtrip_is_exact(distance):
+    assert decode_cursor(encode_cursor(nearest_report(42, distance))) == (distance, 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", "MTIzNA==", "YWJjOmRlZg=="])
+def test_malformed_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
@@ -0,0 +1,40 @@
+from src.database.models.geo import GeoFilterType
+from src.schemas.geo import GeoPoint
+from src.services import geo_service
+from src.services.geo_index import GeoGridIndex, PreparedPolygon
+from src.services.geo_service import GeoServices
+from src.services.recipient_cache import RecipientCache
+
+MOSCOW = (37.6176, 55.7558)
+AROUND_MOSCOW = "POLYGON((37.5 55.7, 37.7 55.7, 37.7 55.8, 37.5 55.8, 37.5 55.7))"
+AWAY_FROM_MOSCOW = "POLYGON((37.8 55.7, 37.9 55.7, 37.9 55.8, 37.8 55.8, 37.8 55.7))"
+
+
+def subscribe(index, user_id, filter_type, radius=None, polygon=None):
+    telegram_id = 100 + user_id
+    index.upsert(user_id, telegram_id, *MOSCOW, radius, filter_type)
+    if polygon:
+        index.upsert_polygon(user_id, telegram_id, PreparedPolygon.from_wkt(polygon))
+
+
+async def test_radius_reporter_reaches_every_subscriber_type(monkeypatch):
+    index = GeoGridIndex()
+    index.ready = True
+    subscribe(index, 1, GeoFilterType.RADIUS, radius=1000)
+    subscribe(index, 2, GeoFilterType.POLYGON, radius=1000, polygon=AROUND_MOSCOW)
+    # A stored radius doesn't count once the user switched to another filter
+    subscribe(index, 3, GeoFilterType.POLYGON, radius=1000, polygon=AWAY_FROM_MOSCOW)
+    subscribe(index, 4, GeoFilterType.REGION, radius=1000)
+    cache = RecipientCache(ttl=60)
+    cache.put_region("Москва", [105])
+    monkeypatch.setattr(geo_service, "geo_index", index)
+    monkeypatch.setattr(geo_service, "recipient_cache", cache)
+
+    # The reporter's home is their RADIUS filter center, the report is placed there
+    recipients = await GeoServices.find_all_telegram_uids_for_report(
+        coords=GeoPoint(lon=MOSCOW[0], lat=MOSCOW[1]),
+        region="Москва",
+        session=None,
+    )
+
+    assert recipients == [101, 102, 105]
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from src.config.config import settings
+from src.schemas.geo import GeolocationUpsert
+from src.services.geo_service import GeoServices
+from src.web.routers.api import geo as geo_router
+
+
+def geolocation(user_id):
+    return GeolocationUpsert(
+        user_id=user_id,
+        region="Moscow",
+        home_location="POINT(37.6176 55.7558)",
+        radius=1000,
+        polygon="POLYGON((37.5 55.7, 37.7 55.7, 37.7 55.8, 37.5 55.7))",
+    )
+
+
+def request(user_id=None, token=None):
+    headers = []
+    if user_id is not None:
+        cookie = json.dumps({"user_id": str(user_id)})
+        headers.append((b"cookie", f"user_data={cookie}".encode()))
+    if token is not None:
+        headers.append((b"x-service-token", token.encode()))
+    return Request({"type": "http", "method": "POST", "path": "/api/geo/bulk", "headers": headers})
+
+
+@pytest.fixture
+def upserted(monkeypatch):
+    calls = []
+
+    async def upsert_geolocations(geos, session):
+        calls.append([geo.user_id for geo in geos])
+        return []
+
+    monkeypatch.setattr(GeoServices, "upsert_geolocations", upsert_geolocations)
+    return calls
+
+
+async def test_bulk_rejects_other_users_rows(upserted):
+    with pytest.raises(HTTPException) as error:
+        await geo_router.upsert_users_geos(request(1), [geolocation(1), geolocation(2)], None)
+
+    assert error.value.status_code == 403
+    assert upserted == []
+
+
+async def test_bulk_requires_cookie(upserted):
+    with pytest.raises(HTTPException) as error:
+        await geo_router.upsert_users_geos(request(), [geolocation(1)], None)
+
+    assert error.value.status_code == 401
+
+
+async def test_bulk_accepts_own_rows(upserted):
+    await geo_router.upsert_users_geos(request(1), [geolocation(1)], None)
+    assert upserted == [[1]]
+
+
+async def test_bulk_service_token_writes_any_user(upserted, monkeypatch):
+    monkeypatch.setattr(settings, "GEO_BULK_SERVICE_TOKEN", "secret")
+
+    with pytest.raises(HTTPException):
+        await geo_router.upsert_users_geos(request(1, token="wrong"), [geolocation(2)], None)
+    await geo_router.upsert_users_geos(request(token="secret"), [geolocation(1), geolocation(2)], None)
+
+    assert upserted == [[1, 2]]